@@ -0,0 +1,244 @@
+"""Fake Anthropic and Bedrock endpoints with injected latency.
+
+Serves just enough of the Anthropic Messages API and of Bedrock's Converse
+and ConverseStream APIs for pydantic-ai to talk to it, answering every
+request with a fixed text. Point one leg of the model router at each
+instance to exercise hedging and failover locally:
+
+    python -m benchmarks.fake_llm --port 9001 --first-token 0.2
+    python -m benchmarks.fake_llm --port 9002 --first-token 2 --jitter 3
+
+    LLM_MODEL=anthropic:claude-haiku-4-5-20251001
+    LLM_FALLBACK_MODELS='["bedrock:us.anthropic.claude-haiku-4-5-20251001-v1:0"]'
+    LLM_HEDGE_DELAY=0.5
+    ANTHROPIC_BASE_URL=http://localhost:9001
+    BEDROCK_BASE_URL=http://localhost:9002
+
+Bedrock requests are signed by botocore, so any AWS credentials will do.
+"""
+
+import asyncio
+import binascii
+import json
+import random
+import struct
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Annotated, Any
+
+import typer
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+cli = typer.Typer()
+
+
+@dataclass
+class Latency:
+    first_token: float = 0.1
+    jitter: float = 0.0
+    per_token: float = 0.01
+    error_rate: float = 0.0
+    text: str = "Hello from the fake model."
+
+    async def wait_first_token(self) -> None:
+        if random.random() < self.error_rate:  # noqa: S311
+            raise HTTPException(status_code=529, detail="Overloaded")
+        delay = self.first_token + random.uniform(0, self.jitter)  # noqa: S311
+        await asyncio.sleep(delay)
+
+    def tokens(self) -> list[str]:
+        return [w + " " for w in self.text.split()]
+
+
+def usage(latency: Latency) -> tuple[int, int]:
+    return 10, len(latency.tokens())
+
+
+def sse(event: str, data: dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def eventstream(event: str, data: dict[str, Any]) -> bytes:
+    """Encode one frame of the AWS event stream format."""
+    headers = b""
+    for name, value in (
+        (":event-type", event),
+        (":content-type", "application/json"),
+        (":message-type", "event"),
+    ):
+        headers += struct.pack(">B", len(name)) + name.encode()
+        headers += struct.pack(">BH", 7, len(value)) + value.encode()
+    payload = json.dumps(data).encode()
+    total = 12 + len(headers) + len(payload) + 4
+    prelude = struct.pack(">II", total, len(headers))
+    prelude += struct.pack(">I", binascii.crc32(prelude))
+    message = prelude + headers + payload
+    return message + struct.pack(">I", binascii.crc32(message))
+
+
+def create_app(latency: Latency) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request) -> Response:
+        body = await request.json()
+        model = body["model"]
+        message_id = f"msg_{uuid.uuid4().hex}"
+        input_tokens, output_tokens = usage(latency)
+        await latency.wait_first_token()
+        if not body.get("stream"):
+            return JSONResponse(
+                {
+                    "id": message_id,
+                    "type": "message",
+                    "role": "assistant",
+                    "model": model,
+                    "content": [{"type": "text", "text": latency.text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {
+                        "input_tokens": input_tokens,
+                        "output_tokens": output_tokens,
+                    },
+                }
+            )
+
+        async def stream() -> AsyncIterator[bytes]:
+            yield sse(
+                "message_start",
+                {
+                    "type": "message_start",
+                    "message": {
+                        "id": message_id,
+                        "type": "message",
+                        "role": "assistant",
+                        "model": model,
+                        "content": [],
+                        "stop_reason": None,
+                        "stop_sequence": None,
+                        "usage": {
+                            "input_tokens": input_tokens,
+                            "output_tokens": 0,
+                        },
+                    },
+                },
+            )
+            yield sse(
+                "content_block_start",
+                {
+                    "type": "content_block_start",
+                    "index": 0,
+                    "content_block": {"type": "text", "text": ""},
+                },
+            )
+            for token in latency.tokens():
+                yield sse(
+                    "content_block_delta",
+                    {
+                        "type": "content_block_delta",
+                        "index": 0,
+                        "delta": {"type": "text_delta", "text": token},
+                    },
+                )
+                await asyncio.sleep(latency.per_token)
+            yield sse(
+                "content_block_stop", {"type": "content_block_stop", "index": 0}
+            )
+            yield sse(
+                "message_delta",
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": output_tokens},
+                },
+            )
+            yield sse("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/model/{model_id}/converse")
+    async def bedrock_converse(model_id: str) -> Response:
+        start = time.perf_counter()
+        input_tokens, output_tokens = usage(latency)
+        await latency.wait_first_token()
+        return JSONResponse(
+            {
+                "output": {
+                    "message": {
+                        "role": "assistant",
+                        "content": [{"text": latency.text}],
+                    }
+                },
+                "stopReason": "end_turn",
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {
+                    "latencyMs": int((time.perf_counter() - start) * 1000)
+                },
+            }
+        )
+
+    @app.post("/model/{model_id}/converse-stream")
+    async def bedrock_converse_stream(model_id: str) -> Response:
+        start = time.perf_counter()
+        input_tokens, output_tokens = usage(latency)
+        await latency.wait_first_token()
+
+        async def stream() -> AsyncIterator[bytes]:
+            yield eventstream("messageStart", {"role": "assistant"})
+            for token in latency.tokens():
+                yield eventstream(
+                    "contentBlockDelta",
+                    {"contentBlockIndex": 0, "delta": {"text": token}},
+                )
+                await asyncio.sleep(latency.per_token)
+            yield eventstream("contentBlockStop", {"contentBlockIndex": 0})
+            yield eventstream("messageStop", {"stopReason": "end_turn"})
+            yield eventstream(
+                "metadata",
+                {
+                    "usage": {
+                        "inputTokens": input_tokens,
+                        "outputTokens": output_tokens,
+                        "totalTokens": input_tokens + output_tokens,
+                    },
+                    "metrics": {
+                        "latencyMs": int((time.perf_counter() - start) * 1000)
+                    },
+                },
+            )
+
+        return StreamingResponse(
+            stream(), media_type="application/vnd.amazon.eventstream"
+        )
+
+    return app
+
+
+@cli.command()
+def main(
+    port: Annotated[int, typer.Option()] = 9001,
+    first_token: Annotated[
+        float, typer.Option(help="Seconds before the first token.")
+    ] = 0.1,
+    jitter: Annotated[
+        float, typer.Option(help="Extra uniform random first token delay.")
+    ] = 0.0,
+    per_token: Annotated[float, typer.Option()] = 0.01,
+    error_rate: Annotated[
+        float, typer.Option(min=0, max=1, help="Share of 529 answers.")
+    ] = 0.0,
+) -> None:
+    latency = Latency(first_token, jitter, per_token, error_rate)
+    uvicorn.run(create_app(latency), host="127.0.0.1", port=port)
+
+
+if __name__ == "__main__":
+    cli()
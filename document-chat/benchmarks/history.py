@@ -0,0 +1,214 @@
+"""Micro-benchmark for loading chat history into ModelMessages.
+
+Compares the ORM path (full Message objects walked by
+``process_messages_from_db``) against the lean path (Core
+``(id, role, content, created_at)`` tuples with raw JSON decoded by
+``process_history_from_db``).
+
+    python -m benchmarks.history --messages 10000
+    python -m benchmarks.history --messages 10000 --database
+
+Without ``--database`` only the decode step is measured, starting from the
+values the driver would hand back for each path. With ``--database`` a
+throwaway chat is written to the configured Postgres and both repository
+queries are timed end to end.
+"""
+
+import asyncio
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Annotated, Any
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from src.agents.processor import processor
+from src.models.message import (
+    Message,
+    MessageContent,
+    MessageHistoryRow,
+    MessageRole,
+)
+from src.utils import now_utc
+
+app = typer.Typer()
+
+
+@dataclass
+class Measurement:
+    name: str
+    cpu_ms: float
+    wall_ms: float
+    peak_kib: float
+
+
+def synthesize(chat_id: uuid.UUID, n: int) -> list[Message]:
+    """A chat where every fifth turn goes through a tool call."""
+    start = now_utc() - timedelta(seconds=n)
+    messages: list[Message] = []
+    turn = 0
+    while len(messages) < n:
+        user: list[MessageContent] = [
+            {"type": "text", "text": f"Question {turn}: " + "lorem " * 40}
+        ]
+        messages.append(
+            Message(chat_id=chat_id, role=MessageRole.USER, content=user)
+        )
+        if turn % 5 == 0:
+            call_id = f"call_{turn}"
+            messages.append(
+                Message(
+                    chat_id=chat_id,
+                    role=MessageRole.AI,
+                    content=[
+                        {
+                            "type": "tool_call",
+                            "tool_call_id": call_id,
+                            "tool_name": "get_secret_number",
+                            "args": {"turn": turn},
+                        }
+                    ],
+                )
+            )
+            messages.append(
+                Message(
+                    chat_id=chat_id,
+                    role=MessageRole.USER,
+                    content=[
+                        {
+                            "type": "tool_response",
+                            "tool_call_id": call_id,
+                            "tool_name": "get_secret_number",
+                            "content": str(turn),
+                        }
+                    ],
+                )
+            )
+        messages.append(
+            Message(
+                chat_id=chat_id,
+                role=MessageRole.AI,
+                content=[{"type": "text", "text": "ipsum " * 80}],
+                usage={"input_tokens": 512, "output_tokens": 128},
+                model="claude-haiku-4-5",
+                system="You are a helpful assistant.",
+            )
+        )
+        turn += 1
+    for i, m in enumerate(messages[:n]):
+        m.created_at = start + timedelta(seconds=i)
+    return messages[:n]
+
+
+async def measure(
+    name: str, fn: Callable[[], Awaitable[Any]], repeat: int
+) -> Measurement:
+    cpu: list[float] = []
+    wall: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        c0, w0 = time.process_time(), time.perf_counter()
+        await fn()
+        cpu.append(time.process_time() - c0)
+        wall.append(time.perf_counter() - w0)
+    gc.collect()
+    tracemalloc.start()
+    await fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Measurement(
+        name,
+        statistics.median(cpu) * 1000,
+        statistics.median(wall) * 1000,
+        peak / 1024,
+    )
+
+
+async def offline(n: int, repeat: int) -> list[Measurement]:
+    messages = synthesize(uuid.uuid4(), n)
+    # What asyncpg hands over for each query: decoded JSONB for the ORM
+    # path, text for the lean path's cast(content AS text).
+    orm_rows = [m.model_dump() for m in messages]
+    lean_rows: list[MessageHistoryRow] = [
+        (m.id, m.role, json.dumps(m.content), m.created_at) for m in messages
+    ]
+
+    async def orm() -> None:
+        loaded = [Message.model_validate(r) for r in orm_rows]
+        processor.process_messages_from_db(loaded)
+
+    async def lean() -> None:
+        processor.process_history_from_db(lean_rows)
+
+    return [
+        await measure("orm objects", orm, repeat),
+        await measure("lean tuples", lean, repeat),
+    ]
+
+
+async def online(n: int, repeat: int) -> list[Measurement]:
+    from src.core import session_maker
+    from src.models.chat import Chat
+    from src.repositories import ChatRepository, MessageRepository
+
+    async with session_maker() as session:
+        chat = await ChatRepository(session).create_chat(
+            Chat(name="benchmark: history")
+        )
+        repo = MessageRepository(session)
+        await repo.copy_messages(synthesize(chat.id, n))
+        try:
+
+            async def orm() -> None:
+                async with session_maker() as s:
+                    messages = await MessageRepository(s).list_messages(chat.id)
+                    processor.process_messages_from_db(messages)
+
+            async def lean() -> None:
+                async with session_maker() as s:
+                    rows = await MessageRepository(s).list_history(chat.id)
+                    processor.process_history_from_db(rows)
+
+            return [
+                await measure("orm objects", orm, repeat),
+                await measure("lean tuples", lean, repeat),
+            ]
+        finally:
+            await session.delete(chat)
+            await session.commit()
+
+
+def report(title: str, results: list[Measurement]) -> None:
+    table = Table(title=title)
+    for column in ("path", "cpu ms", "wall ms", "peak KiB"):
+        table.add_column(column, justify="right")
+    for r in results:
+        table.add_row(
+            r.name, f"{r.cpu_ms:.1f}", f"{r.wall_ms:.1f}", f"{r.peak_kib:.0f}"
+        )
+    Console().print(table)
+
+
+@app.command()
+def main(
+    messages: Annotated[int, typer.Option(min=1)] = 10_000,
+    repeat: Annotated[int, typer.Option(min=1)] = 5,
+    database: Annotated[
+        bool, typer.Option(help="Measure the queries against Postgres.")
+    ] = False,
+) -> None:
+    run = online if database else offline
+    results = asyncio.run(run(messages, repeat))
+    report(f"History load, {messages} messages", results)
+
+
+if __name__ == "__main__":
+    app()
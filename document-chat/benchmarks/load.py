@@ -0,0 +1,435 @@
+"""Offline load test: chat turns, ingestion and retrieval at set rates.
+
+Runs against the configured Postgres with Claude, Bedrock and Textract
+replaced by the stubs in ``benchmarks.stubs``, so no network or AWS
+access is needed. Chat turns go through the app over httpx's ASGI
+transport; ingestion calls ``DocumentIngestor.ingest`` as the job
+handler does; retrieval loads memory-backed history as a turn with chat
+memory enabled would.
+
+    python -m benchmarks.load run --chat-rate 20 --ingest-rate 1 \\
+        --retrieval-rate 50 --duration 30 --output before.json
+    python -m benchmarks.load compare before.json after.json
+
+Each workload is open loop: operations are started on schedule whatever
+the previous ones are doing, up to ``--concurrency`` in flight, and
+latency is measured from the scheduled start. Turns run on chats taken
+round robin from the seeded ones, so keep ``--chats`` above the
+concurrency or turns will queue on the per-chat lock.
+"""
+
+import asyncio
+import json
+import logging
+import resource
+import statistics
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Annotated, Any, cast
+
+import httpx
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.history import synthesize
+from benchmarks.stubs import (
+    Latency,
+    StubBedrockRuntime,
+    StubTextract,
+    create_model,
+    embed_text,
+)
+from src.agents.chatbot import get_agent
+from src.agents.memory import ChatMemory
+from src.agents.routing import MeteredModel
+from src.app import app as chat_app
+from src.aws.textract import Textract
+from src.core import read_session_maker, session_maker, settings
+from src.dependencies.admission import get_admission_controller
+from src.dependencies.cache import get_semantic_cache
+from src.dependencies.memory import get_chat_memory
+from src.documents.chunker import TextChunker
+from src.documents.dedup import MinHasher
+from src.documents.ingest import DocumentIngestor
+from src.embeddings.cohere import BedrockCohereEmbeddings
+from src.models.chat import Chat
+from src.models.document import Document
+from src.models.memory import EMBEDDING_DIMENSION, MessageEmbedding
+from src.repositories import (
+    ChatRepository,
+    DocumentRepository,
+    MessageEmbeddingRepository,
+    MessageRepository,
+)
+
+app = typer.Typer()
+logger = logging.getLogger("benchmarks.load")
+
+TENANT = "benchmark"
+REQUEST_TIMEOUT = 300.0
+
+
+@dataclass
+class WorkloadResult:
+    name: str
+    rate: float
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    first_error: str | None = None
+
+
+@dataclass
+class Workload:
+    name: str
+    rate: float
+    call: Callable[[int], Awaitable[Any]]
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    first_error: str | None = None
+    seconds: float = 0.0
+
+    async def drive(self, duration: float, concurrency: int) -> None:
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(i: int, due: float) -> None:
+            async with limit:
+                try:
+                    await self.call(i)
+                except Exception as e:
+                    self.errors += 1
+                    if self.first_error is None:
+                        self.first_error = repr(e)
+                        logger.exception("%s failed", self.name)
+                    return
+            self.latencies.append(loop.time() - due)
+
+        start = loop.time()
+        async with asyncio.TaskGroup() as tg:
+            for i in range(int(duration * self.rate)):
+                due = start + i / self.rate
+                await asyncio.sleep(max(due - loop.time(), 0.0))
+                tg.create_task(one(i, due))
+        self.seconds = loop.time() - start
+
+    def result(self) -> WorkloadResult:
+        latencies = sorted(self.latencies) or [0.0]
+        cuts = (
+            statistics.quantiles(latencies, n=100, method="inclusive")
+            if len(latencies) > 1
+            else latencies * 99
+        )
+        return WorkloadResult(
+            name=self.name,
+            rate=self.rate,
+            requests=len(self.latencies) + self.errors,
+            errors=self.errors,
+            seconds=self.seconds,
+            throughput=len(self.latencies) / self.seconds
+            if self.seconds
+            else 0.0,
+            p50_ms=cuts[49] * 1000,
+            p95_ms=cuts[94] * 1000,
+            p99_ms=cuts[98] * 1000,
+            max_ms=latencies[-1] * 1000,
+            first_error=self.first_error,
+        )
+
+
+@dataclass
+class Fixture:
+    chats: list[uuid.UUID]
+    documents: list[Document]
+
+
+async def seed(chats: int, history: int, documents: int) -> Fixture:
+    chat_ids: list[uuid.UUID] = []
+    docs: list[Document] = []
+    async with session_maker() as session:
+        for i in range(chats):
+            chat = await ChatRepository(session).create_chat(
+                Chat(name=f"benchmark: load {i}")
+            )
+            messages = synthesize(chat.id, history)
+            await MessageRepository(session).copy_messages(messages)
+            await MessageEmbeddingRepository(session).create_embeddings(
+                [
+                    MessageEmbedding(
+                        message_id=m.id,
+                        chat_id=m.chat_id,
+                        created_at=m.created_at,
+                        embedding=embed_text(m.text, EMBEDDING_DIMENSION),
+                    )
+                    for m in messages
+                    if m.text
+                ]
+            )
+            chat_ids.append(chat.id)
+        repo = DocumentRepository(session)
+        for i in range(documents):
+            docs.append(
+                await repo.create_document(
+                    Document(
+                        tenant=TENANT,
+                        name=f"benchmark-{i}.pdf",
+                        bucket=TENANT,
+                        key=f"load/{i}.pdf",
+                    )
+                )
+            )
+    return Fixture(chat_ids, docs)
+
+
+async def teardown(fixture: Fixture) -> None:
+    async with session_maker() as session:
+        chats = ChatRepository(session)
+        documents = DocumentRepository(session)
+        for chat_id in fixture.chats:
+            chat = await chats.get_chat(chat_id)
+            if chat is not None:
+                await session.delete(chat)
+        for document_id in (d.id for d in fixture.documents):
+            document = await documents.get_document(document_id)
+            if document is not None:
+                await session.delete(document)
+        await session.commit()
+
+
+def peak_rss_kib() -> int:
+    # Kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@dataclass
+class Options:
+    duration: float
+    concurrency: int
+    chat_rate: float
+    ingest_rate: float
+    retrieval_rate: float
+    chats: int
+    history: int
+    documents: int
+    memory: bool
+    model: Latency
+    bedrock: Latency
+    textract: Latency
+
+
+async def run_load(options: Options) -> dict[str, Any]:
+    bedrock = StubBedrockRuntime(options.bedrock)
+    embeddings = BedrockCohereEmbeddings(client=cast(Any, bedrock))
+    memory = ChatMemory(
+        embeddings=embeddings,
+        recent_turns=settings.CHAT_MEMORY_RECENT_TURNS,
+        top_k=settings.CHAT_MEMORY_TOP_K,
+    )
+    ingestor = DocumentIngestor(
+        textract=Textract(client=cast(Any, StubTextract(options.textract))),
+        embeddings=embeddings,
+        chunker=TextChunker(
+            max_tokens=settings.CHUNK_MAX_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+            respect_pages=settings.CHUNK_RESPECT_PAGES,
+        ),
+        hasher=MinHasher(
+            num_perm=settings.DEDUP_NUM_PERM,
+            bands=settings.DEDUP_BANDS,
+            threshold=settings.DEDUP_THRESHOLD,
+        )
+        if settings.DEDUP_ENABLED
+        else None,
+    )
+    model = MeteredModel(create_model(options.model))
+
+    chat_app.dependency_overrides |= {
+        get_admission_controller: lambda: None,
+        get_semantic_cache: lambda: None,
+        get_chat_memory: lambda: memory if options.memory else None,
+    }
+    rss_before = peak_rss_kib()
+    fixture = await seed(options.chats, options.history, options.documents)
+    try:
+        async with AsyncExitStack() as stack:
+            stack.enter_context(get_agent().override(model=model))
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=chat_app),
+                    base_url="http://benchmark",
+                    timeout=REQUEST_TIMEOUT,
+                )
+            )
+
+            async def chat_turn(i: int) -> None:
+                chat_id = fixture.chats[i % len(fixture.chats)]
+                response = await client.post(
+                    f"/api/chat/{chat_id}/messages",
+                    json={"message": f"Is square {i % 37} a winner?"},
+                )
+                response.raise_for_status()
+
+            async def ingest(i: int) -> None:
+                document = fixture.documents[i % len(fixture.documents)]
+                async with session_maker() as session:
+                    repo = DocumentRepository(session)
+                    current = await repo.get_document(document.id)
+                    if current is None:
+                        raise LookupError(f"Document {document.id} is gone")
+                    await ingestor.ingest(repo, current)
+
+            async def retrieve(i: int) -> None:
+                chat_id = fixture.chats[i % len(fixture.chats)]
+                async with read_session_maker() as session:
+                    await memory.load_history(
+                        MessageRepository(session),
+                        MessageEmbeddingRepository(session),
+                        chat_id,
+                        f"What did we say about question {i % 50}?",
+                    )
+
+            workloads = [
+                Workload(name, rate, call)
+                for name, rate, call in (
+                    ("chat_turn", options.chat_rate, chat_turn),
+                    ("ingest", options.ingest_rate, ingest),
+                    ("retrieval", options.retrieval_rate, retrieve),
+                )
+                if rate > 0
+            ]
+            async with asyncio.TaskGroup() as tg:
+                for workload in workloads:
+                    tg.create_task(
+                        workload.drive(options.duration, options.concurrency)
+                    )
+    finally:
+        chat_app.dependency_overrides.clear()
+        await teardown(fixture)
+    return {
+        "options": asdict(options),
+        "workloads": [asdict(w.result()) for w in workloads],
+        "memory": {
+            "peak_rss_kib": peak_rss_kib(),
+            "peak_rss_growth_kib": peak_rss_kib() - rss_before,
+        },
+    }
+
+
+def report(results: dict[str, Any]) -> None:
+    table = Table(title=f"Load test, {results['label'] or 'unlabelled'}")
+    for column in (
+        "workload",
+        "requests",
+        "errors",
+        "per s",
+        "p50 ms",
+        "p95 ms",
+        "p99 ms",
+        "max ms",
+    ):
+        table.add_column(column, justify="right")
+    for w in results["workloads"]:
+        table.add_row(
+            w["name"],
+            str(w["requests"]),
+            str(w["errors"]),
+            f"{w['throughput']:.1f}",
+            f"{w['p50_ms']:.1f}",
+            f"{w['p95_ms']:.1f}",
+            f"{w['p99_ms']:.1f}",
+            f"{w['max_ms']:.1f}",
+        )
+    console = Console()
+    console.print(table)
+    console.print(f"peak RSS {results['memory']['peak_rss_kib']} KiB")
+
+
+@app.command()
+def run(
+    output: Annotated[Path, typer.Option(help="Where to write results.")],
+    label: Annotated[
+        str | None, typer.Option(help="E.g. the commit being measured.")
+    ] = None,
+    duration: Annotated[float, typer.Option(min=1)] = 30.0,
+    concurrency: Annotated[
+        int, typer.Option(min=1, help="In-flight operations per workload.")
+    ] = 16,
+    chat_rate: Annotated[float, typer.Option(min=0)] = 10.0,
+    ingest_rate: Annotated[float, typer.Option(min=0)] = 0.5,
+    retrieval_rate: Annotated[float, typer.Option(min=0)] = 20.0,
+    chats: Annotated[int, typer.Option(min=1)] = 32,
+    history: Annotated[int, typer.Option(min=0)] = 200,
+    documents: Annotated[int, typer.Option(min=1)] = 8,
+    memory: Annotated[
+        bool, typer.Option(help="Load chat turn history from chat memory.")
+    ] = False,
+    model_latency: Annotated[float, typer.Option(min=0)] = 0.5,
+    model_jitter: Annotated[float, typer.Option(min=0)] = 0.2,
+    bedrock_latency: Annotated[float, typer.Option(min=0)] = 0.05,
+    textract_latency: Annotated[float, typer.Option(min=0)] = 0.2,
+) -> None:
+    options = Options(
+        duration=duration,
+        concurrency=concurrency,
+        chat_rate=chat_rate,
+        ingest_rate=ingest_rate,
+        retrieval_rate=retrieval_rate,
+        chats=chats,
+        history=history,
+        documents=documents,
+        memory=memory,
+        model=Latency(model_latency, model_jitter),
+        bedrock=Latency(bedrock_latency),
+        textract=Latency(textract_latency),
+    )
+    results = {
+        "label": label,
+        "started_at": datetime.now(UTC).isoformat(),
+        **asyncio.run(run_load(options)),
+    }
+    output.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    report(results)
+
+
+@app.command()
+def compare(before: Path, after: Path) -> None:
+    """Throughput and latency of ``after`` relative to ``before``."""
+    a = json.loads(before.read_text())
+    b = json.loads(after.read_text())
+    table = Table(
+        title=f"{a['label'] or before.name} -> {b['label'] or after.name}"
+    )
+    for column in ("workload", "per s", "p50", "p95", "p99", "errors"):
+        table.add_column(column, justify="right")
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+    previous = {w["name"]: w for w in a["workloads"]}
+    for w in b["workloads"]:
+        old = previous.get(w["name"])
+        if old is None:
+            continue
+        table.add_row(
+            w["name"],
+            change(old["throughput"], w["throughput"]),
+            change(old["p50_ms"], w["p50_ms"]),
+            change(old["p95_ms"], w["p95_ms"]),
+            change(old["p99_ms"], w["p99_ms"]),
+            f"{old['errors']} -> {w['errors']}",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    app()
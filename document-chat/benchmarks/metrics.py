@@ -0,0 +1,131 @@
+"""Overhead of the chat turn instrumentation.
+
+Runs an offline chat turn with and without metrics: history conversion,
+an agent run against a zero-latency FunctionModel that calls the tool
+once, and conversion of the new messages for persistence. No network or
+database time is included, which makes the instrumentation's share as
+large as it can get; real turns spend far longer waiting on the model.
+
+    python -m benchmarks.metrics --messages 200
+    python -m benchmarks.metrics --messages 200 --tracing
+
+``--tracing`` also opens OpenTelemetry spans at every stage. Without an
+SDK configured they are the API's no-op spans, so this measures the cost
+the app pays for having tracing switched on.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from contextlib import nullcontext
+from typing import Annotated
+
+import typer
+from opentelemetry import trace
+from pydantic_ai import ModelMessage, ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from rich.console import Console
+
+from benchmarks.history import Measurement, measure, report, synthesize
+from src.agents.chatbot import ChatbotDeps, init_agent
+from src.agents.processor import processor
+from src.agents.routing import MeteredModel
+from src.core import metrics, settings
+from src.core.metrics import stage
+from src.models.message import MessageHistoryRow
+
+app = typer.Typer()
+
+# history_convert, persist, two model requests and one tool call.
+STAGES_PER_TURN = 5
+
+
+def answer(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+    if messages[-1].parts[-1].part_kind == "user-prompt":
+        return ModelResponse(
+            parts=[ToolCallPart("roulette_wheel", {"square": 7})]
+        )
+    return ModelResponse(parts=[TextPart("You won. " + "ipsum " * 80)])
+
+
+def stage_cost(n: int) -> tuple[float, float]:
+    """Nanoseconds per ``stage()`` block and per empty block."""
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        with stage("benchmark"):
+            pass
+    staged = (time.perf_counter_ns() - start) / n
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        with nullcontext():
+            pass
+    return staged, (time.perf_counter_ns() - start) / n
+
+
+async def compare(n: int, repeat: int) -> list[Measurement]:
+    chat_id = uuid.uuid4()
+    rows: list[MessageHistoryRow] = [
+        (m.id, m.role, json.dumps(m.content), m.created_at)
+        for m in synthesize(chat_id, n)
+    ]
+    agent = init_agent()
+    model = MeteredModel(FunctionModel(answer))
+    deps = ChatbotDeps(n=7)
+
+    async def turn() -> None:
+        with stage("history_convert"):
+            history = processor.process_history_from_db(rows)
+        with agent.override(model=model):
+            result = await agent.run(
+                "Is 7 a winner?", deps=deps, message_history=history
+            )
+        with stage("persist"):
+            processor.process_messages_to_db(chat_id, result.new_messages())
+
+    async def turns() -> None:
+        for _ in range(20):
+            await turn()
+
+    results = []
+    for enabled in (False, True, False, True):
+        settings.METRICS_ENABLED = enabled
+        results.append(
+            await measure(
+                "instrumented" if enabled else "baseline", turns, repeat
+            )
+        )
+    # Alternate runs and keep the best of each to damp warm-up and noise.
+    return [
+        min((r for r in results if r.name == name), key=lambda r: r.cpu_ms)
+        for name in ("baseline", "instrumented")
+    ]
+
+
+@app.command()
+def main(
+    messages: Annotated[int, typer.Option(min=1)] = 200,
+    repeat: Annotated[int, typer.Option(min=1)] = 7,
+    tracing: Annotated[
+        bool, typer.Option(help="Open OpenTelemetry spans as well.")
+    ] = False,
+) -> None:
+    if tracing:
+        metrics._tracer = trace.get_tracer("benchmark")
+    staged, empty = stage_cost(100_000)
+    results = asyncio.run(compare(messages, repeat))
+    report(f"20 offline turns, {messages} messages of history", results)
+    baseline, instrumented = results
+    measured = (instrumented.cpu_ms - baseline.cpu_ms) / baseline.cpu_ms
+    # The measured difference is within run-to-run noise, so also derive
+    # the overhead from the cost of a single stage.
+    turn_ns = baseline.cpu_ms * 1e6 / 20
+    derived = STAGES_PER_TURN * (staged - empty) / turn_ns
+    Console().print(
+        f"stage() {staged / 1000:.2f} µs vs {empty / 1000:.2f} µs empty; "
+        f"turn overhead {derived:.2%} derived, {measured:+.2%} measured"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,113 @@
+"""Throughput benchmark for message listing responses.
+
+Serves the same page of messages through two in-process routes: the
+validated ``response_model`` path FastAPI takes for ``list[Message]``, and
+the raw bytes path used by ``list_chat_messages``. Requests go through
+httpx's ASGI transport, so the numbers include routing and response
+handling but no network or database time.
+
+    python -m benchmarks.responses --page-size 100 --page-size 1000
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Annotated
+
+import httpx
+import typer
+from fastapi import FastAPI, Response
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.history import synthesize
+from src.models.message import Message, MessageRead, dump_message_rows
+
+app = typer.Typer()
+
+
+@dataclass
+class Throughput:
+    path: str
+    page_size: int
+    requests: int
+    seconds: float
+    body_bytes: int
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.seconds
+
+    @property
+    def ms_per_request(self) -> float:
+        return self.seconds * 1000 / self.requests
+
+
+def build_app(messages: list[Message]) -> FastAPI:
+    rows = [
+        (m.id, m.chat_id, m.role, json.dumps(m.content), m.created_at)
+        for m in messages
+    ]
+    api = FastAPI()
+
+    @api.get(
+        "/validated",
+        response_model=list[MessageRead],
+        response_model_exclude_none=True,
+        response_model_exclude={"system", "usage", "model"},
+    )
+    async def validated() -> list[Message]:
+        return messages
+
+    @api.get("/raw", response_model=list[MessageRead])
+    async def raw() -> Response:
+        return Response(
+            content=dump_message_rows(rows), media_type="application/json"
+        )
+
+    return api
+
+
+async def run(path: str, page_size: int, duration: float) -> Throughput:
+    api = build_app(synthesize(uuid.uuid4(), page_size))
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        body = (await client.get(path)).content
+        requests = 0
+        start = time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < duration:
+            r = await client.get(path)
+            r.raise_for_status()
+            requests += 1
+    return Throughput(path, page_size, requests, elapsed, len(body))
+
+
+@app.command()
+def main(
+    page_size: Annotated[list[int] | None, typer.Option(min=1)] = None,
+    duration: Annotated[
+        float, typer.Option(help="Seconds per path and page size.")
+    ] = 3.0,
+) -> None:
+    table = Table(title="Message listing throughput")
+    for column in ("path", "page size", "req/s", "ms/req", "body KiB"):
+        table.add_column(column, justify="right")
+    for size in page_size or [100, 1000, 5000]:
+        for path in ("/validated", "/raw"):
+            r = asyncio.run(run(path, size, duration))
+            table.add_row(
+                r.path,
+                str(r.page_size),
+                f"{r.rps:.1f}",
+                f"{r.ms_per_request:.2f}",
+                f"{r.body_bytes / 1024:.0f}",
+            )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,114 @@
+"""Cold import time of the app, with a budget for CI.
+
+Imports ``src.app`` in fresh interpreters under ``python -X importtime``
+and reports the median cumulative time along with the packages that cost
+the most. Provider SDKs are imported lazily, when a model or AWS client
+is first built, so importing the app must not pull them in.
+
+    python -m benchmarks.startup --repeat 5 --budget-ms 2000
+
+Exits with status 1 when the median exceeds the budget or a deferred
+package was imported, so it can gate a CI job. tests/test_startup.py
+runs the same check against ``BUDGET_MS``.
+"""
+
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from typing import Annotated, Final, NamedTuple
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+app = typer.Typer()
+
+MODULE = "src.app"
+# Imported on first use only; see create_model and the AWS wrappers.
+DEFERRED = ("anthropic", "boto3", "botocore")
+BUDGET_MS: Final[float] = 2000.0
+
+
+class ImportTime(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse(stderr: str) -> list[ImportTime]:
+    times: list[ImportTime] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times.append(ImportTime(name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+def import_once(module: str) -> list[ImportTime]:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse(result.stderr)
+
+
+def by_package(times: list[ImportTime]) -> Counter[str]:
+    packages: Counter[str] = Counter()
+    for t in times:
+        packages[t.name.partition(".")[0]] += t.self_us
+    return packages
+
+
+def cumulative_ms(times: list[ImportTime], module: str = MODULE) -> float:
+    return next(t.cumulative_us for t in times if t.name == module) / 1000
+
+
+def eager_imports(times: list[ImportTime]) -> list[str]:
+    """Deferred packages that were imported anyway."""
+    return sorted(set(DEFERRED) & by_package(times).keys())
+
+
+@app.command()
+def main(
+    repeat: Annotated[int, typer.Option(min=1)] = 5,
+    top: Annotated[int, typer.Option(min=1)] = 15,
+    budget_ms: Annotated[
+        float | None,
+        typer.Option(help="Fail when the median import exceeds this."),
+    ] = None,
+) -> None:
+    runs = [import_once(MODULE) for _ in range(repeat)]
+    totals = [cumulative_ms(run) for run in runs]
+    median = statistics.median(totals)
+
+    table = Table(title=f"import {MODULE}, median of {repeat}")
+    table.add_column("package")
+    table.add_column("self ms", justify="right")
+    fastest = runs[totals.index(min(totals))]
+    packages = by_package(fastest)
+    for package, self_us in packages.most_common(top):
+        table.add_row(package, f"{self_us / 1000:.1f}")
+    console = Console()
+    console.print(table)
+    console.print(
+        f"{MODULE}: {median:.0f} ms median, "
+        f"{min(totals):.0f}-{max(totals):.0f} ms"
+    )
+
+    failed = False
+    if leaked := eager_imports(fastest):
+        console.print(f"[red]Imported eagerly: {', '.join(leaked)}[/red]")
+        failed = True
+    if budget_ms is not None and median > budget_ms:
+        console.print(f"[red]Over the {budget_ms:.0f} ms budget[/red]")
+        failed = True
+    if failed:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,184 @@
+"""In-process stand-ins for Claude, Bedrock and Textract with latency.
+
+The boto3 stubs implement just the calls ``BedrockCohereEmbeddings`` and
+``Textract`` make and are passed to them as ``client``. They block for
+their latency like the real clients would, so they occupy the executor
+threads the app runs them on. The model is a pydantic-ai
+``FunctionModel`` that calls the roulette tool once and then answers.
+"""
+
+import asyncio
+import hashlib
+import io
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from pydantic_ai import ModelMessage, ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from src.embeddings.cohere import BedrockCohereEmbeddings
+
+WORDS = [
+    "lorem",
+    "ipsum",
+    "dolor",
+    "sit",
+    "amet",
+    "consectetur",
+    "adipiscing",
+    "elit",
+    "sed",
+    "eiusmod",
+    "tempor",
+    "incididunt",
+    "labore",
+    "dolore",
+    "magna",
+    "aliqua",
+]
+
+
+@dataclass
+class Latency:
+    """Seconds per call: ``base`` plus up to ``jitter`` uniformly at random."""
+
+    base: float = 0.0
+    jitter: float = 0.0
+
+    def sample(self) -> float:
+        return self.base + random.uniform(0, self.jitter)  # noqa: S311
+
+    def block(self) -> None:
+        time.sleep(self.sample())
+
+    async def wait(self) -> None:
+        await asyncio.sleep(self.sample())
+
+
+def embed_text(text: str, dimension: int) -> list[float]:
+    """A unit vector seeded by the text, so equal texts embed equally."""
+    seed = int.from_bytes(
+        hashlib.blake2b(text.encode(), digest_size=8).digest()
+    )
+    vector = np.random.default_rng(seed).standard_normal(dimension)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class StubBedrockRuntime:
+    """``invoke_model`` for the Cohere embedding model."""
+
+    latency: Latency
+    calls: int
+
+    def __init__(self, latency: Latency | None = None) -> None:
+        self.latency = latency or Latency()
+        self.calls = 0
+
+    def invoke_model(self, *, body: str, **kwargs: Any) -> dict[str, Any]:
+        self.latency.block()
+        self.calls += 1
+        request = json.loads(body)
+        dimension = request.get(
+            "output_dimension", BedrockCohereEmbeddings.DEFAULT_OUTPUT_DIMENSION
+        )
+        response = {
+            "id": f"stub-{self.calls}",
+            "response_type": "embeddings_floats",
+            "embeddings": [embed_text(t, dimension) for t in request["texts"]],
+        }
+        return {"body": io.BytesIO(json.dumps(response).encode())}
+
+
+class StubTextract:
+    """Asynchronous text detection that succeeds on the first poll.
+
+    Every job gets different text drawn from a fixed pool of paragraphs,
+    so re-ingested documents mostly change and a share of their chunks
+    are near duplicates of other documents'.
+    """
+
+    latency: Latency
+    pages: int
+    lines_per_page: int
+    pages_per_response: int
+
+    def __init__(
+        self,
+        latency: Latency | None = None,
+        pages: int = 10,
+        lines_per_page: int = 40,
+        pages_per_response: int = 5,
+        paragraphs: int = 200,
+    ) -> None:
+        self.latency = latency or Latency()
+        self.pages = pages
+        self.lines_per_page = lines_per_page
+        self.pages_per_response = pages_per_response
+        rng = random.Random(0)  # noqa: S311
+        self._paragraphs = [
+            [
+                " ".join(rng.choices(WORDS, k=12))
+                for _ in range(lines_per_page // 4)
+            ]
+            for _ in range(paragraphs)
+        ]
+        self._jobs = itertools.count()
+
+    def start_document_text_detection(self, **kwargs: Any) -> dict[str, Any]:
+        self.latency.block()
+        return {"JobId": f"job-{next(self._jobs)}"}
+
+    def _lines(self, job_id: str) -> list[str]:
+        rng = random.Random(job_id)  # noqa: S311
+        lines: list[str] = []
+        while len(lines) < self.pages * self.lines_per_page:
+            lines.extend(rng.choice(self._paragraphs))
+        return lines[: self.pages * self.lines_per_page]
+
+    def get_document_text_detection(
+        self,
+        *,
+        JobId: str,  # noqa: N803
+        NextToken: str | None = None,  # noqa: N803
+    ) -> dict[str, Any]:
+        self.latency.block()
+        first = int(NextToken or 0)
+        last = min(first + self.pages_per_response, self.pages)
+        lines = self._lines(JobId)
+        response: dict[str, Any] = {
+            "JobStatus": "SUCCEEDED",
+            "Blocks": [
+                {
+                    "BlockType": "LINE",
+                    "Page": page + 1,
+                    "Text": lines[page * self.lines_per_page + i],
+                }
+                for page in range(first, last)
+                for i in range(self.lines_per_page)
+            ],
+        }
+        if last < self.pages:
+            response["NextToken"] = str(last)
+        return response
+
+
+def create_model(latency: Latency | None = None) -> FunctionModel:
+    """Calls the roulette tool, then answers, waiting on every request."""
+    latency = latency or Latency()
+
+    async def answer(
+        messages: list[ModelMessage], info: AgentInfo
+    ) -> ModelResponse:
+        await latency.wait()
+        if messages[-1].parts[-1].part_kind == "user-prompt":
+            return ModelResponse(
+                parts=[ToolCallPart("roulette_wheel", {"square": 7})]
+            )
+        return ModelResponse(parts=[TextPart("You won. " + "ipsum " * 80)])
+
+    return FunctionModel(answer, model_name="benchmark")
@@ -0,0 +1,4 @@
+#!/bin/bash
+# Allow the db-replica service to stream WAL from this instance.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
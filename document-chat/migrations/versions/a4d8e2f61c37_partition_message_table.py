@@ -0,0 +1,204 @@
+"""Partition message table by month and add message archive table
+
+Revision ID: a4d8e2f61c37
+Revises: 5e9a7c3d20f1
+Create Date: 2025-12-09 10:18:44.502913
+
+The existing messages are copied into the partitioned table, which takes
+as long as copying the table does. Partitions are created from the month
+of the oldest message to three months ahead; the app creates later ones.
+Downgrading copies the live messages back; archived ones are not restored.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa  # noqa
+from alembic import op  # noqa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d8e2f61c37"
+down_revision: str | Sequence[str] | None = "5e9a7c3d20f1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COLUMNS = "id, chat_id, role, content, created_at, system, usage, model"
+
+# Same naming and bounds as src/archive/partitions.py.
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month timestamptz;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce(min(created_at), now())),
+            date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        )
+        FROM message_unpartitioned
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF message FOR VALUES FROM (%L) TO (%L)',
+            'message_y' || to_char(month, 'YYYY"m"MM'),
+            month,
+            month + interval '1 month'
+        );
+    END LOOP;
+END
+$$
+"""
+
+
+def _message_columns() -> list[sa.Column]:
+    return [
+        sa.Column("chat_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "role",
+            postgresql.ENUM(
+                "USER", "AI", name="messagerole", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "content", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True, precision=6),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("system", sa.Text(), nullable=True),
+        sa.Column(
+            "usage", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        sa.Column("model", sa.Text(), nullable=True),
+        sa.Column(
+            "id",
+            sa.Uuid(),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["chat_id"],
+            ["chat.id"],
+            name=op.f("fk_message_chat_id_chat"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partitions are monthly in UTC, whatever the server's time zone.
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    with op.batch_alter_table("message_embedding", schema=None) as batch_op:
+        batch_op.drop_constraint(
+            "fk_message_embedding_message_id_message", type_="foreignkey"
+        )
+
+    with op.batch_alter_table("message", schema=None) as batch_op:
+        batch_op.drop_index("ix_message_chat_id_created_at_id")
+    op.rename_table("message", "message_unpartitioned")
+    # Frees the name if the key was named by convention.
+    op.execute(
+        "ALTER INDEX IF EXISTS pk_message RENAME TO pk_message_unpartitioned"
+    )
+
+    op.create_table(
+        "message",
+        *_message_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at", name=op.f("pk_message")),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    with op.batch_alter_table("message", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_message_chat_id_created_at_id",
+            ["chat_id", "created_at", "id"],
+            unique=False,
+        )
+    op.execute(CREATE_PARTITIONS)
+    op.execute(
+        f"INSERT INTO message ({COLUMNS}) "  # noqa: S608
+        f"SELECT {COLUMNS} FROM message_unpartitioned"
+    )
+    op.drop_table("message_unpartitioned")
+
+    op.create_table(
+        "message_archive",
+        sa.Column("chat_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "period_start",
+            postgresql.TIMESTAMP(timezone=True, precision=6),
+            nullable=False,
+        ),
+        sa.Column(
+            "period_end",
+            postgresql.TIMESTAMP(timezone=True, precision=6),
+            nullable=False,
+        ),
+        sa.Column("uri", sa.VARCHAR(length=1024), nullable=False),
+        sa.Column("messages", sa.Integer(), nullable=False),
+        sa.Column(
+            "archived_at",
+            postgresql.TIMESTAMP(timezone=True, precision=6),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["chat_id"],
+            ["chat.id"],
+            name=op.f("fk_message_archive_chat_id_chat"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "chat_id", "period_start", name=op.f("pk_message_archive")
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("message_archive")
+
+    with op.batch_alter_table("message", schema=None) as batch_op:
+        batch_op.drop_index("ix_message_chat_id_created_at_id")
+    op.rename_table("message", "message_partitioned")
+    op.execute(
+        "ALTER TABLE message_partitioned "
+        "RENAME CONSTRAINT pk_message TO pk_message_partitioned"
+    )
+
+    op.create_table(
+        "message",
+        *_message_columns(),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_message")),
+    )
+    with op.batch_alter_table("message", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_message_chat_id_created_at_id",
+            ["chat_id", "created_at", "id"],
+            unique=False,
+        )
+    op.execute(
+        f"INSERT INTO message ({COLUMNS}) "  # noqa: S608
+        f"SELECT {COLUMNS} FROM message_partitioned"
+    )
+    op.drop_table("message_partitioned")
+
+    op.execute(
+        "DELETE FROM message_embedding e WHERE NOT EXISTS "
+        "(SELECT FROM message m WHERE m.id = e.message_id)"
+    )
+    with op.batch_alter_table("message_embedding", schema=None) as batch_op:
+        batch_op.create_foreign_key(
+            "fk_message_embedding_message_id_message",
+            "message",
+            ["message_id"],
+            ["id"],
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        )
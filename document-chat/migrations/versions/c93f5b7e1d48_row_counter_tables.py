@@ -0,0 +1,181 @@
+"""Row counter tables kept by triggers
+
+Revision ID: c93f5b7e1d48
+Revises: a4d8e2f61c37
+Create Date: 2025-12-10 09:41:27.318650
+
+Chats and messages are counted by statement triggers into sharded rows
+of table_row_count, and messages per chat into chat_message_count. The
+counters are filled from a scan of the tables, with writes to them
+blocked until the migration commits. Archiving drops partitions without
+firing triggers, so archived messages stay counted until their chat is
+deleted.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa  # noqa
+from alembic import op  # noqa
+
+# revision identifiers, used by Alembic.
+revision: str = "c93f5b7e1d48"
+down_revision: str | Sequence[str] | None = "a4d8e2f61c37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# COUNTER_SHARDS in src/models/counter.py.
+SHARDS = 16
+
+COUNT_ROWS = """
+CREATE FUNCTION count_rows() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    delta bigint;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSE
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    IF delta <> 0 THEN
+        INSERT INTO table_row_count AS t (table_name, shard, count)
+        VALUES (TG_TABLE_NAME, floor(random() * TG_ARGV[0]::int), delta)
+        ON CONFLICT (table_name, shard)
+        DO UPDATE SET count = t.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Rows are locked in chat_id order, so concurrent batches spanning the
+# same chats cannot deadlock.
+COUNT_CHAT_MESSAGES = """
+CREATE FUNCTION count_chat_messages() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO chat_message_count AS t (chat_id, count)
+        SELECT chat_id, count(*) FROM new_rows
+        GROUP BY chat_id ORDER BY chat_id
+        ON CONFLICT (chat_id) DO UPDATE SET count = t.count + EXCLUDED.count;
+    ELSE
+        UPDATE chat_message_count t SET count = t.count - d.count
+        FROM (
+            SELECT chat_id, count(*) AS count FROM old_rows GROUP BY chat_id
+        ) d
+        WHERE t.chat_id = d.chat_id;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+UNCOUNT_ARCHIVED_MESSAGES = """
+CREATE FUNCTION uncount_archived_messages() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    delta bigint;
+BEGIN
+    SELECT -coalesce(sum(messages), 0) INTO delta FROM old_rows;
+    IF delta <> 0 THEN
+        INSERT INTO table_row_count AS t (table_name, shard, count)
+        VALUES ('message', floor(random() * TG_ARGV[0]::int), delta)
+        ON CONFLICT (table_name, shard)
+        DO UPDATE SET count = t.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# (trigger, table, event, function call)
+TRIGGERS = [
+    ("chat_count_insert", "chat", "INSERT", f"count_rows({SHARDS})"),
+    ("chat_count_delete", "chat", "DELETE", f"count_rows({SHARDS})"),
+    ("message_count_insert", "message", "INSERT", f"count_rows({SHARDS})"),
+    ("message_count_delete", "message", "DELETE", f"count_rows({SHARDS})"),
+    ("message_count_chat_insert", "message", "INSERT", "count_chat_messages()"),
+    ("message_count_chat_delete", "message", "DELETE", "count_chat_messages()"),
+    (
+        "message_archive_count_delete",
+        "message_archive",
+        "DELETE",
+        f"uncount_archived_messages({SHARDS})",
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "table_row_count",
+        sa.Column("table_name", sa.VARCHAR(length=64), nullable=False),
+        sa.Column("shard", sa.SMALLINT(), nullable=False),
+        sa.Column("count", sa.BIGINT(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint(
+            "table_name", "shard", name=op.f("pk_table_row_count")
+        ),
+    )
+    op.create_table(
+        "chat_message_count",
+        sa.Column("chat_id", sa.Uuid(), nullable=False),
+        sa.Column("count", sa.BIGINT(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(
+            ["chat_id"],
+            ["chat.id"],
+            name=op.f("fk_chat_message_count_chat_id_chat"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("chat_id", name=op.f("pk_chat_message_count")),
+    )
+    # ### end Alembic commands ###
+
+    # Writes wait from here to the commit, so none is missed or counted
+    # twice between the backfill and the triggers.
+    op.execute("LOCK TABLE chat, message, message_archive IN SHARE MODE")
+    op.execute(COUNT_ROWS)
+    op.execute(COUNT_CHAT_MESSAGES)
+    op.execute(UNCOUNT_ARCHIVED_MESSAGES)
+    for name, table, event, function in TRIGGERS:
+        rows = (
+            "NEW TABLE AS new_rows"
+            if event == "INSERT"
+            else "OLD TABLE AS old_rows"
+        )
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON {table} "
+            f"REFERENCING {rows} FOR EACH STATEMENT "
+            f"EXECUTE FUNCTION {function}"
+        )
+
+    op.execute(
+        "INSERT INTO table_row_count (table_name, shard, count) "
+        "SELECT 'chat', 0, count(*) FROM chat"
+    )
+    op.execute(
+        "INSERT INTO table_row_count (table_name, shard, count) "
+        "SELECT 'message', 0, (SELECT count(*) FROM message) "
+        "+ (SELECT coalesce(sum(messages), 0) FROM message_archive)"
+    )
+    op.execute(
+        "INSERT INTO chat_message_count (chat_id, count) "
+        "SELECT chat_id, sum(count) FROM ("
+        "SELECT chat_id, count(*) AS count FROM message GROUP BY chat_id "
+        "UNION ALL SELECT chat_id, messages FROM message_archive"
+        ") c GROUP BY chat_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _ in reversed(TRIGGERS):
+        op.execute(f"DROP TRIGGER {name} ON {table}")
+    op.execute("DROP FUNCTION uncount_archived_messages()")
+    op.execute("DROP FUNCTION count_chat_messages()")
+    op.execute("DROP FUNCTION count_rows()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table("chat_message_count")
+    op.drop_table("table_row_count")
+    # ### end Alembic commands ###
@@ -0,0 +1,346 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Final
+
+from pydantic_ai import ModelMessage
+
+from src.core import settings
+from src.core.metrics import ADMISSION_WAIT_SECONDS
+
+logger = logging.getLogger("agents.admission")
+
+DEFAULT_MAX_CONCURRENCY: Final[int] = 16
+DEFAULT_MAX_QUEUE: Final[int] = 64
+DEFAULT_MAX_WAIT: Final[float] = 30.0
+DEFAULT_REQUESTS_PER_MINUTE: Final[int] = 50
+DEFAULT_INPUT_TOKENS_PER_MINUTE: Final[int] = 50_000
+DEFAULT_OUTPUT_TOKENS_PER_MINUTE: Final[int] = 10_000
+DEFAULT_INPUT_TOKENS_ESTIMATE: Final[int] = 2_000
+DEFAULT_OUTPUT_TOKENS_ESTIMATE: Final[int] = 500
+# Weight of the latest turn in the running usage and duration estimates.
+ESTIMATE_SMOOTHING: Final[float] = 0.2
+
+type AgentRunner = Callable[[], Awaitable[list[ModelMessage]]]
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a turn cannot be admitted; carries the HTTP answer."""
+
+    status_code: int
+    retry_after: float
+
+    def __init__(self, message: str, status_code: int, retry_after: float):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most one minute of budget.
+
+    The level may go negative when actual usage exceeds what was
+    reserved; later callers then wait for the debt to be paid back.
+    """
+
+    capacity: float
+    rate: float
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self._level = per_minute
+        self._updated = time.monotonic()
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self._level
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken."""
+        # A reservation larger than the bucket could never be satisfied;
+        # let it through on a full bucket and pay the rest as debt.
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0.0) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._level -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier ``take`` by ``amount`` (negative refunds)."""
+        self.take(amount)
+        self._level = min(self._level, self.capacity)
+
+
+@dataclass
+class Reservation:
+    requests: int
+    input_tokens: int
+    output_tokens: int
+    waited: float
+
+
+@dataclass
+class _Waiter:
+    admitted: asyncio.Future[Reservation] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class AdmissionStats:
+    active: int
+    queued: int
+    admitted: int
+    rejected: int
+    timed_out: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    requests_available: float
+    input_tokens_available: float
+    output_tokens_available: float
+
+    @property
+    def wait_seconds_mean(self) -> float:
+        return self.wait_seconds_total / self.admitted if self.admitted else 0.0
+
+
+def get_usage(messages: Sequence[ModelMessage]) -> tuple[int, int, int]:
+    """Model requests, input tokens and output tokens spent on a turn."""
+    requests = input_tokens = output_tokens = 0
+    for message in messages:
+        if message.kind == "response":
+            requests += 1
+            input_tokens += message.usage.input_tokens
+            output_tokens += message.usage.output_tokens
+    return requests, input_tokens, output_tokens
+
+
+class AdmissionController:
+    """Process-wide gate in front of the model provider.
+
+    A turn is admitted once a concurrency slot is free and the request,
+    input token and output token buckets can cover its estimated cost.
+    Token estimates follow the usage actually reported by the provider,
+    and each reservation is corrected once the turn has finished. Turns
+    that cannot start right away wait in FIFO order in a bounded queue;
+    a full queue or an expired deadline is rejected with a retry hint
+    instead of letting the provider answer with 429s.
+    """
+
+    max_concurrency: int
+    max_queue: int
+    max_wait: float
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        input_tokens_per_minute: int = DEFAULT_INPUT_TOKENS_PER_MINUTE,
+        output_tokens_per_minute: int = DEFAULT_OUTPUT_TOKENS_PER_MINUTE,
+        input_tokens_estimate: int = DEFAULT_INPUT_TOKENS_ESTIMATE,
+        output_tokens_estimate: int = DEFAULT_OUTPUT_TOKENS_ESTIMATE,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.requests = TokenBucket(requests_per_minute)
+        self.input_tokens = TokenBucket(input_tokens_per_minute)
+        self.output_tokens = TokenBucket(output_tokens_per_minute)
+        self._input_estimate = float(input_tokens_estimate)
+        self._output_estimate = float(output_tokens_estimate)
+        self._duration_estimate = 1.0
+        self._waiters: deque[_Waiter] = deque()
+        self._active = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return sum(not w.admitted.done() for w in self._waiters)
+
+    def _cost(self) -> tuple[int, int, int]:
+        return 1, round(self._input_estimate), round(self._output_estimate)
+
+    def _delay(self) -> float:
+        requests, input_tokens, output_tokens = self._cost()
+        return max(
+            self.requests.delay(requests),
+            self.input_tokens.delay(input_tokens),
+            self.output_tokens.delay(output_tokens),
+        )
+
+    def _retry_after(self, position: int) -> float:
+        """Rough time until a turn at ``position`` in the queue would run."""
+        cost = self._cost()
+        rate_wait = max(
+            max(amount * position - bucket.level, 0.0) / bucket.rate
+            for bucket, amount in zip(
+                (self.requests, self.input_tokens, self.output_tokens),
+                cost,
+                strict=True,
+            )
+        )
+        slot_wait = (
+            self._duration_estimate
+            * max(self._active + position - self.max_concurrency, 0)
+            / self.max_concurrency
+        )
+        return max(rate_wait, slot_wait, 1.0)
+
+    def _admit(self, waited: float) -> Reservation:
+        requests, input_tokens, output_tokens = self._cost()
+        self.requests.take(requests)
+        self.input_tokens.take(input_tokens)
+        self.output_tokens.take(output_tokens)
+        self._active += 1
+        self._admitted += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        if settings.METRICS_ENABLED:
+            ADMISSION_WAIT_SECONDS.observe(waited)
+        return Reservation(requests, input_tokens, output_tokens, waited)
+
+    def _dispatch(self) -> None:
+        """Admit queued turns in order for as long as capacity allows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.admitted.done():
+                self._waiters.popleft()
+                continue
+            if self._active >= self.max_concurrency:
+                # release() dispatches again when a slot frees up.
+                return
+            delay = self._delay()
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                return
+            self._waiters.popleft()
+            waiter.admitted.set_result(
+                self._admit(time.monotonic() - waiter.enqueued_at)
+            )
+
+    async def acquire(self) -> Reservation:
+        # Timed-out and cancelled waiters stay queued until dispatched past,
+        # so only count the live ones.
+        queued = self.queued
+        if not queued and (
+            self._active < self.max_concurrency and self._delay() <= 0
+        ):
+            return self._admit(0.0)
+        if queued >= self.max_queue:
+            self._rejected += 1
+            logger.warning(
+                "Admission queue full (%d waiting), rejecting turn", queued
+            )
+            raise AdmissionRejectedError(
+                "Too many chat turns are waiting for the model.",
+                status_code=429,
+                retry_after=self._retry_after(queued + 1),
+            )
+        waiter = _Waiter()
+        self._waiters.append(waiter)
+        self._dispatch()
+        try:
+            async with asyncio.timeout(self.max_wait):
+                return await asyncio.shield(waiter.admitted)
+        except TimeoutError:
+            if waiter.admitted.done():
+                # Admitted in the same tick the deadline fired.
+                return waiter.admitted.result()
+            waiter.admitted.cancel()
+            self._timed_out += 1
+            logger.warning(
+                "Turn waited %.1fs for model capacity, giving up",
+                self.max_wait,
+            )
+            raise AdmissionRejectedError(
+                "Timed out waiting for model capacity.",
+                status_code=503,
+                retry_after=self._retry_after(self.queued),
+            ) from None
+        except asyncio.CancelledError:
+            if waiter.admitted.done() and not waiter.admitted.cancelled():
+                self.release(waiter.admitted.result())
+            else:
+                waiter.admitted.cancel()
+            raise
+
+    def release(
+        self,
+        reservation: Reservation,
+        messages: Sequence[ModelMessage] | None = None,
+        duration: float | None = None,
+    ) -> None:
+        """Free the slot and settle the reservation against actual usage."""
+        self._active -= 1
+        if messages is not None:
+            requests, input_tokens, output_tokens = get_usage(messages)
+            self.requests.adjust(requests - reservation.requests)
+            self.input_tokens.adjust(input_tokens - reservation.input_tokens)
+            self.output_tokens.adjust(output_tokens - reservation.output_tokens)
+            if requests:
+                a = ESTIMATE_SMOOTHING
+                self._input_estimate += a * (
+                    input_tokens - self._input_estimate
+                )
+                self._output_estimate += a * (
+                    output_tokens - self._output_estimate
+                )
+        if duration is not None:
+            self._duration_estimate += ESTIMATE_SMOOTHING * (
+                duration - self._duration_estimate
+            )
+        self._dispatch()
+
+    async def run(self, runner: AgentRunner) -> list[ModelMessage]:
+        reservation = await self.acquire()
+        messages: list[ModelMessage] | None = None
+        start = time.perf_counter()
+        try:
+            messages = await runner()
+            return messages
+        finally:
+            self.release(reservation, messages, time.perf_counter() - start)
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            active=self.active,
+            queued=self.queued,
+            admitted=self._admitted,
+            rejected=self._rejected,
+            timed_out=self._timed_out,
+            wait_seconds_total=self._wait_total,
+            wait_seconds_max=self._wait_max,
+            requests_available=self.requests.level,
+            input_tokens_available=self.input_tokens.level,
+            output_tokens_available=self.output_tokens.level,
+        )
@@ -0,0 +1,274 @@
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
+from dataclasses import dataclass
+
+from pydantic_ai import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    UserPromptPart,
+)
+
+from src.embeddings.cohere import BedrockCohereEmbeddings
+
+logger = logging.getLogger("agents.cache")
+
+DEFAULT_THRESHOLD = 0.95
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_CHATS = 4096
+
+type DocumentVersions = Mapping[str, str]
+type AgentRunner = Callable[[], Awaitable[list[ModelMessage]]]
+
+
+@dataclass
+class CacheEntry:
+    scope: Hashable
+    document_versions: tuple[tuple[str, str], ...]
+    embedding: list[float]
+    answer: str
+    model: str | None
+    latency: float
+    expires_at: float
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    latency_saved: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class CacheHit:
+    entry: CacheEntry
+    similarity: float
+
+
+def normalize(vector: Sequence[float]) -> list[float]:
+    norm = math.sqrt(math.fsum(v * v for v in vector))
+    if not norm:
+        return list(vector)
+    return [v / norm for v in vector]
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return math.sumprod(a, b)
+
+
+def get_answer(messages: Sequence[ModelMessage]) -> str | None:
+    for message in reversed(messages):
+        if message.kind == "response":
+            texts = [p.content for p in message.parts if p.part_kind == "text"]
+            return "\n".join(texts) if texts else None
+    return None
+
+
+class SemanticResponseCache:
+    """Answers of earlier turns, reused for similar questions in the same
+    scope.
+
+    The chatbot scopes entries to the conversation history, so in practice
+    only first turns hit, across chats opening with similar questions;
+    later turns of a chat almost never do. Hit statistics are kept for
+    the ``max_chats`` most recently active chats.
+    """
+
+    embeddings: BedrockCohereEmbeddings
+    threshold: float
+    ttl: int
+    max_entries: int
+    max_chats: int
+
+    def __init__(
+        self,
+        embeddings: BedrockCohereEmbeddings | None = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl: int = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_chats: int = DEFAULT_MAX_CHATS,
+    ) -> None:
+        self.embeddings = embeddings or BedrockCohereEmbeddings()
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_chats = max_chats
+        self._entries: OrderedDict[uuid.UUID, CacheEntry] = OrderedDict()
+        self._buckets: defaultdict[Hashable, set[uuid.UUID]] = defaultdict(set)
+        self._documents: defaultdict[str, set[uuid.UUID]] = defaultdict(set)
+        self._stats: OrderedDict[uuid.UUID, CacheStats] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _bucket_key(
+        scope: Hashable, document_versions: tuple[tuple[str, str], ...]
+    ) -> Hashable:
+        return (scope, document_versions)
+
+    async def embed(self, query: str) -> list[float]:
+        return normalize(await self.embeddings.aembed_query(query))
+
+    def _remove(self, entry_id: uuid.UUID) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        key = self._bucket_key(entry.scope, entry.document_versions)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.discard(entry_id)
+            if not bucket:
+                del self._buckets[key]
+        for document_id, _ in entry.document_versions:
+            ids = self._documents.get(document_id)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._documents[document_id]
+
+    def lookup(
+        self,
+        embedding: Sequence[float],
+        scope: Hashable,
+        document_versions: DocumentVersions | None = None,
+    ) -> CacheHit | None:
+        versions = tuple(sorted((document_versions or {}).items()))
+        bucket = self._buckets.get(self._bucket_key(scope, versions))
+        if bucket is None:
+            return None
+        now = time.monotonic()
+        best: tuple[uuid.UUID, float] | None = None
+        for entry_id in list(bucket):
+            entry = self._entries[entry_id]
+            if entry.expires_at <= now:
+                self._remove(entry_id)
+                continue
+            similarity = dot(embedding, entry.embedding)
+            if similarity >= self.threshold and (
+                best is None or similarity > best[1]
+            ):
+                best = (entry_id, similarity)
+        if best is None:
+            return None
+        self._entries.move_to_end(best[0])
+        return CacheHit(self._entries[best[0]], best[1])
+
+    def store(
+        self,
+        embedding: list[float],
+        answer: str,
+        scope: Hashable,
+        document_versions: DocumentVersions | None = None,
+        model: str | None = None,
+        latency: float = 0.0,
+    ) -> None:
+        versions = tuple(sorted((document_versions or {}).items()))
+        entry_id = uuid.uuid4()
+        self._entries[entry_id] = CacheEntry(
+            scope=scope,
+            document_versions=versions,
+            embedding=embedding,
+            answer=answer,
+            model=model,
+            latency=latency,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._buckets[self._bucket_key(scope, versions)].add(entry_id)
+        for document_id, _ in versions:
+            self._documents[document_id].add(entry_id)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate_document(self, document_id: str) -> int:
+        entry_ids = list(self._documents.get(document_id, ()))
+        for entry_id in entry_ids:
+            self._remove(entry_id)
+        if entry_ids:
+            logger.info(
+                "Invalidated %d cache entries for document %s",
+                len(entry_ids),
+                document_id,
+            )
+        return len(entry_ids)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+        self._documents.clear()
+
+    def _chat_stats(self, chat_id: uuid.UUID) -> CacheStats:
+        stats = self._stats.get(chat_id)
+        if stats is None:
+            stats = self._stats[chat_id] = CacheStats()
+            while len(self._stats) > self.max_chats:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(chat_id)
+        return stats
+
+    def stats(self, chat_id: uuid.UUID) -> CacheStats:
+        return self._stats.get(chat_id) or CacheStats()
+
+    async def run(
+        self,
+        chat_id: uuid.UUID,
+        user_input: str,
+        runner: AgentRunner,
+        scope: Hashable,
+        document_versions: DocumentVersions | None = None,
+    ) -> list[ModelMessage]:
+        stats = self._chat_stats(chat_id)
+        start = time.perf_counter()
+        embedding = await self.embed(user_input)
+        hit = self.lookup(embedding, scope, document_versions)
+        if hit is not None:
+            elapsed = time.perf_counter() - start
+            stats.hits += 1
+            stats.latency_saved += max(hit.entry.latency - elapsed, 0.0)
+            logger.debug(
+                "Semantic cache hit for chat %s (similarity %.4f)",
+                chat_id,
+                hit.similarity,
+            )
+            return [
+                ModelRequest(parts=[UserPromptPart(user_input)]),
+                ModelResponse(
+                    parts=[TextPart(hit.entry.answer)],
+                    model_name=hit.entry.model,
+                ),
+            ]
+
+        stats.misses += 1
+        messages = await runner()
+        answer = get_answer(messages)
+        if answer is not None:
+            model = next(
+                (
+                    m.model_name
+                    for m in reversed(messages)
+                    if m.kind == "response"
+                ),
+                None,
+            )
+            self.store(
+                embedding,
+                answer,
+                scope,
+                document_versions,
+                model=model,
+                latency=time.perf_counter() - start,
+            )
+        return messages
@@ -1,72 +1,26 @@
-import logging
-import sys
-from collections.abc import Mapping, Sequence
-from dataclasses import dataclass
+import hashlib
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from dataclasses import astuple, dataclass
+from functools import cache
 from typing import Any
 
-from pydantic_ai import Agent, ModelMessage, RunContext
-from pydantic_ai.models.anthropic import AnthropicModel, AnthropicModelSettings
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
-
-
-def create_panel(
-    console: Console, data: object, title: str | Text | None = None
-) -> str:
-    with console.capture() as cap:
-        console.print(data)
-    text = Text.from_ansi(cap.get())
-    if isinstance(title, str):
-        title = Text.assemble((title, "bright_blue"))
-    panel = Panel(text, title=title, border_style="bright_yellow")
-    with console.capture() as cap:
-        console.print(panel)
-    return cap.get()
-
-
-class FilterNonAnthropicRequests(logging.Filter):
-    def filter(self, record: logging.LogRecord) -> bool | logging.LogRecord:
-        return (
-            record.name == "anthropic._base_client"
-            and "Request options" in record.msg
-        )
-
-
-class AnthropicRequestFormatter(logging.Formatter):
-    def __init__(
-        self,
-        console: Console | None = None,
-        fmt: str | None = None,
-        datefmt: str | None = None,
-        style: str = "%",
-        validate: bool = True,
-        *,
-        defaults: Mapping[str, Any] | None = None,
-    ) -> None:
-        super().__init__(fmt, datefmt, style, validate, defaults=defaults)  # type: ignore
-        self.console = console or Console()
-
-    def format(self, record: logging.LogRecord) -> str:
-        return create_panel(
-            self.console,
-            record.args,
-            "Anthropic Request",
-        )
-
-
-def init_logging(console: Console | None = None, level: int = logging.DEBUG):
-    logger_filter = FilterNonAnthropicRequests()
-    logger_formatter = AnthropicRequestFormatter(console)
-    logger_handler = logging.StreamHandler(sys.stdout)
-    logger_handler.setFormatter(logger_formatter)
-    logger_handler.addFilter(logger_filter)
-    logging.basicConfig(level=level, handlers=[logger_handler])
-    logger = logging.getLogger()
-    return logger
-
-
-init_logging()
+from pydantic_ai import (
+    Agent,
+    FunctionToolset,
+    ModelMessage,
+    PartDeltaEvent,
+    PartStartEvent,
+    RunContext,
+    TextPart,
+    TextPartDelta,
+    WrapperToolset,
+)
+from pydantic_ai.toolsets import ToolsetTool
+from pydantic_core import to_json
+
+from src.agents.routing import get_model
+from src.core import settings
+from src.core.metrics import stage
 
 
 @dataclass
@@ -79,25 +33,95 @@ async def roulette_wheel(ctx: RunContext[ChatbotDeps], square: int) -> str:
     return "winner" if square == ctx.deps.n else "loser"
 
 
+class MeteredToolset(WrapperToolset[ChatbotDeps]):
+    """Times each tool call."""
+
+    async def call_tool(
+        self,
+        name: str,
+        tool_args: dict[str, Any],
+        ctx: RunContext[ChatbotDeps],
+        tool: ToolsetTool[ChatbotDeps],
+    ) -> Any:
+        with stage("tool_call"):
+            return await super().call_tool(name, tool_args, ctx, tool)
+
+
+def get_cache_scope(
+    deps: ChatbotDeps, history: Sequence[ModelMessage]
+) -> Hashable:
+    """Answers depend on the conversation so far, so turns share cache
+    entries only when their history reads the same, like first turns."""
+    digest = hashlib.sha256()
+    for message in history:
+        for part in message.parts:
+            digest.update(
+                to_json(
+                    (
+                        message.kind,
+                        part.part_kind,
+                        getattr(part, "tool_name", None),
+                        getattr(part, "content", None),
+                        getattr(part, "args", None),
+                    )
+                )
+            )
+    return ("chatbot", *astuple(deps), digest.hexdigest())
+
+
 def init_agent():
-    model = AnthropicModel(
-        "claude-haiku-4-5-20251001",
-        settings=AnthropicModelSettings(temperature=0, max_tokens=1 << 12),
-    )
     agent = Agent(
-        model,
+        get_model(),
         instructions="""You are a chatbot. Converse with the user friendly.""",
         deps_type=ChatbotDeps,
-        tools=[roulette_wheel],
+        toolsets=[MeteredToolset(FunctionToolset([roulette_wheel]))],
+        instrument=settings.OTEL_ENABLED,
     )
     return agent
 
 
+@cache
+def get_agent() -> Agent[ChatbotDeps, str]:
+    """The chat agent, built on first use and shared by all turns."""
+    return init_agent()
+
+
 async def run_agent(
     user_input: str,
     deps: ChatbotDeps,
     history: Sequence[ModelMessage] | None = None,
 ) -> list[ModelMessage]:
-    agent = init_agent()
+    agent = get_agent()
     response = await agent.run(user_input, deps=deps, message_history=history)
     return response.new_messages()
+
+
+async def stream_agent(
+    user_input: str,
+    deps: ChatbotDeps,
+    history: Sequence[ModelMessage] | None,
+    on_text: Callable[[str], Awaitable[None]],
+) -> list[ModelMessage]:
+    """Like ``run_agent``, handing text to ``on_text`` as it is generated."""
+    agent = get_agent()
+    async with agent.iter(
+        user_input, deps=deps, message_history=history
+    ) as run:
+        async for node in run:
+            if not Agent.is_model_request_node(node):
+                continue
+            async with node.stream(run.ctx) as stream:
+                async for event in stream:
+                    if (
+                        isinstance(event, PartStartEvent)
+                        and isinstance(event.part, TextPart)
+                        and event.part.content
+                    ):
+                        await on_text(event.part.content)
+                    elif isinstance(event, PartDeltaEvent) and isinstance(
+                        event.delta, TextPartDelta
+                    ):
+                        await on_text(event.delta.content_delta)
+    if run.result is None:
+        raise RuntimeError("Agent run ended without a result")
+    return run.result.new_messages()
@@ -0,0 +1,71 @@
+import uuid
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+
+from pydantic_ai import ModelMessage
+
+from src.agents.processor import processor
+from src.core.metrics import stage
+from src.core.shards import get_shard_router
+from src.dependencies.archive import get_message_archiver
+from src.models.message import Message
+from src.repositories import MessageRepository
+from src.repositories.buffer import MessageWriteBuffer
+from src.utils import Cursor
+
+
+class ChatConversation:
+    """A chat's history kept in memory for the lifetime of a connection.
+
+    The full history is loaded once; afterwards only messages written by
+    other clients since the last known one are pulled in, which is a
+    single index range scan that is normally empty.
+    """
+
+    chat_id: uuid.UUID
+    history: list[ModelMessage]
+
+    def __init__(self, chat_id: uuid.UUID) -> None:
+        self.chat_id = chat_id
+        self.history = []
+        self._known: set[uuid.UUID] = set()
+        self._last: Cursor | None = None
+
+    def _remember(self, keys: Iterable[tuple[uuid.UUID, datetime]]) -> None:
+        for id_, created_at in keys:
+            self._known.add(id_)
+            cursor = Cursor(created_at, id_)
+            if self._last is None or cursor > self._last:
+                self._last = cursor
+
+    async def catch_up(self, buffer: MessageWriteBuffer | None) -> None:
+        # Snapshot before reading so a flush racing the query can only
+        # cause duplicates, which are dropped by id, never gaps.
+        pending = buffer.pending(self.chat_id) if buffer is not None else []
+        with stage("history_query"):
+            shard = await get_shard_router().locate(self.chat_id)
+            async with shard.session_maker() as session:
+                rows = await MessageRepository(
+                    session, get_message_archiver()
+                ).list_history(self.chat_id, after=self._last)
+        with stage("history_convert"):
+            rows = [row for row in rows if row[0] not in self._known]
+            self.history += processor.process_history_from_db(rows)
+            self._remember((row[0], row[3]) for row in rows)
+            pending = [m for m in pending if m.id not in self._known]
+            self.extend(processor.process_messages_from_db(pending), pending)
+
+    def extend(
+        self, new_messages: Sequence[ModelMessage], messages: Sequence[Message]
+    ) -> None:
+        """Append a turn, given both as agent messages and as stored rows."""
+        self.history += new_messages
+        self._remember((m.id, m.created_at) for m in messages)
+
+    @classmethod
+    async def load(
+        cls, chat_id: uuid.UUID, buffer: MessageWriteBuffer | None
+    ) -> "ChatConversation":
+        conversation = cls(chat_id)
+        await conversation.catch_up(buffer)
+        return conversation
@@ -0,0 +1,85 @@
+import logging
+import uuid
+from collections.abc import Sequence
+
+from pydantic_ai import ModelMessage
+
+from src.agents.processor import processor
+from src.core.shards import get_shard_router
+from src.embeddings.cohere import BedrockCohereEmbeddings
+from src.models.memory import MessageEmbedding
+from src.models.message import Message
+from src.repositories import MessageEmbeddingRepository, MessageRepository
+
+logger = logging.getLogger("agents.memory")
+
+DEFAULT_RECENT_TURNS = 8
+DEFAULT_TOP_K = 4
+
+
+class ChatMemory:
+    embeddings: BedrockCohereEmbeddings
+    recent_turns: int
+    top_k: int
+
+    def __init__(
+        self,
+        embeddings: BedrockCohereEmbeddings | None = None,
+        recent_turns: int = DEFAULT_RECENT_TURNS,
+        top_k: int = DEFAULT_TOP_K,
+    ) -> None:
+        self.embeddings = embeddings or BedrockCohereEmbeddings()
+        self.recent_turns = recent_turns
+        self.top_k = top_k
+
+    async def load_history(
+        self,
+        messages_repo: MessageRepository,
+        memory_repo: MessageEmbeddingRepository,
+        chat_id: uuid.UUID,
+        user_input: str,
+        pending: Sequence[Message] = (),
+    ) -> list[ModelMessage]:
+        recent = await messages_repo.list_recent_messages(
+            chat_id, self.recent_turns
+        )
+        if pending:
+            known = {m.id for m in recent}
+            recent.extend(m for m in pending if m.id not in known)
+        history = processor.process_messages_from_db(recent)
+        if not recent or not self.top_k:
+            return history
+        embedding = await self.embeddings.aembed_query(user_input)
+        relevant = await memory_repo.search_messages(
+            chat_id, embedding, self.top_k, before=recent[0].created_at
+        )
+        memory = processor.process_memory_from_db(relevant)
+        return [memory, *history] if memory else history
+
+    async def index_messages(self, messages: list[Message]) -> None:
+        messages = [m for m in messages if m.text]
+        if not messages:
+            return
+        try:
+            vectors = await self.embeddings.aembed_documents(
+                [m.text for m in messages]
+            )
+            shard = await get_shard_router().locate(messages[0].chat_id)
+            async with shard.session_maker() as session:
+                await MessageEmbeddingRepository(session).create_embeddings(
+                    [
+                        MessageEmbedding(
+                            message_id=m.id,
+                            chat_id=m.chat_id,
+                            created_at=m.created_at,
+                            embedding=v,
+                        )
+                        for m, v in zip(messages, vectors, strict=True)
+                    ]
+                )
+        except Exception:
+            logger.exception(
+                "Failed to index %d messages of chat %s",
+                len(messages),
+                messages[0].chat_id,
+            )
@@ -1,5 +1,5 @@
 import uuid
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from datetime import datetime
 from typing import Any
 
@@ -20,10 +20,12 @@ from pydantic_ai import (
     ToolReturnPart,
     UserPromptPart,
 )
+from pydantic_core import from_json
 
 from src.models.message import (
     Message,
     MessageContent,
+    MessageHistoryRow,
     MessageRole,
     TextContent,
     ToolCallContent,
@@ -103,6 +105,27 @@ class ModelRequestProcessor:
                 )
         return ModelRequest(parts=parts)
 
+    def from_content(
+        self, content: list[MessageContent], created_at: datetime
+    ) -> ModelRequest:
+        parts: list[ModelRequestPart] = []
+        for c in content:
+            match c["type"]:
+                case "text":
+                    parts.append(
+                        UserPromptPart(c["text"], timestamp=created_at)
+                    )
+                case "tool_response":
+                    parts.append(
+                        ToolReturnPart(
+                            c["tool_name"],
+                            c["content"],
+                            c["tool_call_id"],
+                            timestamp=created_at,
+                        )
+                    )
+        return ModelRequest(parts=parts)
+
     def _get_message_content(
         self, message: ModelRequest
     ) -> list[MessageContent]:
@@ -211,6 +234,22 @@ class ModelResponseProcessor:
                 )
         return ModelResponse(parts=parts)
 
+    def from_content(
+        self, content: list[MessageContent], created_at: datetime
+    ) -> ModelResponse:
+        parts: list[ModelResponsePart] = []
+        for c in content:
+            match c["type"]:
+                case "text":
+                    parts.append(TextPart(c["text"]))
+                case "tool_call":
+                    parts.append(
+                        ToolCallPart(
+                            c["tool_name"], c["args"], c["tool_call_id"]
+                        )
+                    )
+        return ModelResponse(parts=parts, timestamp=created_at)
+
     def _get_message_content(
         self, message: ModelResponse
     ) -> list[MessageContent]:
@@ -254,6 +293,38 @@ class MessagesProcessor:
             for m in messages
         ]
 
+    def process_history_from_db(
+        self, rows: Iterable[MessageHistoryRow]
+    ) -> list[ModelMessage]:
+        """Decode history rows straight from their raw JSON content.
+
+        Skips building Message objects; each row's JSON is parsed once by
+        pydantic-core and walked once into model parts.
+        """
+        return [
+            self.request_processor.from_content(from_json(raw), created_at)
+            if role == MessageRole.USER
+            else self.response_processor.from_content(
+                from_json(raw), created_at
+            )
+            for _, role, raw, created_at in rows
+        ]
+
+    def process_memory_from_db(
+        self, messages: list[Message]
+    ) -> ModelRequest | None:
+        lines = [f"{m.role.value}: {m.text}" for m in messages if m.text]
+        if not lines:
+            return None
+        return ModelRequest(
+            parts=[
+                UserPromptPart(
+                    "Relevant earlier messages from this conversation:\n\n"
+                    + "\n\n".join(lines)
+                )
+            ]
+        )
+
     def process_messages_to_db(
         self, chat_id: uuid.UUID, messages: list[ModelMessage]
     ) -> list[Message]:
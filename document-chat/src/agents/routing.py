@@ -0,0 +1,344 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Final
+
+from pydantic_ai import ModelMessage, ModelResponse, RunContext
+from pydantic_ai.exceptions import FallbackExceptionGroup, ModelAPIError
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.fallback import FallbackModel
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from src.core import settings
+from src.core.metrics import record_tokens, stage
+
+logger = logging.getLogger("agents.routing")
+
+DEFAULT_HEDGE_WINDOW: Final[int] = 200
+# Below this many samples the configured delay is used as is.
+MIN_HEDGE_SAMPLES: Final[int] = 20
+
+
+type _Request = tuple[
+    list[ModelMessage],
+    ModelSettings | None,
+    ModelRequestParameters,
+    RunContext[Any] | None,
+]
+
+
+@dataclass
+class _Leg:
+    model: Model
+    started_at: float
+    ready: asyncio.Future[StreamedResponse] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+    release: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task[None] | None = None
+
+
+@dataclass(init=False)
+class HedgedModel(FallbackModel):
+    """Races the first token of several models.
+
+    The first model is asked right away. If it has not produced its first
+    token after the hedge delay, the next model is asked as well and
+    whichever streams first wins; the others are cancelled. A leg failing
+    with an error matched by ``fallback_on`` starts the next model
+    immediately, as ``FallbackModel`` would.
+
+    With ``hedge_quantile`` set, the delay follows that quantile of the
+    first model's recent time to first token once enough samples exist,
+    so only its slow tail is hedged.
+    """
+
+    hedge_delay: float
+    hedge_quantile: float | None
+
+    def __init__(
+        self,
+        default_model: Model,
+        *fallback_models: Model,
+        hedge_delay: float,
+        hedge_quantile: float | None = None,
+        hedge_window: int = DEFAULT_HEDGE_WINDOW,
+        fallback_on: Callable[[Exception], bool]
+        | tuple[type[Exception], ...] = (ModelAPIError,),
+    ) -> None:
+        super().__init__(
+            default_model, *fallback_models, fallback_on=fallback_on
+        )
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self._first_token: deque[float] = deque(maxlen=hedge_window)
+
+    @property
+    def model_name(self) -> str:
+        return f"hedged:{','.join(m.model_name for m in self.models)}"
+
+    @property
+    def system(self) -> str:
+        return f"hedged:{','.join(m.system for m in self.models)}"
+
+    def current_hedge_delay(self) -> float:
+        if (
+            self.hedge_quantile is None
+            or len(self._first_token) < MIN_HEDGE_SAMPLES
+        ):
+            return self.hedge_delay
+        samples = sorted(self._first_token)
+        index = min(int(self.hedge_quantile * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def _observe(self, leg: _Leg) -> None:
+        # A primary that lost is recorded at the time it was given up on,
+        # a lower bound that still pushes the quantile up.
+        self._first_token.append(time.monotonic() - leg.started_at)
+
+    async def _hold(
+        self,
+        leg: _Leg,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[Any] | None,
+    ) -> None:
+        # The stream is opened and closed by this task, so losers can be
+        # cancelled without touching the winner's connection.
+        try:
+            async with leg.model.request_stream(
+                messages, model_settings, model_request_parameters, run_context
+            ) as response:
+                leg.ready.set_result(response)
+                await leg.release.wait()
+        except Exception as e:
+            if leg.ready.done():
+                raise
+            leg.ready.set_exception(e)
+
+    def _launch(
+        self,
+        legs: list[_Leg],
+        models: Iterator[Model],
+        request: _Request,
+    ) -> bool:
+        model = next(models, None)
+        if model is None:
+            return False
+        leg = _Leg(model, time.monotonic())
+        leg.task = asyncio.create_task(self._hold(leg, *request))
+        legs.append(leg)
+        return True
+
+    async def _race(self, legs: list[_Leg], request: _Request) -> _Leg:
+        models = iter(self.models)
+        exceptions: list[Exception] = []
+        self._launch(legs, models, request)
+        delay = self.current_hedge_delay()
+        while True:
+            running = {leg.ready: leg for leg in legs if not leg.ready.done()}
+            if not running:
+                if self._launch(legs, models, request):
+                    continue
+                raise FallbackExceptionGroup(
+                    "All models from HedgedModel failed", exceptions
+                )
+            hedge_at = legs[-1].started_at + delay
+            done, _ = await asyncio.wait(
+                running,
+                timeout=max(hedge_at - time.monotonic(), 0.0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                if self._launch(legs, models, request):
+                    logger.info(
+                        "No first token after %.2fs, hedging with %s",
+                        delay,
+                        legs[-1].model.model_name,
+                    )
+                else:
+                    delay = float("inf")
+                continue
+            for ready in done:
+                leg = running[ready]
+                exc = ready.exception()
+                if exc is None:
+                    return leg
+                if not isinstance(exc, Exception) or not self._fallback_on(exc):
+                    raise exc
+                exceptions.append(exc)
+                logger.warning(
+                    "Model %s failed, failing over: %r",
+                    leg.model.model_name,
+                    exc,
+                )
+                self._launch(legs, models, request)
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[Any] | None = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        legs: list[_Leg] = []
+        winner: _Leg | None = None
+        try:
+            winner = await self._race(
+                legs,
+                (
+                    messages,
+                    model_settings,
+                    model_request_parameters,
+                    run_context,
+                ),
+            )
+            _, prepared = winner.model.prepare_request(
+                model_settings, model_request_parameters
+            )
+            self._set_span_attributes(winner.model, prepared)
+            yield winner.ready.result()
+        finally:
+            if legs and (legs[0] is winner or not legs[0].ready.done()):
+                self._observe(legs[0])
+            for leg in legs:
+                leg.release.set()
+                if leg is not winner and leg.task is not None:
+                    leg.task.cancel()
+            tasks = [leg.task for leg in legs if leg.task is not None]
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.warning("Closing a model stream failed: %r", result)
+            for leg in legs:
+                if not leg.ready.done():
+                    leg.ready.cancel()
+                elif not leg.ready.cancelled():
+                    leg.ready.exception()
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        # Streaming is what makes the first token observable; the response
+        # is assembled from the winning stream.
+        async with self.request_stream(
+            messages, model_settings, model_request_parameters
+        ) as response:
+            async for _ in response:
+                pass
+        return response.get()
+
+
+class MeteredModel(WrapperModel):
+    """Times each model request and counts its tokens by model."""
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        with stage("model"):
+            response = await self.wrapped.request(
+                messages, model_settings, model_request_parameters
+            )
+        record_tokens(
+            response.model_name,
+            response.usage.input_tokens,
+            response.usage.output_tokens,
+        )
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[Any] | None = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        with stage("model"):
+            async with self.wrapped.request_stream(
+                messages, model_settings, model_request_parameters, run_context
+            ) as response:
+                yield response
+        final = response.get()
+        record_tokens(
+            final.model_name,
+            final.usage.input_tokens,
+            final.usage.output_tokens,
+        )
+
+
+def create_model(spec: str) -> Model:
+    """Build a model from ``"<provider>:<model name>"``.
+
+    Provider SDKs are imported here rather than at module level, so only
+    the configured ones are loaded and only once a model is needed.
+    """
+    provider, _, name = spec.partition(":")
+    match provider:
+        case "anthropic":
+            from pydantic_ai.models.anthropic import (
+                AnthropicModel,
+                AnthropicModelSettings,
+            )
+            from pydantic_ai.providers.anthropic import AnthropicProvider
+
+            return AnthropicModel(
+                name,
+                provider=AnthropicProvider(
+                    base_url=settings.ANTHROPIC_BASE_URL
+                ),
+                settings=AnthropicModelSettings(
+                    temperature=settings.LLM_TEMPERATURE,
+                    max_tokens=settings.LLM_MAX_TOKENS,
+                ),
+            )
+        case "bedrock":
+            from pydantic_ai.models.bedrock import (
+                BedrockConverseModel,
+                BedrockModelSettings,
+            )
+            from pydantic_ai.providers.bedrock import BedrockProvider
+
+            return BedrockConverseModel(
+                name,
+                provider=BedrockProvider(base_url=settings.BEDROCK_BASE_URL),
+                settings=BedrockModelSettings(
+                    temperature=settings.LLM_TEMPERATURE,
+                    max_tokens=settings.LLM_MAX_TOKENS,
+                ),
+            )
+        case _:
+            raise ValueError(f"Unknown model provider in {spec!r}")
+
+
+def _route_models() -> Model:
+    primary = create_model(settings.LLM_MODEL)
+    fallbacks = [create_model(spec) for spec in settings.LLM_FALLBACK_MODELS]
+    if not fallbacks:
+        return primary
+    if settings.LLM_HEDGE_DELAY is None:
+        return FallbackModel(primary, *fallbacks)
+    return HedgedModel(
+        primary,
+        *fallbacks,
+        hedge_delay=settings.LLM_HEDGE_DELAY,
+        hedge_quantile=settings.LLM_HEDGE_QUANTILE,
+    )
+
+
+@cache
+def get_model() -> Model:
+    return MeteredModel(_route_models())
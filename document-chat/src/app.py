@@ -1,13 +1,87 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 load_dotenv()
 
+from src.agents.chatbot import get_agent
+from src.archive.archiver import ensure_partitions
+from src.aws.clients import get_aws_clients
+from src.core import dispose_engines, engine, prewarm_pool, settings
+from src.core.locks import lock_engine
+from src.core.log import setup_logging
+from src.core.profiling import ProfilingMiddleware
+from src.dependencies.buffer import get_message_buffer
+from src.dependencies.cache import get_semantic_cache
+from src.dependencies.documents import get_document_ingestor
+from src.dependencies.memory import get_chat_memory
+from src.dependencies.profiling import get_profiler
 from src.routers import api
 
-app = FastAPI()
+
+def prewarm_clients() -> None:
+    """Build what the first request needing it would otherwise build,
+    importing the provider SDKs and loading the AWS service models."""
+    get_agent()
+    get_document_ingestor()
+    get_chat_memory()
+    get_semantic_cache()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    listener = setup_logging(
+        settings.LOG_LEVEL,
+        settings.LOG_FORMAT,
+        settings.LOG_REQUEST_SAMPLE_RATE,
+    )
+    await ensure_partitions(settings.MESSAGE_PARTITION_MONTHS_AHEAD)
+    if settings.PREWARM_CLIENTS:
+        prewarm_clients()
+    if settings.SQLALCHEMY_POOL_PREWARM:
+        await prewarm_pool(
+            engine,
+            min(
+                settings.SQLALCHEMY_POOL_PREWARM, settings.SQLALCHEMY_POOL_SIZE
+            ),
+        )
+    buffer = get_message_buffer()
+    if buffer is not None:
+        buffer.start()
+    try:
+        yield
+    finally:
+        if buffer is not None:
+            await buffer.stop()
+        await dispose_engines()
+        await lock_engine.dispose()
+        get_aws_clients().close()
+        listener.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(prefix="/api", router=api)
 
+profiler = get_profiler()
+if profiler is not None:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=profiler,
+        token=settings.PROFILING_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        routes=settings.PROFILING_ROUTES,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 
 @app.get("/health-check")
 def health_check():
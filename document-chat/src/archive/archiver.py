@@ -0,0 +1,226 @@
+import asyncio
+import gzip
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Final
+
+from pydantic_core import from_json
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.archive.partitions import (
+    add_months,
+    month_start,
+    months_between,
+    partition_name,
+)
+from src.archive.store import ArchiveStore
+from src.core import Shard, shards
+from src.core.locks import LockTimeoutError, advisory_lock
+from src.models.archive import MessageArchive, MessageArchiveRead
+from src.models.message import Message
+from src.repositories.archive import MessageArchiveRepository
+from src.utils import now_utc
+
+logger = logging.getLogger("archive.archiver")
+
+DEFAULT_RETENTION_DAYS: Final[int] = 365
+DEFAULT_CACHE_SIZE: Final[int] = 256
+DEFAULT_CONCURRENCY: Final[int] = 8
+ARCHIVE_LOCK_TIMEOUT: Final[float] = 1.0
+
+
+def encode_messages(messages: Sequence[Message]) -> bytes:
+    """Gzipped NDJSON, one message per line."""
+    lines = "".join(m.model_dump_json() + "\n" for m in messages)
+    return gzip.compress(lines.encode())
+
+
+def decode_messages(data: bytes) -> list[Message]:
+    # model_validate_json does not convert fields of table models.
+    return [
+        Message.model_validate(from_json(line))
+        for line in gzip.decompress(data).splitlines()
+    ]
+
+
+def _shard_partition(shard: Shard, name: str) -> str:
+    return name if shard.index == 0 else f"shard{shard.index}.{name}"
+
+
+async def ensure_partitions(
+    months_ahead: int, now: datetime | None = None
+) -> list[str]:
+    """Create the partitions from this month to ``months_ahead`` ahead,
+    on every shard."""
+    month = month_start(now or now_utc())
+    months = months_between(month, add_months(month, months_ahead))
+    created: list[str] = []
+    for shard in shards:
+        async with shard.session_maker() as session:
+            names = await MessageArchiveRepository(session).create_partitions(
+                months
+            )
+        created.extend(_shard_partition(shard, name) for name in names)
+    return created
+
+
+class MessageArchiver:
+    """Moves old message partitions to an archive store and reads them back.
+
+    Every chat's messages of an archived month become one gzipped NDJSON
+    object, recorded in ``message_archive``. Archived messages are all
+    older than the chat's live ones, so reads put them first. Objects are
+    immutable once written and the most recently read are kept in memory.
+    """
+
+    store: ArchiveStore
+    retention: timedelta
+    months_ahead: int
+    concurrency: int
+
+    def __init__(
+        self,
+        store: ArchiveStore,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+        months_ahead: int = 3,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.store = store
+        self.retention = timedelta(days=retention_days)
+        self.months_ahead = months_ahead
+        self.concurrency = concurrency
+        self._cache: OrderedDict[str, list[Message]] = OrderedDict()
+        self._cache_size = cache_size
+
+    async def archive(self, now: datetime | None = None) -> MessageArchiveRead:
+        """Create upcoming partitions and archive those past retention.
+
+        Partitions are archived shard by shard, oldest first, each in its
+        own transaction, so an interrupted run leaves whole months of a
+        shard archived or live.
+        """
+        now = now or now_utc()
+        report = MessageArchiveRead(
+            partitions=[],
+            chats=0,
+            messages=0,
+            created=await ensure_partitions(self.months_ahead, now),
+        )
+        try:
+            async with advisory_lock("message.archive", ARCHIVE_LOCK_TIMEOUT):
+                for shard in shards:
+                    async with shard.session_maker() as session:
+                        months = await MessageArchiveRepository(
+                            session
+                        ).list_partitions()
+                    for month in months:
+                        if add_months(month, 1) > now - self.retention:
+                            break
+                        chats, messages = await self.archive_partition(
+                            shard, month
+                        )
+                        report.partitions.append(
+                            _shard_partition(shard, partition_name(month))
+                        )
+                        report.chats += chats
+                        report.messages += messages
+        except LockTimeoutError:
+            logger.warning("Messages are being archived elsewhere, skipping")
+        return report
+
+    async def archive_partition(
+        self, shard: Shard, month: datetime
+    ) -> tuple[int, int]:
+        archives: list[MessageArchive] = []
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def write(chat_id: uuid.UUID, messages: list[Message]) -> None:
+            try:
+                data = await asyncio.to_thread(encode_messages, messages)
+                uri = await self.store.put(
+                    f"messages/{month:%Y/%m}/{chat_id}.ndjson.gz", data
+                )
+            finally:
+                slots.release()
+            archives.append(
+                MessageArchive(
+                    chat_id=chat_id,
+                    period_start=month,
+                    period_end=add_months(month, 1),
+                    uri=uri,
+                    messages=len(messages),
+                )
+            )
+
+        async with shard.session_maker() as session:
+            repo = MessageArchiveRepository(session)
+            # Held until the partition is dropped, so no message written
+            # in the meantime is lost.
+            await repo.lock_partition(month)
+            async with asyncio.TaskGroup() as tg:
+                async for chat_id, messages in repo.iter_partition_chats(month):
+                    await slots.acquire()
+                    tg.create_task(write(chat_id, messages))
+            await repo.drop_partition(month, archives)
+        total = sum(a.messages for a in archives)
+        logger.info(
+            "Archived %s: %d messages of %d chats",
+            _shard_partition(shard, partition_name(month)),
+            total,
+            len(archives),
+        )
+        return len(archives), total
+
+    async def read(self, uri: str) -> list[Message]:
+        if (messages := self._cache.get(uri)) is not None:
+            self._cache.move_to_end(uri)
+            return messages
+        messages = await asyncio.to_thread(
+            decode_messages, await self.store.get(uri)
+        )
+        self._cache[uri] = messages
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return messages
+
+    def archived_before(self, now: datetime | None = None) -> datetime:
+        """Every archived message is older than this.
+
+        A month is only archived once it is past retention, so holds as
+        long as the archive job runs with the same retention.
+        """
+        return (now or now_utc()) - self.retention
+
+    async def list_archives(
+        self, session: AsyncSession, chat_id: uuid.UUID
+    ) -> list[MessageArchive]:
+        return await MessageArchiveRepository(session).list_archives(chat_id)
+
+    async def load(
+        self, session: AsyncSession, chat_id: uuid.UUID
+    ) -> list[Message]:
+        """The chat's archived messages in order, empty if it has none."""
+        archives = await self.list_archives(session, chat_id)
+        if not archives:
+            return []
+        parts = await asyncio.gather(*(self.read(a.uri) for a in archives))
+        return [m for part in parts for m in part]
+
+
+async def maintain_messages(
+    archiver: MessageArchiver | None, months_ahead: int
+) -> MessageArchiveRead:
+    """What the message.archive job does: archive if enabled, and in any
+    case create upcoming partitions."""
+    if archiver is not None:
+        return await archiver.archive()
+    return MessageArchiveRead(
+        partitions=[],
+        chats=0,
+        messages=0,
+        created=await ensure_partitions(months_ahead),
+    )
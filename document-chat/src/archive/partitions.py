@@ -0,0 +1,45 @@
+"""Monthly range partitions of the message table.
+
+Partition ``message_y2025m01`` holds the messages created from
+2025-01-01 (inclusive) to 2025-02-01 (exclusive), UTC.
+"""
+
+import re
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from typing import Final
+
+PARENT: Final[str] = "message"
+
+_NAME = re.compile(r"message_y(\d{4})m(\d{2})")
+
+
+def month_start(at: datetime) -> datetime:
+    return at.astimezone(UTC).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    year, index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return month.replace(year=year, month=index + 1)
+
+
+def months_between(first: datetime, last: datetime) -> Iterator[datetime]:
+    """Starts of the months from ``first``'s to ``last``'s, inclusive."""
+    month = month_start(first)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_y{month:%Y}m{month:%m}"
+
+
+def partition_month(name: str) -> datetime | None:
+    """The month a partition holds, None for tables not named by us."""
+    match = _NAME.fullmatch(name)
+    if match is None:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=UTC)
@@ -0,0 +1,98 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Protocol
+from urllib.parse import urlsplit
+
+from src.aws.clients import get_aws_clients
+from src.core.metrics import aws_call
+from src.utils import asyncfy
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3 import S3Client
+
+
+class ArchiveStore(Protocol):
+    """Where archived objects are written, addressed by URI once written."""
+
+    async def put(self, key: str, data: bytes) -> str: ...
+
+    async def get(self, uri: str) -> bytes: ...
+
+
+class LocalArchiveStore:
+    root: Path
+
+    def __init__(self, root: Path) -> None:
+        self.root = root.resolve()
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so a reader never sees half an object.
+        partial = path.with_name(f".{path.name}.{os.getpid()}")
+        partial.write_bytes(data)
+        partial.replace(path)
+
+    async def put(self, key: str, data: bytes) -> str:
+        path = self.root / key
+        await asyncio.to_thread(self._write, path, data)
+        return path.as_uri()
+
+    async def get(self, uri: str) -> bytes:
+        return await asyncio.to_thread(Path(urlsplit(uri).path).read_bytes)
+
+
+class S3ArchiveStore:
+    client: "S3Client"
+    bucket: str
+    prefix: str
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        client: Optional["S3Client"] = None,
+        executor: Executor | None = None,
+    ) -> None:
+        self.client = client or get_aws_clients().client("s3")  # type: ignore
+        self.executor = executor or get_aws_clients().executor("s3")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _put(self, key: str, data: bytes) -> None:
+        with aws_call("s3", "put_object"):
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=data,
+                ContentType="application/x-ndjson",
+            )
+
+    def _get(self, bucket: str, key: str) -> bytes:
+        with aws_call("s3", "get_object"):
+            response = self.client.get_object(Bucket=bucket, Key=key)
+            return response["Body"].read()
+
+    async def put(self, key: str, data: bytes) -> str:
+        if self.prefix:
+            key = f"{self.prefix}/{key}"
+        await asyncfy(self._put, key, data, executor=self.executor)
+        return f"s3://{self.bucket}/{key}"
+
+    async def get(self, uri: str) -> bytes:
+        url = urlsplit(uri)
+        return await asyncfy(
+            self._get, url.netloc, url.path.lstrip("/"), executor=self.executor
+        )
+
+
+def open_archive_store(url: str) -> ArchiveStore:
+    """A store for a ``file://`` path or an ``s3://bucket/prefix`` URL."""
+    parts = urlsplit(url)
+    if parts.scheme == "s3":
+        return S3ArchiveStore(parts.netloc, parts.path)
+    if parts.scheme == "file":
+        # file://./archive is taken as relative to the working directory.
+        return LocalArchiveStore(Path(parts.netloc + parts.path))
+    raise ValueError(f"Unsupported archive URL {url!r}, use file:// or s3://")
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from src.core import settings
+from src.core.metrics import (
+    AWS_EXECUTOR_ACTIVE,
+    AWS_EXECUTOR_QUEUED,
+    AWS_EXECUTOR_WAIT_SECONDS,
+)
+
+if TYPE_CHECKING:
+    import boto3
+    from botocore.client import BaseClient
+
+
+class ServiceExecutor(ThreadPoolExecutor):
+    """The thread pool calls to one AWS service run on.
+
+    Its size caps the service's concurrent calls, so a backlog on one
+    service queues here instead of holding threads another needs. Calls
+    waiting for a thread and calls running are counted for the metrics.
+    """
+
+    service: str
+    queued: int
+    active: int
+
+    def __init__(self, service: str, max_workers: int) -> None:
+        super().__init__(
+            max_workers=max_workers, thread_name_prefix=f"aws-{service}"
+        )
+        self.service = service
+        self.queued = 0
+        self.active = 0
+        self._counts = threading.Lock()
+
+    def submit(
+        self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> Future[Any]:
+        submitted = time.perf_counter()
+        with self._counts:
+            self.queued += 1
+
+        def run() -> Any:
+            with self._counts:
+                self.queued -= 1
+                self.active += 1
+            if settings.METRICS_ENABLED:
+                AWS_EXECUTOR_WAIT_SECONDS.labels(self.service).observe(
+                    time.perf_counter() - submitted
+                )
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._counts:
+                    self.active -= 1
+
+        future = super().submit(run)
+        future.add_done_callback(self._cancelled)
+        return future
+
+    def _cancelled(self, future: Future[Any]) -> None:
+        # A call cancelled while queued never ran to take itself off.
+        if future.cancelled():
+            with self._counts:
+                self.queued -= 1
+
+
+def max_concurrency(service: str) -> int:
+    return settings.AWS_MAX_CONCURRENCY.get(
+        service, settings.AWS_DEFAULT_MAX_CONCURRENCY
+    )
+
+
+class AwsClients:
+    """Builds each AWS client and service thread pool once per process.
+
+    boto3 is imported when the first client is built. Each client's
+    connection pool is at least as large as its service's thread pool,
+    so threads never wait on it.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, BaseClient] = {}
+        self._executors: dict[str, ServiceExecutor] = {}
+        self._lock = threading.Lock()
+        self._session: boto3.Session | None = None
+
+    def client(self, service: str) -> "BaseClient":
+        if (client := self._clients.get(service)) is not None:
+            return client
+        import boto3
+        from botocore.config import Config
+
+        with self._lock:
+            if service not in self._clients:
+                # Clients share a session; the default one is not thread
+                # safe to create clients from.
+                self._session = self._session or boto3.Session()
+                self._clients[service] = self._session.client(
+                    service,  # type: ignore
+                    config=Config(
+                        max_pool_connections=max(
+                            settings.AWS_MAX_POOL_CONNECTIONS,
+                            max_concurrency(service),
+                        ),
+                        retries={
+                            "mode": settings.AWS_RETRY_MODE,
+                            "total_max_attempts": settings.AWS_MAX_ATTEMPTS,
+                        },
+                        connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+                        read_timeout=settings.AWS_READ_TIMEOUT,
+                    ),
+                )
+            return self._clients[service]
+
+    def executor(self, service: str) -> ServiceExecutor:
+        if (executor := self._executors.get(service)) is not None:
+            return executor
+        with self._lock:
+            if service not in self._executors:
+                executor = ServiceExecutor(service, max_concurrency(service))
+                AWS_EXECUTOR_QUEUED.labels(service).set_function(
+                    lambda: executor.queued
+                )
+                AWS_EXECUTOR_ACTIVE.labels(service).set_function(
+                    lambda: executor.active
+                )
+                self._executors[service] = executor
+            return self._executors[service]
+
+    def close(self) -> None:
+        """Stop the thread pools, dropping queued calls, and close clients."""
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+            for client in self._clients.values():
+                client.close()
+            self._executors.clear()
+            self._clients.clear()
+
+
+@cache
+def get_aws_clients() -> AwsClients:
+    return AwsClients()
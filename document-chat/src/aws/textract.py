@@ -2,10 +2,10 @@ import asyncio
 import logging
 import time
 from concurrent.futures import Executor
-from typing import TYPE_CHECKING, Final, Optional
-
-import boto3
+from typing import TYPE_CHECKING, Final, NamedTuple, Optional
 
+from src.aws.clients import get_aws_clients
+from src.core.metrics import aws_call
 from src.utils import asyncfy, timer
 
 if TYPE_CHECKING:
@@ -17,34 +17,43 @@ logger = logging.getLogger("aws.textract")
 DEFAULT_JOB_STATUS_DELAY: Final[int] = 20
 
 
+class TextractLine(NamedTuple):
+    page: int
+    text: str
+
+
 class Textract:
     client: "TextractClient"
 
     def __init__(self, client: Optional["TextractClient"] = None) -> None:
-        self.client = client or boto3.client("textract")
+        self.client = client or get_aws_clients().client("textract")  # type: ignore
 
     def start_document_text_detection(self, bucket: str, key: str) -> str:
-        response = self.client.start_document_text_detection(
-            DocumentLocation={"S3Object": {"Bucket": bucket, "Name": key}}
-        )
+        with aws_call("textract", "start_document_text_detection"):
+            response = self.client.start_document_text_detection(
+                DocumentLocation={"S3Object": {"Bucket": bucket, "Name": key}}
+            )
         return response["JobId"]
 
     async def astart_document_text_detection(
         self, bucket: str, key: str, executor: Executor | None = None
     ) -> str:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            executor, self.start_document_text_detection, bucket, key
+        return await asyncfy(
+            self.start_document_text_detection,
+            bucket,
+            key,
+            executor=executor or get_aws_clients().executor("textract"),
         )
 
     def get_document_text_detection(
         self, job_id: str, next_token: str | None = None
     ) -> "GetDocumentTextDetectionResponseTypeDef":
-        if next_token:
-            return self.client.get_document_text_detection(
-                JobId=job_id, NextToken=next_token
-            )
-        return self.client.get_document_text_detection(JobId=job_id)
+        with aws_call("textract", "get_document_text_detection"):
+            if next_token:
+                return self.client.get_document_text_detection(
+                    JobId=job_id, NextToken=next_token
+                )
+            return self.client.get_document_text_detection(JobId=job_id)
 
     async def aget_document_text_detection(
         self,
@@ -53,31 +62,42 @@ class Textract:
         executor: Executor | None = None,
     ) -> "GetDocumentTextDetectionResponseTypeDef":
         return await asyncfy(
-            self.get_document_text_detection, job_id, next_token, executor=executor
+            self.get_document_text_detection,
+            job_id,
+            next_token,
+            executor=executor or get_aws_clients().executor("textract"),
         )
 
+    def _parse_document_text_detection_lines(
+        self, response: "GetDocumentTextDetectionResponseTypeDef"
+    ) -> list[TextractLine]:
+        return [
+            TextractLine(b.get("Page", 1), b["Text"])
+            for b in response.get("Blocks", [])
+            if "BlockType" in b and b["BlockType"] == "LINE" and "Text" in b
+        ]
+
     def _parse_document_text_detection(
         self, response: "GetDocumentTextDetectionResponseTypeDef"
     ) -> str:
         return "\n".join(
-            b["Text"]
-            for b in response.get("Blocks", [])
-            if "BlockType" in b and b["BlockType"] == "LINE" and "Text" in b
+            line.text
+            for line in self._parse_document_text_detection_lines(response)
         )
 
-    def detect_document_text(
+    def detect_document_lines(
         self,
         bucket: str,
         key: str,
         delay: int = DEFAULT_JOB_STATUS_DELAY,
         timeout: int | None = None,
         verbose: bool = False,
-    ) -> str:
+    ) -> list[TextractLine]:
         job_id = self.start_document_text_detection(bucket, key)
         if verbose:
             logger.info("Job created: %s", job_id)
         next_token: str | None = None
-        text = ""
+        lines: list[TextractLine] = []
         has_timeout = timer(timeout) if timeout else None
         while True:
             response = self.get_document_text_detection(job_id, next_token)
@@ -91,8 +111,9 @@ class Textract:
                 continue
 
             if response["JobStatus"] == "SUCCEEDED":
-                text = text and text + "\n"
-                text += self._parse_document_text_detection(response)
+                lines.extend(
+                    self._parse_document_text_detection_lines(response)
+                )
                 next_token = response.get("NextToken", None)
                 if next_token:
                     if verbose:
@@ -103,9 +124,9 @@ class Textract:
             raise ValueError(
                 f"Job {job_id} return status error: {response['JobStatus']}", response
             )
-        return text.strip()
+        return lines
 
-    async def adetect_document_text(
+    def detect_document_text(
         self,
         bucket: str,
         key: str,
@@ -113,26 +134,34 @@ class Textract:
         timeout: int | None = None,
         verbose: bool = False,
     ) -> str:
+        lines = self.detect_document_lines(bucket, key, delay, timeout, verbose)
+        return "\n".join(line.text for line in lines).strip()
+
+    async def adetect_document_lines(
+        self,
+        bucket: str,
+        key: str,
+        delay: int = DEFAULT_JOB_STATUS_DELAY,
+        verbose: bool = False,
+    ) -> list[TextractLine]:
         job_id = await self.astart_document_text_detection(bucket, key)
         if verbose:
             logger.info("Job created: %s", job_id)
         next_token: str | None = None
-        text = ""
-        has_timeout = timer(timeout) if timeout else None
+        lines: list[TextractLine] = []
         while True:
             response = await self.aget_document_text_detection(job_id, next_token)
 
             if response["JobStatus"] == "IN_PROGRESS":
                 if verbose:
                     logger.info("Job %s status: %s", job_id, response["JobStatus"])
-                if has_timeout and has_timeout():
-                    raise TimeoutError(f"Job {job_id} timed out!")
                 await asyncio.sleep(delay)
                 continue
 
             if response["JobStatus"] == "SUCCEEDED":
-                text = text and text + "\n"
-                text += self._parse_document_text_detection(response)
+                lines.extend(
+                    self._parse_document_text_detection_lines(response)
+                )
                 next_token = response.get("NextToken", None)
                 if next_token:
                     if verbose:
@@ -143,4 +172,14 @@ class Textract:
             raise ValueError(
                 f"Job {job_id} return status error: {response['JobStatus']}", response
             )
-        return text.strip()
+        return lines
+
+    async def adetect_document_text(
+        self,
+        bucket: str,
+        key: str,
+        delay: int = DEFAULT_JOB_STATUS_DELAY,
+        verbose: bool = False,
+    ) -> str:
+        lines = await self.adetect_document_lines(bucket, key, delay, verbose)
+        return "\n".join(line.text for line in lines).strip()
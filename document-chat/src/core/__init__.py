@@ -1,4 +1,23 @@
 from .config import settings
-from .db import engine, session_maker
+from .db import (
+    Shard,
+    dispose_engines,
+    engine,
+    prewarm_pool,
+    read_engine,
+    read_session_maker,
+    session_maker,
+    shards,
+)
 
-__all__ = ["settings", "engine", "session_maker"]
+__all__ = [
+    "settings",
+    "engine",
+    "session_maker",
+    "read_engine",
+    "read_session_maker",
+    "prewarm_pool",
+    "dispose_engines",
+    "Shard",
+    "shards",
+]
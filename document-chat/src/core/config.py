@@ -1,6 +1,10 @@
+from typing import Literal
+
 from pydantic import PostgresDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from .log import LogFormat
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -9,6 +13,31 @@ class Settings(BaseSettings):
 
     SECRET_NUMBER: int
 
+    LOG_LEVEL: str = "INFO"
+    # "rich" renders sampled request payloads as panels, for development.
+    LOG_FORMAT: LogFormat = "json"
+    LOG_REQUEST_SAMPLE_RATE: float = 0.0
+
+    # Build the model, agent and AWS clients at startup rather than on the
+    # first request that needs them.
+    PREWARM_CLIENTS: bool = False
+
+    METRICS_ENABLED: bool = True
+    # Spans are only exported once an OpenTelemetry SDK is configured.
+    OTEL_ENABLED: bool = False
+
+    # Admin endpoints under /api/admin/profiling take PROFILING_TOKEN in
+    # X-Admin-Token. Requests are profiled when they carry the token in
+    # X-Profile, or at the sample rate on paths starting with one of the
+    # routes (any path if none). When disabled nothing is installed.
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str | None = None
+    PROFILING_INTERVAL: float = 0.01
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_ROUTES: list[str] = []
+    PROFILING_MAX_SECONDS: float = 60.0
+    PROFILING_KEEP: int = 50
+
     SQLALCHEMY_HOST: str
     SQLALCHEMY_PORT: int
     SQLALCHEMY_DATABASE: str
@@ -16,6 +45,126 @@ class Settings(BaseSettings):
     SQLALCHEMY_USERNAME: str
     SQLALCHEMY_PASSWORD: str
     SQLALCHEMY_ECHO: bool = False
+    SQLALCHEMY_POOL_SIZE: int = 5
+    SQLALCHEMY_MAX_OVERFLOW: int = 10
+    SQLALCHEMY_POOL_TIMEOUT: float = 30.0
+    SQLALCHEMY_POOL_RECYCLE: int = 1800
+    SQLALCHEMY_POOL_PRE_PING: bool = True
+    # Pool connections opened at startup, at most the pool size.
+    SQLALCHEMY_POOL_PREWARM: int = 0
+    # Set both to 0 behind a transaction-pooling PgBouncer.
+    SQLALCHEMY_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    ASYNCPG_STATEMENT_CACHE_SIZE: int = 100
+
+    SQLALCHEMY_REPLICA_HOST: str | None = None
+    SQLALCHEMY_REPLICA_PORT: int | None = None
+
+    # Chats, with their messages and everything else scoped to one, are
+    # spread over shards by a consistent hash of the chat id. Shard 0 is
+    # the database above, which alone keeps documents and jobs; each of
+    # SQLALCHEMY_SHARD_HOSTS ("host" or "host:port", same database and
+    # credentials, migrated like the first) adds one. Hosts are only ever
+    # appended. After appending, set SQLALCHEMY_SHARDS_PREVIOUS to the
+    # shard count before and run python -m src.jobs rebalance-shards;
+    # meanwhile chats not yet moved are found on their previous shard.
+    SQLALCHEMY_SHARD_HOSTS: list[str] = []
+    SQLALCHEMY_SHARD_VNODES: int = 64
+    SQLALCHEMY_SHARDS_PREVIOUS: int | None = None
+    SHARD_REBALANCE_BATCH_SIZE: int = 1000
+
+    # One client per AWS service, shared by the process. Calls to a
+    # service run on its own pool of AWS_MAX_CONCURRENCY[service] threads.
+    AWS_MAX_POOL_CONNECTIONS: int = 32
+    AWS_RETRY_MODE: Literal["legacy", "standard", "adaptive"] = "adaptive"
+    AWS_MAX_ATTEMPTS: int = 5
+    AWS_CONNECT_TIMEOUT: float = 5.0
+    AWS_READ_TIMEOUT: float = 60.0
+    AWS_MAX_CONCURRENCY: dict[str, int] = {
+        "textract": 4,
+        "bedrock-runtime": 16,
+    }
+    AWS_DEFAULT_MAX_CONCURRENCY: int = 8
+
+    # Entries are scoped to the conversation history, so mostly first turns
+    # of chats hit.
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL: int = 3600
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1024
+    # Chats whose hit statistics are kept, most recently active first.
+    SEMANTIC_CACHE_MAX_CHATS: int = 4096
+
+    # Models are "<provider>:<model name>", provider being anthropic or
+    # bedrock. Fallbacks are tried on errors and, with LLM_HEDGE_DELAY set,
+    # raced against a primary that has not streamed its first token yet.
+    LLM_MODEL: str = "anthropic:claude-haiku-4-5-20251001"
+    LLM_FALLBACK_MODELS: list[str] = []
+    LLM_HEDGE_DELAY: float | None = None
+    LLM_HEDGE_QUANTILE: float | None = None
+    LLM_TEMPERATURE: float = 0.0
+    LLM_MAX_TOKENS: int = 1 << 12
+    ANTHROPIC_BASE_URL: str | None = None
+    BEDROCK_BASE_URL: str | None = None
+
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 16
+    ADMISSION_MAX_QUEUE: int = 64
+    ADMISSION_MAX_WAIT: float = 30.0
+    ADMISSION_REQUESTS_PER_MINUTE: int = 50
+    ADMISSION_INPUT_TOKENS_PER_MINUTE: int = 50_000
+    ADMISSION_OUTPUT_TOKENS_PER_MINUTE: int = 10_000
+
+    CHAT_TURN_LOCK_TIMEOUT: float = 30.0
+    # Connections holding turn locks, one per turn in flight. Defaults to
+    # the turns admission lets run or queue.
+    CHAT_TURN_LOCK_POOL_SIZE: int | None = None
+    IDEMPOTENCY_KEY_TTL: int = 86_400
+
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_MAX_MESSAGES: int = 10_000
+    WRITE_BEHIND_BATCH_SIZE: int = 500
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 0.05
+    # How long stopping retries failed inserts before dropping them.
+    WRITE_BEHIND_CLOSE_TIMEOUT: float = 10.0
+
+    # Messages are partitioned by month. Partitions up to
+    # MESSAGE_PARTITION_MONTHS_AHEAD are created at startup and by the
+    # message.archive job, which should run daily (python -m src.jobs
+    # archive-messages, or enqueued). With archiving enabled the job also
+    # moves months past the retention to gzipped NDJSON under
+    # MESSAGE_ARCHIVE_URL (file:// or s3://bucket/prefix), which reads
+    # of the chat's messages then include.
+    MESSAGE_PARTITION_MONTHS_AHEAD: int = 3
+    MESSAGE_ARCHIVE_ENABLED: bool = False
+    MESSAGE_ARCHIVE_URL: str = "file://./archive"
+    MESSAGE_ARCHIVE_RETENTION_DAYS: int = 365
+    MESSAGE_ARCHIVE_CACHE_SIZE: int = 256
+    MESSAGE_ARCHIVE_CONCURRENCY: int = 8
+
+    # Rows fetched per round trip when streaming a chat export, and rows
+    # per COPY (and per commit) when importing one.
+    MESSAGE_EXPORT_BATCH_SIZE: int = 1000
+    MESSAGE_IMPORT_BATCH_SIZE: int = 5000
+
+    CHAT_MEMORY_ENABLED: bool = False
+    CHAT_MEMORY_RECENT_TURNS: int = 8
+    CHAT_MEMORY_TOP_K: int = 4
+
+    CHUNK_MAX_TOKENS: int = 512
+    CHUNK_OVERLAP_TOKENS: int = 64
+    CHUNK_RESPECT_PAGES: bool = False
+
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.85
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_BANDS: int = 32
+
+    JOB_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_VISIBILITY_TIMEOUT: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_BASE: float = 5.0
+    JOB_BACKOFF_MAX: float = 600.0
 
     @computed_field
     @property
@@ -29,5 +178,37 @@ class Settings(BaseSettings):
             path=self.SQLALCHEMY_DATABASE,
         )
 
+    @computed_field
+    @property
+    def SQLALCHEMY_REPLICA_URL(self) -> PostgresDsn | None:  # noqa
+        if not self.SQLALCHEMY_REPLICA_HOST:
+            return None
+        return PostgresDsn.build(
+            scheme=self.SQLALCHEMY_DRIVERNAME,
+            username=self.SQLALCHEMY_USERNAME,
+            password=self.SQLALCHEMY_PASSWORD,
+            host=self.SQLALCHEMY_REPLICA_HOST,
+            port=self.SQLALCHEMY_REPLICA_PORT or self.SQLALCHEMY_PORT,
+            path=self.SQLALCHEMY_DATABASE,
+        )
+
+    @computed_field
+    @property
+    def SQLALCHEMY_SHARD_URLS(self) -> list[PostgresDsn]:  # noqa
+        urls: list[PostgresDsn] = []
+        for address in self.SQLALCHEMY_SHARD_HOSTS:
+            host, _, port = address.partition(":")
+            urls.append(
+                PostgresDsn.build(
+                    scheme=self.SQLALCHEMY_DRIVERNAME,
+                    username=self.SQLALCHEMY_USERNAME,
+                    password=self.SQLALCHEMY_PASSWORD,
+                    host=host,
+                    port=int(port) if port else self.SQLALCHEMY_PORT,
+                    path=self.SQLALCHEMY_DATABASE,
+                )
+            )
+        return urls
+
 
 settings = Settings()  # type: ignore
@@ -1,9 +1,104 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+
+from pydantic import PostgresDsn
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.core.config import settings
 
-engine = create_async_engine(
-    str(settings.SQLALCHEMY_URL), echo=settings.SQLALCHEMY_ECHO
-)
+
+def create_engine(
+    dsn: PostgresDsn,
+    pool_size: int = settings.SQLALCHEMY_POOL_SIZE,
+    max_overflow: int = settings.SQLALCHEMY_MAX_OVERFLOW,
+) -> AsyncEngine:
+    url = make_url(str(dsn)).update_query_dict(
+        {
+            "prepared_statement_cache_size": str(
+                settings.SQLALCHEMY_PREPARED_STATEMENT_CACHE_SIZE
+            )
+        }
+    )
+    return create_async_engine(
+        url,
+        echo=settings.SQLALCHEMY_ECHO,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.SQLALCHEMY_POOL_TIMEOUT,
+        pool_recycle=settings.SQLALCHEMY_POOL_RECYCLE,
+        pool_pre_ping=settings.SQLALCHEMY_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": settings.ASYNCPG_STATEMENT_CACHE_SIZE
+        },
+    )
+
+
+engine = create_engine(settings.SQLALCHEMY_URL)
+# Without a replica, reads share the primary's pool. Either way read
+# sessions run in READ ONLY transactions.
+read_engine = (
+    create_engine(settings.SQLALCHEMY_REPLICA_URL)
+    if settings.SQLALCHEMY_REPLICA_URL
+    else engine
+).execution_options(postgresql_readonly=True)
+
 session_maker = async_sessionmaker(engine, class_=AsyncSession)
+read_session_maker = async_sessionmaker(read_engine, class_=AsyncSession)
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One of the databases the chats are spread over."""
+
+    index: int
+    engine: AsyncEngine
+    session_maker: async_sessionmaker[AsyncSession]
+    read_session_maker: async_sessionmaker[AsyncSession]
+
+
+def _create_shard(index: int, dsn: PostgresDsn) -> Shard:
+    shard_engine = create_engine(dsn)
+    return Shard(
+        index,
+        shard_engine,
+        async_sessionmaker(shard_engine, class_=AsyncSession),
+        async_sessionmaker(
+            shard_engine.execution_options(postgresql_readonly=True),
+            class_=AsyncSession,
+        ),
+    )
+
+
+# Shard 0 is the main database, with its replica if any.
+shards = [
+    Shard(0, engine, session_maker, read_session_maker),
+    *(
+        _create_shard(index, dsn)
+        for index, dsn in enumerate(settings.SQLALCHEMY_SHARD_URLS, 1)
+    ),
+]
+
+
+async def prewarm_pool(engine: AsyncEngine, connections: int) -> None:
+    """Open pool connections ahead of the first requests that need them."""
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(
+            *(
+                stack.enter_async_context(engine.connect())
+                for _ in range(connections)
+            )
+        )
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    await read_engine.dispose()
+    for shard in shards[1:]:
+        await shard.engine.dispose()
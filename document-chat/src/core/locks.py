@@ -0,0 +1,84 @@
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Final
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.core.config import settings
+from src.core.db import create_engine
+
+logger = logging.getLogger("core.locks")
+
+LOCK_NOT_AVAILABLE: Final[str] = "55P03"
+
+
+def _lock_pool_size() -> int:
+    if settings.CHAT_TURN_LOCK_POOL_SIZE is not None:
+        return settings.CHAT_TURN_LOCK_POOL_SIZE
+    return settings.ADMISSION_MAX_CONCURRENCY + settings.ADMISSION_MAX_QUEUE
+
+
+# Advisory locks are held on their own connections for a whole chat turn;
+# a separate pool keeps them from starving the request sessions. It grows
+# to one connection per turn in flight, keeping the usual number idle.
+lock_engine = create_engine(
+    settings.SQLALCHEMY_URL,
+    pool_size=min(settings.SQLALCHEMY_POOL_SIZE, _lock_pool_size()),
+    max_overflow=max(_lock_pool_size() - settings.SQLALCHEMY_POOL_SIZE, 0),
+)
+
+
+class LockTimeoutError(Exception):
+    """The advisory lock could not be acquired in time."""
+
+
+@asynccontextmanager
+async def advisory_lock(key: str, lock_timeout: float) -> AsyncIterator[None]:
+    """Hold a session-level Postgres advisory lock for the block.
+
+    The lock lives on a dedicated connection outside any transaction, so
+    it is shared by every worker and released by Postgres if the process
+    dies mid-block.
+    """
+    params = {"key": key}
+    async with lock_engine.connect() as conn:
+        try:
+            await conn.execute(
+                text("SELECT set_config('lock_timeout', :timeout, false)"),
+                {"timeout": f"{int(lock_timeout * 1000)}ms"},
+            )
+            await conn.execute(
+                text("SELECT pg_advisory_lock(hashtextextended(:key, 0))"),
+                params,
+            )
+        except DBAPIError as e:
+            if getattr(e.orig, "sqlstate", None) == LOCK_NOT_AVAILABLE:
+                raise LockTimeoutError(key) from e
+            raise
+        await conn.commit()
+        try:
+            yield
+        finally:
+            try:
+                await conn.execute(
+                    text(
+                        "SELECT pg_advisory_unlock(hashtextextended(:key, 0))"
+                    ),
+                    params,
+                )
+                await conn.commit()
+            except BaseException:
+                # Never hand a connection that may still hold the lock back
+                # to the pool.
+                logger.exception("Failed to release advisory lock %s", key)
+                await conn.invalidate()
+                raise
+
+
+def chat_turn_lock(chat_id: uuid.UUID) -> AbstractAsyncContextManager[None]:
+    return advisory_lock(
+        f"chat-turn:{chat_id}", settings.CHAT_TURN_LOCK_TIMEOUT
+    )
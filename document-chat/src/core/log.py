@@ -0,0 +1,149 @@
+import logging
+import queue
+import random
+import sys
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Any, Final, Literal
+
+from pydantic_core import to_json
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.text import Text
+
+type LogFormat = Literal["json", "rich"]
+
+REQUEST_LOGGER: Final[str] = "anthropic._base_client"
+# Attributes every LogRecord has; anything else came in through `extra`.
+RECORD_ATTRIBUTES: Final[frozenset[str]] = frozenset(
+    logging.makeLogRecord({}).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+def is_request_record(record: logging.LogRecord) -> bool:
+    return record.name == REQUEST_LOGGER and "Request options" in str(
+        record.msg
+    )
+
+
+class RequestSampler(logging.Filter):
+    """Lets through a sample of the Anthropic request payload records.
+
+    The client logs every request at DEBUG; only ``rate`` of them pass,
+    and its other DEBUG chatter is dropped.
+    """
+
+    rate: float
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.name != REQUEST_LOGGER or record.levelno > logging.DEBUG:
+            return True
+        return is_request_record(record) and random.random() < self.rate  # noqa: S311
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueues records as they are, leaving all formatting to the listener.
+
+    The stock ``prepare`` renders the message on the calling thread, which
+    is the event loop. Records are handed over within the process, so
+    their arguments are formatted later on the listener thread instead.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any `extra` fields included."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, UTC),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if is_request_record(record) and isinstance(record.args, Mapping):
+            # Keep the payload structured instead of a repr in the message.
+            data["message"] = "Request options"
+            data["request"] = record.args
+        else:
+            data["message"] = record.getMessage()
+        data |= {
+            k: v
+            for k, v in record.__dict__.items()
+            if k not in RECORD_ATTRIBUTES
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        return to_json(data, fallback=repr).decode()
+
+
+def create_panel(
+    console: "Console", data: object, title: "str | Text | None" = None
+) -> str:
+    from rich.panel import Panel
+    from rich.text import Text
+
+    with console.capture() as cap:
+        console.print(data)
+    text = Text.from_ansi(cap.get())
+    if isinstance(title, str):
+        title = Text.assemble((title, "bright_blue"))
+    panel = Panel(text, title=title, border_style="bright_yellow")
+    with console.capture() as cap:
+        console.print(panel)
+    return cap.get()
+
+
+class RichFormatter(logging.Formatter):
+    """Development output: request payloads rendered as Rich panels."""
+
+    console: "Console"
+
+    def __init__(self, console: "Console | None" = None) -> None:
+        # Rich is only imported when this format is chosen.
+        from rich.console import Console
+
+        super().__init__("%(asctime)s %(levelname)-8s %(name)s: %(message)s")
+        self.console = console or Console()
+
+    def format(self, record: logging.LogRecord) -> str:
+        if is_request_record(record):
+            return create_panel(self.console, record.args, "Anthropic Request")
+        return super().format(record)
+
+
+def setup_logging(
+    level: int | str = logging.INFO,
+    fmt: LogFormat = "json",
+    request_sample_rate: float = 0.0,
+) -> QueueListener:
+    """Route all logging through a queue drained by a background thread.
+
+    Returns the started listener; stop it on shutdown to flush the queue.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(RichFormatter() if fmt == "rich" else JsonFormatter())
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    queue_handler.addFilter(RequestSampler(request_sample_rate))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    if request_sample_rate > 0:
+        logging.getLogger(REQUEST_LOGGER).setLevel(logging.DEBUG)
+
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
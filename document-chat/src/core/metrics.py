@@ -0,0 +1,139 @@
+import time
+from contextlib import AbstractContextManager
+from functools import cache
+from typing import Any, Final
+
+from opentelemetry import trace
+from prometheus_client import Counter, Gauge, Histogram
+
+from .config import settings
+
+# Seconds; spans both sub-millisecond conversions and slow model calls.
+LATENCY_BUCKETS: Final = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+CHAT_TURN_STAGE_SECONDS = Histogram(
+    "chat_turn_stage_seconds",
+    "Time spent in each stage of a chat turn.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+AWS_CALL_SECONDS = Histogram(
+    "aws_call_seconds",
+    "Latency of calls to AWS services.",
+    ["service", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+AWS_EXECUTOR_QUEUED = Gauge(
+    "aws_executor_queued",
+    "AWS calls waiting for a thread of their service's pool.",
+    ["service"],
+)
+AWS_EXECUTOR_ACTIVE = Gauge(
+    "aws_executor_active",
+    "AWS calls running on their service's pool.",
+    ["service"],
+)
+AWS_EXECUTOR_WAIT_SECONDS = Histogram(
+    "aws_executor_wait_seconds",
+    "Time AWS calls waited for a thread of their service's pool.",
+    ["service"],
+    buckets=LATENCY_BUCKETS,
+)
+MODEL_TOKENS = Counter(
+    "model_tokens",
+    "Tokens reported by model responses.",
+    ["model", "kind"],
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Chat turns waiting for model capacity."
+)
+ADMISSION_ACTIVE = Gauge(
+    "admission_active", "Chat turns currently holding model capacity."
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Time admitted chat turns waited for model capacity.",
+    buckets=LATENCY_BUCKETS,
+)
+
+_tracer = trace.get_tracer("document-chat") if settings.OTEL_ENABLED else None
+
+
+class Measure:
+    """Times a block into a histogram and, with tracing on, a span.
+
+    Spans go through the OpenTelemetry API and are only exported when an
+    SDK has been configured for the process. A plain class rather than a
+    generator context manager, since this wraps every stage of every turn.
+    """
+
+    __slots__ = ("_context", "_histogram", "_labels", "_span", "_start")
+
+    def __init__(self, histogram: Histogram, span: str, labels: dict[str, str]):
+        self._histogram = histogram
+        self._span = span
+        self._labels = labels
+        self._context: AbstractContextManager[Any] | None = None
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        if _tracer is not None:
+            self._context = _tracer.start_as_current_span(
+                self._span, attributes=self._labels
+            )
+            self._context.__enter__()
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        if settings.METRICS_ENABLED:
+            _child(self._histogram, *self._labels.values()).observe(
+                time.perf_counter() - self._start
+            )
+        if self._context is not None:
+            self._context.__exit__(*exc_info)
+
+
+@cache
+def _child(histogram: Histogram, *values: str) -> Histogram:
+    # labels() takes a lock and validates on every call; children are
+    # stable, so look each one up once.
+    return histogram.labels(*values)
+
+
+def stage(name: str) -> Measure:
+    return Measure(CHAT_TURN_STAGE_SECONDS, f"chat.{name}", {"stage": name})
+
+
+def aws_call(service: str, operation: str) -> Measure:
+    return Measure(
+        AWS_CALL_SECONDS,
+        f"{service}.{operation}",
+        {"service": service, "operation": operation},
+    )
+
+
+def record_tokens(
+    model: str | None, input_tokens: int, output_tokens: int
+) -> None:
+    if not settings.METRICS_ENABLED:
+        return
+    model = model or "unknown"
+    MODEL_TOKENS.labels(model=model, kind="input").inc(input_tokens)
+    MODEL_TOKENS.labels(model=model, kind="output").inc(output_tokens)
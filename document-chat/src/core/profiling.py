@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import random
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from types import FrameType
+from typing import Any, Final
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("core.profiling")
+
+PROFILE_HEADER: Final[str] = "X-Profile"
+PROFILE_ID_HEADER: Final[str] = "X-Profile-Id"
+
+type Sampler = Callable[[dict[int, FrameType]], None]
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{code.co_qualname} ({module}:{frame.f_lineno})"
+
+
+def _thread_stack(frame: FrameType | None) -> list[FrameType]:
+    stack: list[FrameType] = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _await_chain(coro: Any) -> list[FrameType]:
+    """Frames of a suspended coroutine and of what it awaits, outermost first."""
+    stack: list[FrameType] = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(
+            coro, "gi_frame", None
+        )
+        if frame is None:
+            break
+        stack.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(
+            coro, "gi_yieldfrom", None
+        )
+    return stack
+
+
+@dataclass(eq=False)
+class Profile:
+    """Sampled stacks, counted per distinct stack."""
+
+    name: str
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    started_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    duration: float = 0.0
+    stacks: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def samples(self) -> int:
+        return self.stacks.total()
+
+    def add(self, root: str, frames: Iterable[FrameType]) -> None:
+        self.stacks[";".join([root, *map(_label, frames)])] += 1
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;... count`` line per stack, as flamegraph.pl
+        and speedscope read them."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+class SamplingProfiler:
+    """Samples stacks from a background thread while a profile is open.
+
+    The thread is started by the first open profile and exits once the
+    last one closes, so nothing runs between profiles. Finished profiles
+    are kept, newest last, up to ``keep``.
+    """
+
+    interval: float
+    recent: deque[Profile]
+
+    def __init__(self, interval: float, keep: int) -> None:
+        self.interval = interval
+        self.recent = deque(maxlen=keep)
+        self._samplers: dict[uuid.UUID, Sampler] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def get(self, profile_id: uuid.UUID) -> Profile | None:
+        return next((p for p in self.recent if p.id == profile_id), None)
+
+    @contextmanager
+    def _open(self, profile: Profile, sampler: Sampler) -> Iterator[Profile]:
+        with self._lock:
+            self._samplers[profile.id] = sampler
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="profiler", daemon=True
+                )
+                self._thread.start()
+        start = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            with self._lock:
+                del self._samplers[profile.id]
+            profile.duration = time.perf_counter() - start
+            self.recent.append(profile)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._samplers:
+                    self._thread = None
+                    return
+                samplers = list(self._samplers.values())
+            frames = sys._current_frames()
+            for sample in samplers:
+                try:
+                    sample(frames)
+                except Exception:
+                    logger.exception("Taking a profiling sample failed")
+            del frames
+            time.sleep(self.interval)
+
+    def profile_worker(
+        self, name: str = "worker"
+    ) -> AbstractContextManager[Profile]:
+        """Samples every thread of the process, rooted at the thread name."""
+        profile = Profile(name)
+
+        def sample(frames: dict[int, FrameType]) -> None:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            own = threading.get_ident()
+            for ident, frame in frames.items():
+                if ident != own:
+                    root = names.get(ident, str(ident))
+                    profile.add(root, _thread_stack(frame))
+
+        return self._open(profile, sample)
+
+    def profile_task(self, name: str) -> AbstractContextManager[Profile]:
+        """Samples the calling task, whether it is running or waiting.
+
+        While the task holds the event loop its stack is taken from the
+        thread; otherwise from the chain of awaits it is suspended in, so
+        the profile covers wall time. Stacks are rooted at ``running`` or
+        ``waiting`` accordingly.
+        """
+        task = asyncio.current_task()
+        if task is None:
+            raise RuntimeError("profile_task needs a running task")
+        profile = Profile(name)
+        thread = threading.get_ident()
+        coro = task.get_coro()
+
+        def sample(frames: dict[int, FrameType]) -> None:
+            root = getattr(coro, "cr_frame", None)
+            if root is None:
+                return
+            stack = _thread_stack(frames.get(thread))
+            for i, frame in enumerate(stack):
+                if frame is root:
+                    profile.add("running", stack[i:])
+                    return
+            profile.add("waiting", _await_chain(coro))
+
+        return self._open(profile, sample)
+
+
+def dump_tasks() -> str:
+    """Every pending task of the running loop with the awaits it is in."""
+    lines: list[str] = []
+    for task in sorted(asyncio.all_tasks(), key=asyncio.Task.get_name):
+        state = " (cancelling)" if task.cancelling() else ""
+        lines.append(f"{task.get_name()}{state}")
+        lines.extend(
+            f"    {_label(frame)}" for frame in _await_chain(task.get_coro())
+        )
+    return "\n".join(lines) + "\n"
+
+
+class ProfilingMiddleware:
+    """Profiles a sample of HTTP requests.
+
+    A request is profiled when it carries the admin token in ``X-Profile``,
+    or at ``sample_rate`` when its path starts with one of ``routes`` (any
+    path if none are given). The profile id is returned in
+    ``X-Profile-Id``. Endpoints run in the threadpool show up as waiting.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        profiler: SamplingProfiler,
+        token: str | None = None,
+        sample_rate: float = 0.0,
+        routes: Iterable[str] = (),
+    ) -> None:
+        self.app = app
+        self.profiler = profiler
+        self.token = token
+        self.sample_rate = sample_rate
+        self.routes = tuple(routes)
+
+    def _selected(self, scope: Scope) -> bool:
+        requested = Headers(scope=scope).get(PROFILE_HEADER)
+        if requested is not None and self.token is not None:
+            return secrets.compare_digest(requested, self.token)
+        if self.routes and not scope["path"].startswith(self.routes):
+            return False
+        return random.random() < self.sample_rate  # noqa: S311
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+        name = f"{scope['method']} {scope['path']}"
+        with self.profiler.profile_task(name) as profile:
+
+            async def send_with_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append(PROFILE_ID_HEADER, str(profile.id))
+                await send(message)
+
+            await self.app(scope, receive, send_with_id)
@@ -0,0 +1,102 @@
+import bisect
+import hashlib
+import uuid
+from collections.abc import Sequence
+from functools import cache
+from typing import Final
+
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.core.db import Shard, shards
+
+DEFAULT_VNODES: Final[int] = 64
+
+
+def _point(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest())
+
+
+class HashRing:
+    """Consistent hash of chat ids onto shards 0 to ``shards`` - 1.
+
+    Each shard owns ``vnodes`` points on a 64-bit ring and a chat belongs
+    to the first point at or after the hash of its id. Appending a shard
+    only takes the chats falling just before its points, about 1/N of
+    them; every other chat keeps its shard.
+    """
+
+    shards: int
+
+    def __init__(self, shards: int, vnodes: int = DEFAULT_VNODES) -> None:
+        self.shards = shards
+        points = sorted(
+            (_point(f"{shard}:{vnode}".encode()), shard)
+            for shard in range(shards)
+            for vnode in range(vnodes)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_of(self, chat_id: uuid.UUID) -> int:
+        i = bisect.bisect_left(self._points, _point(chat_id.bytes))
+        return self._owners[i % len(self._points)]
+
+
+class ShardRouter:
+    """Finds the shard holding a chat.
+
+    A chat lives on its shard in ``ring``. While chats are being moved
+    onto appended shards, ``previous`` is the ring from before, and a
+    chat whose shard changed is looked for on the new one, then on the
+    one it had.
+    """
+
+    shards: Sequence[Shard]
+    ring: HashRing
+    previous: HashRing | None
+
+    def __init__(
+        self,
+        shards: Sequence[Shard],
+        vnodes: int = DEFAULT_VNODES,
+        previous: int | None = None,
+    ) -> None:
+        self.shards = shards
+        self.ring = HashRing(len(shards), vnodes)
+        self.previous = (
+            HashRing(previous, vnodes)
+            if previous is not None and previous != len(shards)
+            else None
+        )
+
+    def owner(self, chat_id: uuid.UUID) -> Shard:
+        """Where the chat belongs, and where new chats are created."""
+        return self.shards[self.ring.shard_of(chat_id)]
+
+    async def locate(self, chat_id: uuid.UUID) -> Shard:
+        """Where the chat is, its owner unless not moved there yet."""
+        owner = self.owner(chat_id)
+        if self.previous is None:
+            return owner
+        previous = self.shards[self.previous.shard_of(chat_id)]
+        if previous is owner:
+            return owner
+        # The primary, as a replica may not have the move yet.
+        async with owner.session_maker() as session:
+            r = await session.exec(
+                text("SELECT 1 FROM chat WHERE id = :id"),  # type: ignore
+                params={"id": chat_id},
+            )
+            if r.first() is not None:
+                return owner
+        return previous
+
+
+@cache
+def get_shard_router() -> ShardRouter:
+    return ShardRouter(
+        shards,
+        settings.SQLALCHEMY_SHARD_VNODES,
+        settings.SQLALCHEMY_SHARDS_PREVIOUS,
+    )
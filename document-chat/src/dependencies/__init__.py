@@ -1,10 +1,51 @@
-from .repositories import ChatRepositoryDep, MessageRepositoryDep
+from .admission import AdmissionControllerDep
+from .archive import MessageArchiverDep
+from .buffer import MessageBufferDep
+from .cache import SemanticCacheDep
+from .documents import DocumentIngestorDep
+from .memory import ChatMemoryDep
+from .repositories import (
+    ChatRepositoryDep,
+    DocumentRepositoryDep,
+    IdempotencyRepositoryDep,
+    JobRepositoryDep,
+    MessageEmbeddingRepositoryDep,
+    MessageRepositoryDep,
+    ReadChatRepositoryDep,
+    ReadDocumentRepositoryDep,
+    ReadMessageRepositoryDep,
+    ReadShardedChatRepositoryDep,
+)
 from .request import PaginationDep
-from .session import SessionDep
+from .session import (
+    ChatSessionDep,
+    ReadChatSessionDep,
+    ReadSessionDep,
+    SessionDep,
+)
+from .shards import ShardRouterDep
 
 __all__ = [
     "ChatRepositoryDep",
     "SessionDep",
     "PaginationDep",
     "MessageRepositoryDep",
+    "SemanticCacheDep",
+    "ChatMemoryDep",
+    "MessageEmbeddingRepositoryDep",
+    "DocumentRepositoryDep",
+    "DocumentIngestorDep",
+    "JobRepositoryDep",
+    "ReadSessionDep",
+    "ReadChatRepositoryDep",
+    "ReadMessageRepositoryDep",
+    "ReadDocumentRepositoryDep",
+    "MessageBufferDep",
+    "IdempotencyRepositoryDep",
+    "AdmissionControllerDep",
+    "MessageArchiverDep",
+    "ReadShardedChatRepositoryDep",
+    "ShardRouterDep",
+    "ChatSessionDep",
+    "ReadChatSessionDep",
 ]
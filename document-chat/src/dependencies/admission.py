@@ -0,0 +1,34 @@
+from functools import cache
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.agents.admission import AdmissionController
+from src.core import settings
+from src.core.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH
+
+
+@cache
+def _get_admission_controller() -> AdmissionController:
+    controller = AdmissionController(
+        max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_wait=settings.ADMISSION_MAX_WAIT,
+        requests_per_minute=settings.ADMISSION_REQUESTS_PER_MINUTE,
+        input_tokens_per_minute=settings.ADMISSION_INPUT_TOKENS_PER_MINUTE,
+        output_tokens_per_minute=settings.ADMISSION_OUTPUT_TOKENS_PER_MINUTE,
+    )
+    ADMISSION_ACTIVE.set_function(lambda: controller.active)
+    ADMISSION_QUEUE_DEPTH.set_function(lambda: controller.queued)
+    return controller
+
+
+def get_admission_controller() -> AdmissionController | None:
+    if not settings.ADMISSION_ENABLED:
+        return None
+    return _get_admission_controller()
+
+
+AdmissionControllerDep = Annotated[
+    AdmissionController | None, Depends(get_admission_controller)
+]
@@ -0,0 +1,30 @@
+from functools import cache
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.archive.archiver import MessageArchiver
+from src.archive.store import open_archive_store
+from src.core import settings
+
+
+@cache
+def _get_message_archiver() -> MessageArchiver:
+    return MessageArchiver(
+        open_archive_store(settings.MESSAGE_ARCHIVE_URL),
+        retention_days=settings.MESSAGE_ARCHIVE_RETENTION_DAYS,
+        months_ahead=settings.MESSAGE_PARTITION_MONTHS_AHEAD,
+        cache_size=settings.MESSAGE_ARCHIVE_CACHE_SIZE,
+        concurrency=settings.MESSAGE_ARCHIVE_CONCURRENCY,
+    )
+
+
+def get_message_archiver() -> MessageArchiver | None:
+    if not settings.MESSAGE_ARCHIVE_ENABLED:
+        return None
+    return _get_message_archiver()
+
+
+MessageArchiverDep = Annotated[
+    MessageArchiver | None, Depends(get_message_archiver)
+]
@@ -0,0 +1,28 @@
+from functools import cache
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.core import settings
+from src.repositories.buffer import MessageWriteBuffer
+
+
+@cache
+def _get_message_buffer() -> MessageWriteBuffer:
+    return MessageWriteBuffer(
+        max_messages=settings.WRITE_BEHIND_MAX_MESSAGES,
+        batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+        close_timeout=settings.WRITE_BEHIND_CLOSE_TIMEOUT,
+    )
+
+
+def get_message_buffer() -> MessageWriteBuffer | None:
+    if not settings.WRITE_BEHIND_ENABLED:
+        return None
+    return _get_message_buffer()
+
+
+MessageBufferDep = Annotated[
+    MessageWriteBuffer | None, Depends(get_message_buffer)
+]
@@ -0,0 +1,28 @@
+from functools import cache
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.agents.cache import SemanticResponseCache
+from src.core import settings
+
+
+@cache
+def _get_semantic_cache() -> SemanticResponseCache:
+    return SemanticResponseCache(
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        ttl=settings.SEMANTIC_CACHE_TTL,
+        max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        max_chats=settings.SEMANTIC_CACHE_MAX_CHATS,
+    )
+
+
+def get_semantic_cache() -> SemanticResponseCache | None:
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    return _get_semantic_cache()
+
+
+SemanticCacheDep = Annotated[
+    SemanticResponseCache | None, Depends(get_semantic_cache)
+]
@@ -0,0 +1,34 @@
+from functools import cache
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.core import settings
+from src.dependencies.cache import get_semantic_cache
+from src.documents.chunker import TextChunker
+from src.documents.dedup import MinHasher
+from src.documents.ingest import DocumentIngestor
+
+
+@cache
+def get_document_ingestor() -> DocumentIngestor:
+    return DocumentIngestor(
+        chunker=TextChunker(
+            max_tokens=settings.CHUNK_MAX_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+            respect_pages=settings.CHUNK_RESPECT_PAGES,
+        ),
+        hasher=MinHasher(
+            num_perm=settings.DEDUP_NUM_PERM,
+            bands=settings.DEDUP_BANDS,
+            threshold=settings.DEDUP_THRESHOLD,
+        )
+        if settings.DEDUP_ENABLED
+        else None,
+        cache=get_semantic_cache(),
+    )
+
+
+DocumentIngestorDep = Annotated[
+    DocumentIngestor, Depends(get_document_ingestor)
+]
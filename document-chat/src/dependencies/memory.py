@@ -0,0 +1,24 @@
+from functools import cache
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.agents.memory import ChatMemory
+from src.core import settings
+
+
+@cache
+def _get_chat_memory() -> ChatMemory:
+    return ChatMemory(
+        recent_turns=settings.CHAT_MEMORY_RECENT_TURNS,
+        top_k=settings.CHAT_MEMORY_TOP_K,
+    )
+
+
+def get_chat_memory() -> ChatMemory | None:
+    if not settings.CHAT_MEMORY_ENABLED:
+        return None
+    return _get_chat_memory()
+
+
+ChatMemoryDep = Annotated[ChatMemory | None, Depends(get_chat_memory)]
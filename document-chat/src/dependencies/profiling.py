@@ -0,0 +1,40 @@
+import secrets
+from functools import cache
+from typing import Annotated
+
+from fastapi import Depends, Header, HTTPException
+
+from src.core import settings
+from src.core.profiling import SamplingProfiler
+
+
+@cache
+def _get_profiler() -> SamplingProfiler:
+    return SamplingProfiler(
+        interval=settings.PROFILING_INTERVAL, keep=settings.PROFILING_KEEP
+    )
+
+
+def get_profiler() -> SamplingProfiler | None:
+    if not settings.PROFILING_ENABLED:
+        return None
+    return _get_profiler()
+
+
+def get_admin_profiler(
+    profiler: Annotated[SamplingProfiler | None, Depends(get_profiler)],
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> SamplingProfiler:
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled.")
+    token = settings.PROFILING_TOKEN
+    if (
+        token is None
+        or x_admin_token is None
+        or not secrets.compare_digest(x_admin_token, token)
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+    return profiler
+
+
+ProfilerDep = Annotated[SamplingProfiler, Depends(get_admin_profiler)]
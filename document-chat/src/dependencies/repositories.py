@@ -1,25 +1,117 @@
 from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack
 from typing import Annotated
 
 from fastapi import Depends
 
-from src.dependencies.session import SessionDep
-from src.repositories import ChatRepository, MessageRepository
+from src.core.shards import get_shard_router
+from src.dependencies.archive import MessageArchiverDep
+from src.dependencies.session import (
+    ChatSessionDep,
+    ReadChatSessionDep,
+    ReadSessionDep,
+    SessionDep,
+)
+from src.repositories import (
+    ChatRepository,
+    DocumentRepository,
+    IdempotencyRepository,
+    JobRepository,
+    MessageEmbeddingRepository,
+    MessageRepository,
+    ShardedChatRepository,
+)
 
 
 async def get_chat_repository(
-    session: SessionDep,
+    session: ChatSessionDep,
 ) -> AsyncGenerator[ChatRepository]:
     yield ChatRepository(session)
 
 
 async def get_message_repository(
+    session: ChatSessionDep, archiver: MessageArchiverDep
+) -> AsyncGenerator[MessageRepository]:
+    yield MessageRepository(session, archiver)
+
+
+async def get_message_embedding_repository(
+    session: ChatSessionDep,
+) -> AsyncGenerator[MessageEmbeddingRepository]:
+    yield MessageEmbeddingRepository(session)
+
+
+async def get_document_repository(
+    session: SessionDep,
+) -> AsyncGenerator[DocumentRepository]:
+    yield DocumentRepository(session)
+
+
+async def get_job_repository(
     session: SessionDep,
+) -> AsyncGenerator[JobRepository]:
+    yield JobRepository(session)
+
+
+async def get_idempotency_repository(
+    session: ChatSessionDep,
+) -> AsyncGenerator[IdempotencyRepository]:
+    yield IdempotencyRepository(session)
+
+
+async def get_read_chat_repository(
+    session: ReadChatSessionDep,
+) -> AsyncGenerator[ChatRepository]:
+    yield ChatRepository(session)
+
+
+async def get_read_message_repository(
+    session: ReadChatSessionDep, archiver: MessageArchiverDep
 ) -> AsyncGenerator[MessageRepository]:
-    yield MessageRepository(session)
+    yield MessageRepository(session, archiver)
+
+
+async def get_read_sharded_chat_repository() -> AsyncGenerator[
+    ShardedChatRepository
+]:
+    async with AsyncExitStack() as stack:
+        yield ShardedChatRepository(
+            [
+                await stack.enter_async_context(shard.read_session_maker())
+                for shard in get_shard_router().shards
+            ]
+        )
+
+
+async def get_read_document_repository(
+    session: ReadSessionDep,
+) -> AsyncGenerator[DocumentRepository]:
+    yield DocumentRepository(session)
 
 
 ChatRepositoryDep = Annotated[ChatRepository, Depends(get_chat_repository)]
 MessageRepositoryDep = Annotated[
     MessageRepository, Depends(get_message_repository)
 ]
+MessageEmbeddingRepositoryDep = Annotated[
+    MessageEmbeddingRepository, Depends(get_message_embedding_repository)
+]
+DocumentRepositoryDep = Annotated[
+    DocumentRepository, Depends(get_document_repository)
+]
+JobRepositoryDep = Annotated[JobRepository, Depends(get_job_repository)]
+IdempotencyRepositoryDep = Annotated[
+    IdempotencyRepository, Depends(get_idempotency_repository)
+]
+ReadChatRepositoryDep = Annotated[
+    ChatRepository, Depends(get_read_chat_repository)
+]
+ReadMessageRepositoryDep = Annotated[
+    MessageRepository, Depends(get_read_message_repository)
+]
+ReadShardedChatRepositoryDep = Annotated[
+    ShardedChatRepository, Depends(get_read_sharded_chat_repository)
+]
+ReadDocumentRepositoryDep = Annotated[
+    DocumentRepository, Depends(get_read_document_repository)
+]
@@ -1,20 +1,77 @@
-from typing import Annotated, NamedTuple
+import binascii
+import struct
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Annotated, NamedTuple, Protocol
 
-from fastapi import Depends, Query
+from fastapi import Depends, HTTPException, Query, Response
+
+from src.utils import Cursor
+
+
+class Keyed(Protocol):
+    created_at: datetime
+    id: uuid.UUID
 
 
 class Pagination(NamedTuple):
     limit: int | None
     offset: int | None
     page: int | None
+    after: Cursor | None = None
+    before: Cursor | None = None
+
+    def set_cursor_headers(
+        self, response: Response, items: Sequence[Keyed]
+    ) -> None:
+        if not items:
+            return
+        full = self.limit is not None and len(items) == self.limit
+        if self.before or full:
+            last = Cursor(items[-1].created_at, items[-1].id)
+            response.headers["X-Next-Cursor"] = last.encode()
+        if self.after or self.offset or (self.before and full):
+            first = Cursor(items[0].created_at, items[0].id)
+            response.headers["X-Prev-Cursor"] = first.encode()
+
+    def set_total_header(self, response: Response, total: int) -> None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def _decode_cursor(name: str, token: str | None) -> Cursor | None:
+    if token is None:
+        return None
+    try:
+        return Cursor.decode(token)
+    except (binascii.Error, struct.error, ValueError) as e:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid {name} cursor."
+        ) from e
 
 
 def get_pagination(
     limit: Annotated[int | None, Query(gt=0)] = None,
     page: Annotated[int | None, Query(ge=0)] = None,
+    after: Annotated[str | None, Query()] = None,
+    before: Annotated[str | None, Query()] = None,
 ) -> Pagination:
+    if after and before:
+        raise HTTPException(
+            status_code=400, detail="Use either after or before, not both."
+        )
+    if (after or before) and page:
+        raise HTTPException(
+            status_code=400, detail="Cursors cannot be combined with page."
+        )
     offset = (page - 1) * limit if limit and page else None
-    return Pagination(limit, offset, page)
+    return Pagination(
+        limit,
+        offset,
+        page,
+        _decode_cursor("after", after),
+        _decode_cursor("before", before),
+    )
 
 
 PaginationDep = Annotated[Pagination, Depends(get_pagination)]
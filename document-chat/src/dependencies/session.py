@@ -1,10 +1,12 @@
+import uuid
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
 from fastapi import Depends
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.core import session_maker
+from src.core import read_session_maker, session_maker
+from src.core.shards import get_shard_router
 
 
 async def get_session() -> AsyncGenerator[AsyncSession]:
@@ -12,4 +14,28 @@ async def get_session() -> AsyncGenerator[AsyncSession]:
         yield session
 
 
+async def get_read_session() -> AsyncGenerator[AsyncSession]:
+    async with read_session_maker() as session:
+        yield session
+
+
+async def get_chat_session(chat_id: uuid.UUID) -> AsyncGenerator[AsyncSession]:
+    shard = await get_shard_router().locate(chat_id)
+    async with shard.session_maker() as session:
+        yield session
+
+
+async def get_read_chat_session(
+    chat_id: uuid.UUID,
+) -> AsyncGenerator[AsyncSession]:
+    shard = await get_shard_router().locate(chat_id)
+    async with shard.read_session_maker() as session:
+        yield session
+
+
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+# Read-only work; served by the replica when one is configured.
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+# On the shard of the chat in the path.
+ChatSessionDep = Annotated[AsyncSession, Depends(get_chat_session)]
+ReadChatSessionDep = Annotated[AsyncSession, Depends(get_read_chat_session)]
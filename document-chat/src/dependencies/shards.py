@@ -0,0 +1,7 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.core.shards import ShardRouter, get_shard_router
+
+ShardRouterDep = Annotated[ShardRouter, Depends(get_shard_router)]
@@ -0,0 +1,142 @@
+import hashlib
+import re
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Final
+
+from src.aws.textract import TextractLine
+
+DEFAULT_MAX_TOKENS: Final[int] = 512
+DEFAULT_OVERLAP_TOKENS: Final[int] = 64
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]*[A-Z0-9])")
+WHITESPACE = re.compile(r"\s+")
+
+type TokenCounter = Callable[[str], int]
+
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def normalize_text(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class Sentence:
+    page: int
+    text: str
+    tokens: int
+
+
+@dataclass(frozen=True)
+class Chunk:
+    index: int
+    text: str
+    page_start: int
+    page_end: int
+    token_count: int
+    content_hash: str
+
+
+class TextChunker:
+    max_tokens: int
+    overlap_tokens: int
+    respect_pages: bool
+    token_counter: TokenCounter
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+        respect_pages: bool = False,
+        token_counter: TokenCounter = count_tokens,
+    ) -> None:
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.respect_pages = respect_pages
+        self.token_counter = token_counter
+
+    def _split_long_sentence(self, page: int, text: str) -> list[Sentence]:
+        words = text.split()
+        pieces: list[Sentence] = []
+        current: list[str] = []
+        tokens = 0
+        for word in words:
+            word_tokens = self.token_counter(word)
+            if current and tokens + word_tokens > self.max_tokens:
+                pieces.append(Sentence(page, " ".join(current), tokens))
+                current, tokens = [], 0
+            current.append(word)
+            tokens += word_tokens
+        if current:
+            pieces.append(Sentence(page, " ".join(current), tokens))
+        return pieces
+
+    def split_sentences(self, lines: Iterable[TextractLine]) -> list[Sentence]:
+        sentences: list[Sentence] = []
+        for page, page_lines in groupby(lines, key=lambda line: line.page):
+            text = normalize_text(" ".join(line.text for line in page_lines))
+            for sentence in SENTENCE_BOUNDARY.split(text):
+                if not sentence:
+                    continue
+                tokens = self.token_counter(sentence)
+                if tokens > self.max_tokens:
+                    sentences.extend(self._split_long_sentence(page, sentence))
+                else:
+                    sentences.append(Sentence(page, sentence, tokens))
+        return sentences
+
+    def _make_chunk(self, index: int, sentences: Sequence[Sentence]) -> Chunk:
+        text = " ".join(s.text for s in sentences)
+        return Chunk(
+            index=index,
+            text=text,
+            page_start=sentences[0].page,
+            page_end=sentences[-1].page,
+            token_count=sum(s.tokens for s in sentences),
+            content_hash=hash_text(text),
+        )
+
+    def _overlap(self, sentences: Sequence[Sentence]) -> list[Sentence]:
+        overlap: list[Sentence] = []
+        tokens = 0
+        for sentence in reversed(sentences[1:]):
+            if tokens + sentence.tokens > self.overlap_tokens:
+                break
+            overlap.insert(0, sentence)
+            tokens += sentence.tokens
+        return overlap
+
+    def chunk_sentences(self, sentences: Sequence[Sentence]) -> list[Chunk]:
+        chunks: list[Chunk] = []
+        current: list[Sentence] = []
+        tokens = 0
+        for sentence in sentences:
+            page_break = bool(current) and sentence.page != current[-1].page
+            full = tokens + sentence.tokens > self.max_tokens
+            if page_break and not full:
+                full = self.respect_pages or tokens >= self.max_tokens // 2
+            if current and full:
+                chunks.append(self._make_chunk(len(chunks), current))
+                current = [] if page_break else self._overlap(current)
+                tokens = sum(s.tokens for s in current)
+                while current and tokens + sentence.tokens > self.max_tokens:
+                    tokens -= current.pop(0).tokens
+            current.append(sentence)
+            tokens += sentence.tokens
+        if current:
+            chunks.append(self._make_chunk(len(chunks), current))
+        return chunks
+
+    def chunk(self, lines: Iterable[TextractLine]) -> list[Chunk]:
+        return self.chunk_sentences(self.split_sentences(lines))
@@ -0,0 +1,153 @@
+import zlib
+from collections.abc import Sequence
+from typing import Final
+
+import numpy as np
+import numpy.typing as npt
+
+from src.documents.chunker import normalize_text
+
+DEFAULT_NUM_PERM: Final[int] = 128
+DEFAULT_BANDS: Final[int] = 32
+DEFAULT_SHINGLE_SIZE: Final[int] = 5
+DEFAULT_THRESHOLD: Final[float] = 0.85
+
+MERSENNE_PRIME: Final = np.uint64((1 << 61) - 1)
+MAX_HASH: Final = np.uint64(0xFFFFFFFF)
+BAND_HASH_MULTIPLIER: Final = np.uint64(0x100000001B3)
+MAX_BATCH_SHINGLES: Final[int] = 1 << 16
+
+type Signatures = npt.NDArray[np.uint32]
+type BandHashes = npt.NDArray[np.int64]
+
+
+def shingle_hashes(text: str, size: int) -> npt.NDArray[np.uint64]:
+    tokens = normalize_text(text).lower().split()
+    if len(tokens) <= size:
+        grams = [" ".join(tokens)]
+    else:
+        grams = [
+            " ".join(tokens[i : i + size])
+            for i in range(len(tokens) - size + 1)
+        ]
+    return np.fromiter(
+        (zlib.crc32(g.encode()) for g in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+class MinHasher:
+    num_perm: int
+    bands: int
+    shingle_size: int
+    threshold: float
+
+    def __init__(
+        self,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        threshold: float = DEFAULT_THRESHOLD,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+
+    @property
+    def rows(self) -> int:
+        return self.num_perm // self.bands
+
+    def _signatures_batch(
+        self, hashes: Sequence[npt.NDArray[np.uint64]]
+    ) -> Signatures:
+        flat = np.concatenate(hashes)
+        offsets = np.zeros(len(hashes), dtype=np.intp)
+        np.cumsum([len(h) for h in hashes[:-1]], out=offsets[1:])
+        permuted = (
+            (flat[:, np.newaxis] * self._a + self._b) % MERSENNE_PRIME
+        ) & MAX_HASH
+        return np.minimum.reduceat(permuted, offsets, axis=0).astype(np.uint32)
+
+    def signatures(self, texts: Sequence[str]) -> Signatures:
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        hashes = [shingle_hashes(t, self.shingle_size) for t in texts]
+        start = 0
+        while start < len(hashes):
+            end, total = start, 0
+            while end < len(hashes) and (
+                end == start or total + len(hashes[end]) <= MAX_BATCH_SHINGLES
+            ):
+                total += len(hashes[end])
+                end += 1
+            out[start:end] = self._signatures_batch(hashes[start:end])
+            start = end
+        return out
+
+    def band_hashes(self, signatures: Signatures) -> BandHashes:
+        bands = signatures.reshape(len(signatures), self.bands, self.rows)
+        hashes = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for row in range(self.rows):
+                hashes = hashes * BAND_HASH_MULTIPLIER + bands[:, :, row]
+        return hashes.view(np.int64)
+
+    def similarity(
+        self, a: Signatures, b: Signatures
+    ) -> npt.NDArray[np.float64]:
+        return np.mean(a == b, axis=-1)
+
+    def find_duplicates(
+        self, signatures: Signatures, band_hashes: BandHashes
+    ) -> list[int]:
+        canonical = list(range(len(signatures)))
+        buckets: dict[tuple[int, int], int] = {}
+        for i, row in enumerate(band_hashes.tolist()):
+            for band, value in enumerate(row):
+                j = canonical[buckets.setdefault((band, value), i)]
+                if j == i or canonical[i] != i:
+                    continue
+                if (
+                    self.similarity(signatures[i], signatures[j])
+                    >= self.threshold
+                ):
+                    canonical[i] = j
+        return canonical
+
+    def match(
+        self,
+        signatures: Signatures,
+        band_hashes: BandHashes,
+        candidates: Signatures,
+    ) -> list[int | None]:
+        if not len(candidates):
+            return [None] * len(signatures)
+        candidate_bands = self.band_hashes(candidates)
+        buckets: dict[tuple[int, int], list[int]] = {}
+        for j, row in enumerate(candidate_bands.tolist()):
+            for band, value in enumerate(row):
+                buckets.setdefault((band, value), []).append(j)
+        matches: list[int | None] = []
+        for i, row in enumerate(band_hashes.tolist()):
+            found = {
+                j
+                for band, value in enumerate(row)
+                for j in buckets.get((band, value), ())
+            }
+            if not found:
+                matches.append(None)
+                continue
+            ids = np.fromiter(found, dtype=np.intp, count=len(found))
+            scores = self.similarity(candidates[ids], signatures[i])
+            best = int(np.argmax(scores))
+            matches.append(
+                int(ids[best]) if scores[best] >= self.threshold else None
+            )
+        return matches
@@ -0,0 +1,243 @@
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import batched
+from typing import Final
+
+import numpy as np
+
+from src.agents.cache import SemanticResponseCache
+from src.aws.textract import Textract
+from src.documents.chunker import Chunk, TextChunker
+from src.documents.dedup import MinHasher
+from src.embeddings.cohere import BedrockCohereEmbeddings
+from src.models.document import Document, DocumentChunk, DocumentChunkBand
+from src.repositories import DocumentRepository
+
+logger = logging.getLogger("documents.ingest")
+
+EMBEDDING_BATCH_SIZE: Final[int] = 96
+
+
+@dataclass
+class IngestReport:
+    chunks: int = 0
+    reused: int = 0
+    embedded: int = 0
+    duplicates: int = 0
+    deleted: int = 0
+
+    @property
+    def dedup_ratio(self) -> float:
+        total = self.embedded + self.duplicates
+        return self.duplicates / total if total else 0.0
+
+
+class DocumentIngestor:
+    textract: Textract
+    embeddings: BedrockCohereEmbeddings
+    chunker: TextChunker
+    hasher: MinHasher | None
+    cache: SemanticResponseCache | None
+
+    def __init__(
+        self,
+        textract: Textract | None = None,
+        embeddings: BedrockCohereEmbeddings | None = None,
+        chunker: TextChunker | None = None,
+        hasher: MinHasher | None = None,
+        cache: SemanticResponseCache | None = None,
+    ) -> None:
+        self.textract = textract or Textract()
+        self.embeddings = embeddings or BedrockCohereEmbeddings()
+        self.chunker = chunker or TextChunker()
+        self.hasher = hasher
+        self.cache = cache
+
+    async def embed_chunks(
+        self, chunks: Sequence[Chunk | DocumentChunk]
+    ) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for batch in batched(chunks, EMBEDDING_BATCH_SIZE, strict=False):
+            vectors.extend(
+                await self.embeddings.aembed_documents([c.text for c in batch])
+            )
+        return vectors
+
+    def _bands(
+        self, tenant: str, chunk: DocumentChunk, band_hashes: list[int]
+    ) -> list[DocumentChunkBand]:
+        return [
+            DocumentChunkBand(
+                chunk_id=chunk.id, band=band, tenant=tenant, band_hash=value
+            )
+            for band, value in enumerate(band_hashes)
+        ]
+
+    async def _deduplicate(
+        self,
+        repo: DocumentRepository,
+        document: Document,
+        pending: list[DocumentChunk],
+        stale: set[uuid.UUID],
+    ) -> tuple[list[DocumentChunk], list[DocumentChunkBand]]:
+        if self.hasher is None or not pending:
+            return pending, []
+        signatures = self.hasher.signatures([c.text for c in pending])
+        band_hashes = self.hasher.band_hashes(signatures)
+        for chunk, signature in zip(pending, signatures, strict=True):
+            chunk.minhash = signature.tobytes()
+
+        local = self.hasher.find_duplicates(signatures, band_hashes)
+        roots = [i for i, c in enumerate(local) if c == i]
+        pairs = {
+            (band, value)
+            for i in roots
+            for band, value in enumerate(band_hashes[i].tolist())
+        }
+        candidates = [
+            c
+            for c in await repo.find_canonical_chunks(
+                document.tenant, sorted(pairs)
+            )
+            if c.id not in stale and c.minhash is not None
+        ]
+        matches = self.hasher.match(
+            signatures[roots],
+            band_hashes[roots],
+            np.stack(
+                [np.frombuffer(c.minhash or b"", np.uint32) for c in candidates]
+            )
+            if candidates
+            else np.empty((0, self.hasher.num_perm), np.uint32),
+        )
+        corpus = {
+            i: candidates[m].id
+            for i, m in zip(roots, matches, strict=True)
+            if m is not None
+        }
+
+        unique: list[DocumentChunk] = []
+        bands: list[DocumentChunkBand] = []
+        for i, chunk in enumerate(pending):
+            root = local[i]
+            if root != i or root in corpus:
+                chunk.canonical_id = corpus.get(root, pending[root].id)
+                continue
+            unique.append(chunk)
+            bands.extend(
+                self._bands(document.tenant, chunk, band_hashes[i].tolist())
+            )
+        return unique, bands
+
+    async def _promote_duplicates(
+        self,
+        repo: DocumentRepository,
+        document: Document,
+        deleted: list[DocumentChunk],
+    ) -> tuple[list[DocumentChunk], list[DocumentChunkBand]]:
+        canonical = {c.id: c for c in deleted if c.embedding is not None}
+        duplicates = await repo.list_duplicates(
+            list(canonical), exclude=[c.id for c in deleted]
+        )
+        promoted: dict[uuid.UUID, DocumentChunk] = {}
+        bands: list[DocumentChunkBand] = []
+        for chunk in duplicates:
+            old_id = chunk.canonical_id
+            if old_id is None:
+                continue
+            if old_id not in promoted:
+                promoted[old_id] = chunk
+                chunk.embedding = canonical[old_id].embedding
+                chunk.canonical_id = None
+                if self.hasher is not None and chunk.minhash is not None:
+                    signature = np.frombuffer(chunk.minhash, np.uint32)
+                    band_hashes = self.hasher.band_hashes(signature[None, :])
+                    bands.extend(
+                        self._bands(
+                            document.tenant, chunk, band_hashes[0].tolist()
+                        )
+                    )
+            else:
+                chunk.canonical_id = promoted[old_id].id
+        return duplicates, bands
+
+    async def ingest(
+        self, repo: DocumentRepository, document: Document
+    ) -> IngestReport:
+        lines = await self.textract.adetect_document_lines(
+            document.bucket, document.key
+        )
+        chunks = self.chunker.chunk(lines)
+
+        existing: defaultdict[str, list[DocumentChunk]] = defaultdict(list)
+        for db_chunk in await repo.list_chunks(document.id):
+            existing[db_chunk.content_hash].append(db_chunk)
+
+        report = IngestReport(chunks=len(chunks))
+        upserts: list[DocumentChunk] = []
+        pending: list[DocumentChunk] = []
+        for chunk in chunks:
+            if existing[chunk.content_hash]:
+                db_chunk = existing[chunk.content_hash].pop()
+                if (
+                    db_chunk.index != chunk.index
+                    or db_chunk.page_start != chunk.page_start
+                    or db_chunk.page_end != chunk.page_end
+                ):
+                    db_chunk.index = chunk.index
+                    db_chunk.page_start = chunk.page_start
+                    db_chunk.page_end = chunk.page_end
+                    upserts.append(db_chunk)
+                report.reused += 1
+            else:
+                pending.append(
+                    DocumentChunk(
+                        document_id=document.id,
+                        index=chunk.index,
+                        text=chunk.text,
+                        page_start=chunk.page_start,
+                        page_end=chunk.page_end,
+                        token_count=chunk.token_count,
+                        content_hash=chunk.content_hash,
+                    )
+                )
+        deleted = [c for stale in existing.values() for c in stale]
+        report.deleted = len(deleted)
+
+        unique, bands = await self._deduplicate(
+            repo, document, pending, {c.id for c in deleted}
+        )
+        vectors = await self.embed_chunks(unique)
+        for chunk, vector in zip(unique, vectors, strict=True):
+            chunk.embedding = vector
+        report.embedded = len(unique)
+        report.duplicates = len(pending) - len(unique)
+        upserts.extend(pending)
+
+        promoted, promoted_bands = await self._promote_duplicates(
+            repo, document, deleted
+        )
+        upserts.extend(promoted)
+        bands.extend(promoted_bands)
+
+        await repo.replace_chunks(
+            document, upserts, [c.id for c in deleted], bands
+        )
+        if self.cache is not None:
+            self.cache.invalidate_document(str(document.id))
+        logger.info(
+            "Ingested document %s v%d: %d chunks, %d reused, %d embedded, "
+            "%d deduplicated (%.1f%% embeddings saved), %d deleted",
+            document.id,
+            document.version,
+            report.chunks,
+            report.reused,
+            report.embedded,
+            report.duplicates,
+            report.dedup_ratio * 100,
+            report.deleted,
+        )
+        return report
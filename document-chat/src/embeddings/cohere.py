@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 from concurrent.futures import Executor
@@ -12,7 +11,9 @@ from typing import (
     TypedDict,
 )
 
-import boto3
+from src.aws.clients import get_aws_clients
+from src.core.metrics import aws_call
+from src.utils import asyncfy
 
 if TYPE_CHECKING:
     from mypy_boto3_bedrock_runtime import BedrockRuntimeClient
@@ -86,7 +87,7 @@ class BedrockCohereEmbeddings:
         verbose: bool = False,
     ) -> None:
         self.output_dimension = output_dimension or self.DEFAULT_OUTPUT_DIMENSION
-        self.client = client or boto3.client("bedrock-runtime")
+        self.client = client or get_aws_clients().client("bedrock-runtime")  # type: ignore
         self.verbose = verbose
 
     def _invoke_bedrock_cohere_model(
@@ -95,13 +96,14 @@ class BedrockCohereEmbeddings:
         _body = json.dumps(body, indent=2)
         if self.verbose:
             logger.info("Calling Bedrock Cohere model with input: %s", _body)
-        response = self.client.invoke_model(
-            modelId=self.MODEL_ID,
-            body=_body,
-            accept="*/*",
-            contentType="application/json",
-        )
-        response_body = json.loads(response["body"].read())
+        with aws_call("bedrock", "embed"):
+            response = self.client.invoke_model(
+                modelId=self.MODEL_ID,
+                body=_body,
+                accept="*/*",
+                contentType="application/json",
+            )
+            response_body = json.loads(response["body"].read())
         if self.verbose:
             logger.info(
                 "Response from Bedrock Cohere model: %s",
@@ -112,9 +114,10 @@ class BedrockCohereEmbeddings:
     async def _ainvoke_bedrock_cohere_model(
         self, body: CohereRequestBody, executor: Executor | None = None
     ) -> CohereResponseBody:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            executor, self._invoke_bedrock_cohere_model, body
+        return await asyncfy(
+            self._invoke_bedrock_cohere_model,
+            body,
+            executor=executor or get_aws_clients().executor("bedrock-runtime"),
         )
 
     def _get_query_body(self, query: str) -> CohereRequestBody:
@@ -0,0 +1,3 @@
+from src.jobs.cli import app
+
+app()
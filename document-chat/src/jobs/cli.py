@@ -0,0 +1,182 @@
+import asyncio
+import signal
+import uuid
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.archive.archiver import ensure_partitions, maintain_messages  # noqa: E402
+from src.aws.clients import get_aws_clients  # noqa: E402
+from src.core import dispose_engines, settings  # noqa: E402
+from src.core.log import setup_logging  # noqa: E402
+from src.core.shards import get_shard_router  # noqa: E402
+from src.dependencies.archive import get_message_archiver  # noqa: E402
+from src.jobs.handlers import HANDLERS  # noqa: E402
+from src.jobs.worker import JobWorker  # noqa: E402
+from src.messages.transfer import (  # noqa: E402
+    MessageImportError,
+    import_messages,
+    read_file,
+)
+from src.shards.rebalancer import ShardRebalancer  # noqa: E402
+
+app = typer.Typer(no_args_is_help=True)
+
+
+@app.callback()
+def main() -> None:
+    """Background job processing."""
+
+
+async def _run_worker(worker: JobWorker) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await ensure_partitions(settings.MESSAGE_PARTITION_MONTHS_AHEAD)
+        await worker.run(stop)
+    finally:
+        await dispose_engines()
+        get_aws_clients().close()
+
+
+@app.command()
+def worker(
+    concurrency: Annotated[
+        int, typer.Option(help="Jobs processed concurrently.")
+    ] = settings.JOB_CONCURRENCY,
+    kind: Annotated[
+        list[str] | None,
+        typer.Option(help="Only claim jobs of this kind (repeatable)."),
+    ] = None,
+    worker_id: Annotated[
+        str | None, typer.Option(help="Defaults to hostname:pid.")
+    ] = None,
+) -> None:
+    """Claim and run queued jobs until interrupted."""
+    handlers = {k: v for k, v in HANDLERS.items() if not kind or k in kind}
+    if not handlers:
+        raise typer.BadParameter(f"No handlers for {kind}", param_hint="kind")
+    listener = setup_logging(
+        settings.LOG_LEVEL,
+        settings.LOG_FORMAT,
+        settings.LOG_REQUEST_SAMPLE_RATE,
+    )
+    try:
+        asyncio.run(
+            _run_worker(
+                JobWorker(
+                    handlers,
+                    worker_id=worker_id,
+                    concurrency=concurrency,
+                    poll_interval=settings.JOB_POLL_INTERVAL,
+                    visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT,
+                    backoff_base=settings.JOB_BACKOFF_BASE,
+                    backoff_max=settings.JOB_BACKOFF_MAX,
+                )
+            )
+        )
+    finally:
+        listener.stop()
+
+
+async def _archive_messages() -> None:
+    try:
+        report = await maintain_messages(
+            get_message_archiver(), settings.MESSAGE_PARTITION_MONTHS_AHEAD
+        )
+    finally:
+        await dispose_engines()
+        get_aws_clients().close()
+    typer.echo(report.model_dump_json(indent=2))
+
+
+@app.command()
+def archive_messages() -> None:
+    """Create upcoming message partitions and archive expired ones."""
+    listener = setup_logging(
+        settings.LOG_LEVEL,
+        settings.LOG_FORMAT,
+        settings.LOG_REQUEST_SAMPLE_RATE,
+    )
+    try:
+        asyncio.run(_archive_messages())
+    finally:
+        listener.stop()
+
+
+async def _import_messages(
+    path: Path, chat_id: uuid.UUID | None, batch_size: int
+) -> int:
+    try:
+        return await import_messages(read_file(path), chat_id, batch_size)
+    finally:
+        await dispose_engines()
+
+
+@app.command("import-messages")
+def import_messages_command(
+    path: Annotated[
+        Path,
+        typer.Argument(
+            exists=True, dir_okay=False, help="NDJSON export, may be .gz."
+        ),
+    ],
+    chat_id: Annotated[
+        uuid.UUID | None,
+        typer.Option(help="Import into this chat, not the ones in the file."),
+    ] = None,
+    batch_size: Annotated[
+        int, typer.Option(help="Messages per COPY and commit.")
+    ] = settings.MESSAGE_IMPORT_BATCH_SIZE,
+) -> None:
+    """Bulk load exported messages into existing chats."""
+    listener = setup_logging(
+        settings.LOG_LEVEL,
+        settings.LOG_FORMAT,
+        settings.LOG_REQUEST_SAMPLE_RATE,
+    )
+    try:
+        imported = asyncio.run(_import_messages(path, chat_id, batch_size))
+    except MessageImportError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from e
+    finally:
+        listener.stop()
+    typer.echo(f"Imported {imported} messages")
+
+
+async def _rebalance_shards(dry_run: bool, batch_size: int) -> None:
+    try:
+        report = await ShardRebalancer(
+            get_shard_router(), batch_size
+        ).rebalance(dry_run)
+    finally:
+        await dispose_engines()
+    typer.echo(report.model_dump_json(indent=2))
+
+
+@app.command()
+def rebalance_shards(
+    dry_run: Annotated[
+        bool, typer.Option(help="Only count the chats to move.")
+    ] = False,
+    batch_size: Annotated[
+        int, typer.Option(help="Rows read per round trip.")
+    ] = settings.SHARD_REBALANCE_BATCH_SIZE,
+) -> None:
+    """Move chats onto the shards the configured ring assigns them."""
+    listener = setup_logging(
+        settings.LOG_LEVEL,
+        settings.LOG_FORMAT,
+        settings.LOG_REQUEST_SAMPLE_RATE,
+    )
+    try:
+        asyncio.run(_rebalance_shards(dry_run, batch_size))
+    finally:
+        listener.stop()
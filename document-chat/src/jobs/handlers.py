@@ -0,0 +1,43 @@
+import uuid
+from typing import Any
+
+from src.archive.archiver import maintain_messages
+from src.core import session_maker, settings
+from src.dependencies.archive import get_message_archiver
+from src.dependencies.documents import get_document_ingestor
+from src.jobs.worker import JobHandler, PermanentJobError
+from src.models.document import DocumentIngestRead, DocumentRead
+from src.models.job import Job, JobKind
+from src.repositories import DocumentRepository
+
+
+async def ingest_document(job: Job) -> dict[str, Any]:
+    document_id = uuid.UUID(job.payload["document_id"])
+    async with session_maker() as session:
+        repo = DocumentRepository(session)
+        document = await repo.get_document(document_id)
+        if document is None:
+            raise PermanentJobError(f"Document {document_id} not found.")
+        report = await get_document_ingestor().ingest(repo, document)
+        return DocumentIngestRead(
+            document=DocumentRead.model_validate(document),
+            chunks=report.chunks,
+            reused=report.reused,
+            embedded=report.embedded,
+            duplicates=report.duplicates,
+            deleted=report.deleted,
+            dedup_ratio=report.dedup_ratio,
+        ).model_dump(mode="json")
+
+
+async def archive_messages(job: Job) -> dict[str, Any]:
+    report = await maintain_messages(
+        get_message_archiver(), settings.MESSAGE_PARTITION_MONTHS_AHEAD
+    )
+    return report.model_dump(mode="json")
+
+
+HANDLERS: dict[str, JobHandler] = {
+    JobKind.DOCUMENT_INGEST: ingest_document,
+    JobKind.MESSAGE_ARCHIVE: archive_messages,
+}
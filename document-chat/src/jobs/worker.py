@@ -0,0 +1,184 @@
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import socket
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from datetime import timedelta
+from typing import Any, Final
+
+from src.core import session_maker
+from src.models.job import Job
+from src.repositories.job import JobRepository
+
+logger = logging.getLogger("jobs.worker")
+
+DEFAULT_POLL_INTERVAL: Final[float] = 1.0
+DEFAULT_VISIBILITY_TIMEOUT: Final[float] = 300.0
+DEFAULT_BACKOFF_BASE: Final[float] = 5.0
+DEFAULT_BACKOFF_MAX: Final[float] = 600.0
+
+type JobHandler = Callable[[Job], Awaitable[dict[str, Any] | None]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed."""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobWorker:
+    handlers: Mapping[str, JobHandler]
+    worker_id: str
+    concurrency: int
+    poll_interval: float
+    visibility_timeout: timedelta
+    backoff_base: float
+    backoff_max: float
+
+    def __init__(
+        self,
+        handlers: Mapping[str, JobHandler],
+        worker_id: str | None = None,
+        concurrency: int = 1,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+    ) -> None:
+        self.handlers = handlers
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.visibility_timeout = timedelta(seconds=visibility_timeout)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    @property
+    def kinds(self) -> Sequence[str]:
+        return list(self.handlers)
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))  # noqa: S311
+
+    async def _heartbeat(self, job: Job, task: asyncio.Task) -> None:
+        interval = self.visibility_timeout.total_seconds() / 3
+        while not task.done():
+            await asyncio.sleep(interval)
+            async with session_maker() as session:
+                alive = await JobRepository(session).heartbeat(
+                    job, self.worker_id, self.visibility_timeout
+                )
+            if not alive:
+                logger.warning(
+                    "Lost lease on job %s (%s), cancelling", job.id, job.kind
+                )
+                task.cancel()
+                return
+
+    async def execute(self, job: Job) -> None:
+        handler = self.handlers[job.kind]
+        task = asyncio.create_task(handler(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, task))
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if heartbeat.done():
+                return
+            raise
+        except Exception as e:
+            permanent = isinstance(e, PermanentJobError)
+            retry_in = (
+                None
+                if permanent or job.attempts >= job.max_attempts
+                else self.retry_delay(job.attempts)
+            )
+            async with session_maker() as session:
+                await JobRepository(session).fail(
+                    job, self.worker_id, f"{type(e).__name__}: {e}", retry_in
+                )
+            logger.exception(
+                "Job %s (%s) failed on attempt %d/%d, %s",
+                job.id,
+                job.kind,
+                job.attempts,
+                job.max_attempts,
+                f"retrying in {retry_in}" if retry_in else "giving up",
+            )
+            return
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+
+        async with session_maker() as session:
+            completed = await JobRepository(session).complete(
+                job, self.worker_id, result
+            )
+        if not completed:
+            logger.warning(
+                "Job %s (%s) finished after its lease expired", job.id, job.kind
+            )
+
+    async def run_once(self) -> bool:
+        async with session_maker() as session:
+            job = await JobRepository(session).claim(
+                self.worker_id, self.visibility_timeout, self.kinds
+            )
+        if job is None:
+            return False
+        logger.info(
+            "Claimed job %s (%s) for tenant %s, attempt %d",
+            job.id,
+            job.kind,
+            job.tenant,
+            job.attempts,
+        )
+        await self.execute(job)
+        return True
+
+    async def _slot(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                if await self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Worker %s failed to claim", self.worker_id)
+            # Jittered polling keeps idle workers from hitting Postgres in
+            # lockstep.
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    stop.wait(),
+                    self.poll_interval * random.uniform(0.5, 1.5),  # noqa: S311
+                )
+
+    async def _reaper(self, stop: asyncio.Event) -> None:
+        interval = self.visibility_timeout.total_seconds() / 2
+        while not stop.is_set():
+            try:
+                async with session_maker() as session:
+                    released = await JobRepository(session).requeue_expired()
+                if released:
+                    logger.warning("Released %d expired jobs", released)
+            except Exception:
+                logger.exception("Worker %s failed to reap", self.worker_id)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(stop.wait(), interval)
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        stop = stop or asyncio.Event()
+        logger.info(
+            "Worker %s started with %d slots for %s",
+            self.worker_id,
+            self.concurrency,
+            ", ".join(self.kinds),
+        )
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(self._reaper(stop))
+            for _ in range(self.concurrency):
+                tg.create_task(self._slot(stop))
+        logger.info("Worker %s stopped", self.worker_id)
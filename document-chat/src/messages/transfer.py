@@ -0,0 +1,164 @@
+import asyncio
+import gzip
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Final
+
+import asyncpg
+from pydantic import ValidationError
+
+from src.archive.partitions import month_start
+from src.core import Shard, shards
+from src.core.shards import ShardRouter, get_shard_router
+from src.models.message import Message, MessageExport
+from src.repositories import MessageArchiveRepository, MessageRepository
+from src.utils import now_utc
+
+DEFAULT_IMPORT_BATCH_SIZE: Final[int] = 5000
+READ_CHUNK_SIZE: Final[int] = 1 << 20
+
+
+class MessageImportError(ValueError):
+    """Lines that could not be imported; the batches before them were."""
+
+    imported: int
+
+    def __init__(self, lines: str, imported: int, reason: str) -> None:
+        super().__init__(
+            f"{lines}: {reason} ({imported} messages imported before)"
+        )
+        self.imported = imported
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    rest = b""
+    async for chunk in chunks:
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        for line in lines:
+            yield line
+    if rest:
+        yield rest
+
+
+async def read_file(path: Path) -> AsyncIterator[bytes]:
+    """The file's bytes in chunks, decompressed if it ends in .gz."""
+    opener = gzip.open if path.suffix == ".gz" else Path.open
+    f = await asyncio.to_thread(opener, path, "rb")
+    with f:
+        while chunk := await asyncio.to_thread(f.read, READ_CHUNK_SIZE):
+            yield chunk
+
+
+def _to_message(
+    line: bytes, chat_id: uuid.UUID | None, archived_until: datetime | None
+) -> Message:
+    data = MessageExport.model_validate_json(line)
+    chat_id = chat_id or data.chat_id
+    if chat_id is None:
+        raise ValueError("chat_id is missing")
+    created_at = data.created_at or now_utc()
+    # Its partition is gone, and reads take archived months to precede
+    # live ones.
+    if archived_until is not None and created_at < archived_until:
+        raise ValueError(f"created_at {created_at} is in an archived month")
+    return Message(
+        id=data.id or uuid.uuid4(),
+        chat_id=chat_id,
+        role=data.role,
+        content=data.content,
+        created_at=created_at,
+        system=data.system,
+        usage=data.usage,
+        model=data.model,
+    )
+
+
+async def _archived_until() -> datetime | None:
+    """The latest end of an archived month on any shard."""
+    horizons: list[datetime] = []
+    for shard in shards:
+        async with shard.session_maker() as session:
+            horizon = await MessageArchiveRepository(session).archived_until()
+        if horizon is not None:
+            horizons.append(horizon)
+    return max(horizons, default=None)
+
+
+async def _by_shard(
+    router: ShardRouter, messages: Iterable[Message]
+) -> dict[int, list[Message]]:
+    located: dict[uuid.UUID, Shard] = {}
+    parts: dict[int, list[Message]] = defaultdict(list)
+    for message in messages:
+        if message.chat_id not in located:
+            located[message.chat_id] = await router.locate(message.chat_id)
+        parts[located[message.chat_id].index].append(message)
+    return parts
+
+
+async def _copy_to_shard(
+    shard: Shard, messages: list[Message], months: set[datetime]
+) -> int:
+    """COPY the messages, first creating the partitions of their months
+    not in ``months``, the ones known to exist on the shard."""
+    async with shard.session_maker() as session:
+        new = {month_start(m.created_at) for m in messages} - months
+        if new:
+            await MessageArchiveRepository(session).create_partitions(
+                sorted(new)
+            )
+            months.update(new)
+        return await MessageRepository(session).copy_messages(messages)
+
+
+async def import_messages(
+    chunks: AsyncIterable[bytes],
+    chat_id: uuid.UUID | None = None,
+    batch_size: int = DEFAULT_IMPORT_BATCH_SIZE,
+) -> int:
+    """Bulk load NDJSON lines of MessageExport with COPY.
+
+    Messages go into ``chat_id``, or the chat each line names. Batches
+    are committed shard by shard as they are loaded, creating the
+    partitions of their months first, and the chats must exist. Returns
+    how many messages were imported.
+    """
+    router = get_shard_router()
+    archived_until = await _archived_until()
+    imported = 0
+    batch: list[Message] = []
+    first = 1
+    months: dict[int, set[datetime]] = defaultdict(set)
+
+    async def flush(last: int) -> None:
+        nonlocal imported, first
+        for index, messages in (await _by_shard(router, batch)).items():
+            try:
+                imported += await _copy_to_shard(
+                    router.shards[index], messages, months[index]
+                )
+            except asyncpg.PostgresError as e:
+                raise MessageImportError(
+                    f"Lines {first}-{last}", imported, str(e)
+                ) from e
+        batch.clear()
+        first = last + 1
+
+    number = 0
+    async for line in iter_lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            batch.append(_to_message(line, chat_id, archived_until))
+        except (ValidationError, ValueError) as e:
+            raise MessageImportError(f"Line {number}", imported, str(e)) from e
+        if len(batch) >= batch_size:
+            await flush(number)
+    if batch:
+        await flush(number)
+    return imported
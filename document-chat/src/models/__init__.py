@@ -1,6 +1,17 @@
 from sqlmodel import SQLModel
 
+from src.models.archive import MessageArchive
 from src.models.chat import Chat, ChatCreate, ChatRead
+from src.models.counter import ChatMessageCount, TableRowCount
+from src.models.document import (
+    Document,
+    DocumentChunk,
+    DocumentCreate,
+    DocumentRead,
+)
+from src.models.idempotency import IdempotencyRecord
+from src.models.job import Job, JobRead
+from src.models.memory import MessageEmbedding
 from src.models.message import Message, MessageCreate, MessageRead
 
 NAMING_CONVENTION = {
@@ -23,4 +34,15 @@ __all__ = [
     "Message",
     "MessageCreate",
     "MessageRead",
+    "MessageEmbedding",
+    "MessageArchive",
+    "TableRowCount",
+    "ChatMessageCount",
+    "Document",
+    "DocumentChunk",
+    "DocumentCreate",
+    "DocumentRead",
+    "Job",
+    "JobRead",
+    "IdempotencyRecord",
 ]
@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel
+
+
+class AdmissionStatsRead(SQLModel):
+    active: int
+    queued: int
+    admitted: int
+    rejected: int
+    timed_out: int
+    wait_seconds_mean: float
+    wait_seconds_max: float
+    requests_available: float
+    input_tokens_available: float
+    output_tokens_available: float
@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlmodel import VARCHAR, Column, Field, ForeignKey, SQLModel, func
+
+from src.utils import now_utc
+
+
+class MessageArchive(SQLModel, table=True):
+    """Where a chat's messages of one archived partition were written."""
+
+    __tablename__ = "message_archive"  # type: ignore
+
+    chat_id: uuid.UUID = Field(
+        sa_column=Column(
+            "chat_id",
+            ForeignKey("chat.id", onupdate="CASCADE", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    period_start: datetime = Field(
+        sa_column=Column(TIMESTAMP(True, 6), primary_key=True)
+    )
+    period_end: datetime = Field(
+        sa_column=Column(TIMESTAMP(True, 6), nullable=False)
+    )
+    uri: str = Field(sa_type=VARCHAR(1024))
+    messages: int
+    archived_at: datetime = Field(
+        default_factory=now_utc,
+        sa_column=Column(
+            TIMESTAMP(True, 6),
+            nullable=False,
+            server_default=func.current_timestamp(),
+        ),
+    )
+
+
+class MessageArchiveRead(SQLModel):
+    partitions: list[str]
+    chats: int
+    messages: int
+    created: list[str]
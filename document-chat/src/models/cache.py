@@ -0,0 +1,8 @@
+from sqlmodel import SQLModel
+
+
+class CacheStatsRead(SQLModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    latency_saved: float
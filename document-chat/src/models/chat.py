@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy.dialects.postgresql import TIMESTAMP
-from sqlmodel import VARCHAR, Column, Field, SQLModel, func, text
+from sqlmodel import VARCHAR, Column, Field, Index, SQLModel, func, text
 
 from src.utils import now_utc
 
@@ -20,6 +20,8 @@ class ChatBase(SQLModel):
 
 
 class Chat(ChatBase, table=True):
+    __table_args__ = (Index("ix_chat_created_at_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         primary_key=True,
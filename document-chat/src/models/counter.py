@@ -0,0 +1,40 @@
+import uuid
+
+from sqlalchemy.dialects.postgresql import BIGINT, SMALLINT
+from sqlmodel import VARCHAR, Column, Field, ForeignKey, SQLModel
+
+# Rows of a table are counted on this many rows, one picked at random per
+# write, so concurrent writers rarely wait on each other's row lock.
+COUNTER_SHARDS = 16
+
+
+class TableRowCount(SQLModel, table=True):
+    """Rows of a table, kept by triggers; the sum over its shards."""
+
+    __tablename__ = "table_row_count"  # type: ignore
+
+    table_name: str = Field(sa_type=VARCHAR(64), primary_key=True)
+    shard: int = Field(sa_column=Column(SMALLINT, primary_key=True))
+    count: int = Field(
+        sa_column=Column(BIGINT, nullable=False, server_default="0")
+    )
+
+
+class ChatMessageCount(SQLModel, table=True):
+    """Messages of a chat, archived ones included, kept by triggers.
+
+    Not sharded: a chat's turns are written one at a time.
+    """
+
+    __tablename__ = "chat_message_count"  # type: ignore
+
+    chat_id: uuid.UUID = Field(
+        sa_column=Column(
+            "chat_id",
+            ForeignKey("chat.id", onupdate="CASCADE", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    count: int = Field(
+        sa_column=Column(BIGINT, nullable=False, server_default="0")
+    )
@@ -0,0 +1,163 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from pgvector.sqlalchemy import VECTOR
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlmodel import (
+    VARCHAR,
+    BigInteger,
+    Column,
+    Field,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    SmallInteger,
+    SQLModel,
+    Text,
+    func,
+    text,
+)
+
+from src.models.memory import EMBEDDING_DIMENSION
+from src.utils import now_utc
+
+DEFAULT_TENANT = "default"
+
+
+class DocumentBase(SQLModel):
+    tenant: str = Field(
+        default=DEFAULT_TENANT,
+        sa_type=VARCHAR(255),
+        sa_column_kwargs={"server_default": DEFAULT_TENANT},
+        index=True,
+    )
+    name: str = Field(sa_type=VARCHAR(255))
+    bucket: str = Field(sa_type=VARCHAR(255))
+    key: str = Field(sa_type=Text)
+
+
+class Document(DocumentBase, table=True):
+    __table_args__ = (Index("ix_document_created_at_id", "created_at", "id"),)
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    created_at: datetime = Field(
+        default_factory=now_utc,
+        sa_column=Column(
+            TIMESTAMP(True, 6),
+            nullable=False,
+            server_default=func.current_timestamp(),
+        ),
+    )
+    updated_at: datetime = Field(
+        default_factory=now_utc,
+        sa_column=Column(
+            TIMESTAMP(True, 6),
+            nullable=False,
+            server_default=func.current_timestamp(),
+        ),
+    )
+
+
+class DocumentCreate(DocumentBase): ...
+
+
+class DocumentRead(DocumentBase):
+    id: uuid.UUID
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class DocumentChunkSourceRead(SQLModel):
+    id: uuid.UUID
+    document_id: uuid.UUID
+    index: int
+    page_start: int
+    page_end: int
+
+
+class DocumentIngestRead(SQLModel):
+    document: DocumentRead
+    chunks: int
+    reused: int
+    embedded: int
+    duplicates: int
+    deleted: int
+    dedup_ratio: float
+
+
+class DocumentChunk(SQLModel, table=True):
+    __tablename__ = "document_chunk"  # type: ignore
+    __table_args__ = (
+        Index(
+            "ix_document_chunk_document_id_content_hash",
+            "document_id",
+            "content_hash",
+        ),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
+    document_id: uuid.UUID = Field(
+        sa_column=Column(
+            "document_id",
+            ForeignKey("document.id", onupdate="CASCADE", ondelete="CASCADE"),
+            nullable=False,
+        )
+    )
+    index: int
+    text: str = Field(sa_type=Text)
+    page_start: int
+    page_end: int
+    token_count: int
+    content_hash: str = Field(sa_type=VARCHAR(64))
+    minhash: bytes | None = Field(default=None, sa_type=LargeBinary)
+    canonical_id: uuid.UUID | None = Field(
+        default=None,
+        sa_column=Column(
+            "canonical_id",
+            ForeignKey(
+                "document_chunk.id", onupdate="CASCADE", ondelete="SET NULL"
+            ),
+            nullable=True,
+            index=True,
+        ),
+    )
+    embedding: Any = Field(
+        default=None,
+        sa_column=Column(VECTOR(EMBEDDING_DIMENSION), nullable=True),
+    )
+
+
+class DocumentChunkBand(SQLModel, table=True):
+    __tablename__ = "document_chunk_band"  # type: ignore
+    __table_args__ = (
+        Index(
+            "ix_document_chunk_band_lookup",
+            "tenant",
+            "band",
+            "band_hash",
+        ),
+    )
+
+    chunk_id: uuid.UUID = Field(
+        sa_column=Column(
+            "chunk_id",
+            ForeignKey(
+                "document_chunk.id", onupdate="CASCADE", ondelete="CASCADE"
+            ),
+            primary_key=True,
+        )
+    )
+    band: int = Field(sa_type=SmallInteger, primary_key=True)
+    tenant: str = Field(sa_type=VARCHAR(255))
+    band_hash: int = Field(sa_type=BigInteger)
@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+from sqlmodel import VARCHAR, Column, Field, ForeignKey, SQLModel, func
+
+from src.utils import now_utc
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    __tablename__ = "idempotency_key"  # type: ignore
+
+    chat_id: uuid.UUID = Field(
+        sa_column=Column(
+            "chat_id",
+            ForeignKey("chat.id", onupdate="CASCADE", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    key: str = Field(sa_type=VARCHAR(255), primary_key=True)
+    request_hash: str = Field(sa_type=VARCHAR(64))
+    status_code: int
+    response: Any = Field(sa_column=Column(JSONB, nullable=False))
+    created_at: datetime = Field(
+        default_factory=now_utc,
+        sa_column=Column(
+            TIMESTAMP(True, 6),
+            nullable=False,
+            server_default=func.current_timestamp(),
+            index=True,
+        ),
+    )
@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+from sqlmodel import (
+    VARCHAR,
+    Column,
+    Field,
+    Index,
+    SQLModel,
+    Text,
+    func,
+    text,
+)
+
+from src.models.document import DEFAULT_TENANT
+from src.utils import now_utc
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobKind(StrEnum):
+    DOCUMENT_INGEST = "document.ingest"
+    MESSAGE_ARCHIVE = "message.archive"
+
+
+class JobBase(SQLModel):
+    kind: str = Field(sa_type=VARCHAR(64))
+    tenant: str = Field(default=DEFAULT_TENANT, sa_type=VARCHAR(255))
+    payload: dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column(JSONB, nullable=False)
+    )
+    priority: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    max_attempts: int = Field(
+        default=5, sa_column_kwargs={"server_default": "5"}
+    )
+
+
+class Job(JobBase, table=True):
+    __table_args__ = (
+        Index(
+            "ix_job_claim",
+            "tenant",
+            text("priority DESC"),
+            "run_at",
+            postgresql_where=text("status = 'QUEUED'"),
+        ),
+        Index(
+            "ix_job_running",
+            "tenant",
+            "locked_until",
+            postgresql_where=text("status = 'RUNNING'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    attempts: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    run_at: datetime = Field(
+        default_factory=now_utc,
+        sa_column=Column(
+            TIMESTAMP(True, 6),
+            nullable=False,
+            server_default=func.current_timestamp(),
+        ),
+    )
+    locked_until: datetime | None = Field(
+        default=None, sa_column=Column(TIMESTAMP(True, 6), nullable=True)
+    )
+    locked_by: str | None = Field(default=None, sa_type=VARCHAR(255))
+    last_error: str | None = Field(default=None, sa_type=Text)
+    result: dict[str, Any] | None = Field(
+        default=None, sa_column=Column(JSONB, nullable=True)
+    )
+    created_at: datetime = Field(
+        default_factory=now_utc,
+        sa_column=Column(
+            TIMESTAMP(True, 6),
+            nullable=False,
+            server_default=func.current_timestamp(),
+        ),
+    )
+    finished_at: datetime | None = Field(
+        default=None, sa_column=Column(TIMESTAMP(True, 6), nullable=True)
+    )
+
+
+class JobRead(JobBase):
+    id: uuid.UUID
+    status: JobStatus
+    attempts: int
+    run_at: datetime
+    last_error: str | None
+    result: dict[str, Any] | None
+    created_at: datetime
+    finished_at: datetime | None
@@ -0,0 +1,37 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from pgvector.sqlalchemy import VECTOR
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlmodel import Column, Field, ForeignKey, Index, SQLModel
+
+from src.embeddings.cohere import BedrockCohereEmbeddings
+
+EMBEDDING_DIMENSION = BedrockCohereEmbeddings.DEFAULT_OUTPUT_DIMENSION
+
+
+class MessageEmbedding(SQLModel, table=True):
+    __tablename__ = "message_embedding"  # type: ignore
+    __table_args__ = (
+        Index(
+            "ix_message_embedding_chat_id_created_at", "chat_id", "created_at"
+        ),
+    )
+
+    # Not a foreign key: message is partitioned, and archiving a partition
+    # deletes its messages' embeddings itself.
+    message_id: uuid.UUID = Field(primary_key=True)
+    chat_id: uuid.UUID = Field(
+        sa_column=Column(
+            "chat_id",
+            ForeignKey("chat.id", onupdate="CASCADE", ondelete="CASCADE"),
+            nullable=False,
+        )
+    )
+    created_at: datetime = Field(
+        sa_column=Column(TIMESTAMP(True, 6), nullable=False)
+    )
+    embedding: Any = Field(
+        sa_column=Column(VECTOR(EMBEDDING_DIMENSION), nullable=False)
+    )
@@ -1,10 +1,22 @@
 import uuid
+from collections.abc import Iterable
 from datetime import datetime
 from enum import StrEnum
-from typing import Any, Literal, TypedDict
+from typing import Any, Literal, NamedTuple, TypedDict
 
+from pydantic import AwareDatetime
+from pydantic_core import to_json
 from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
-from sqlmodel import Column, Field, ForeignKey, SQLModel, Text, func, text
+from sqlmodel import (
+    Column,
+    Field,
+    ForeignKey,
+    Index,
+    SQLModel,
+    Text,
+    func,
+    text,
+)
 
 from src.utils import now_utc
 
@@ -41,6 +53,39 @@ class ToolCallContent(TypedDict):
 MessageContent = TextContent | ToolResponseContent | ToolCallContent
 
 
+class MessageHistoryRow(NamedTuple):
+    """As selected by the history query, with content as raw JSON text."""
+
+    id: uuid.UUID
+    role: MessageRole
+    content: str
+    created_at: datetime
+
+
+class MessageReadRow(NamedTuple):
+    """MessageRead's fields in order, with content as raw JSON text."""
+
+    id: uuid.UUID
+    chat_id: uuid.UUID
+    role: MessageRole
+    content: str
+    created_at: datetime
+
+
+class MessageExportRow(NamedTuple):
+    """MessageExport's fields in order, with content and usage as raw JSON
+    text."""
+
+    id: uuid.UUID
+    chat_id: uuid.UUID
+    role: MessageRole
+    content: str
+    created_at: datetime
+    system: str | None
+    usage: str | None
+    model: str | None
+
+
 class MessageBase(SQLModel):
     chat_id: uuid.UUID = Field(
         sa_column=Column(
@@ -86,11 +131,28 @@ class MessageBase(SQLModel):
 
 
 class Message(MessageBase, table=True):
+    # Range partitioned by month on created_at, which the primary key must
+    # include; see src/archive/partitions.py.
+    __table_args__ = (
+        Index(
+            "ix_message_chat_id_created_at_id", "chat_id", "created_at", "id"
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     id: uuid.UUID = Field(
         default_factory=uuid.uuid4,
         primary_key=True,
         sa_column_kwargs={"server_default": text("gen_random_uuid()")},
     )
+    created_at: datetime = Field(
+        default_factory=now_utc,
+        sa_column=Column(
+            TIMESTAMP(True, 6),
+            primary_key=True,
+            server_default=func.current_timestamp(),
+        ),
+    )
 
 
 class MessageCreate(SQLModel):
@@ -103,3 +165,69 @@ class MessageRead(SQLModel):
     role: MessageRole
     content: list[MessageContent]
     created_at: datetime
+
+
+class MessageExport(SQLModel):
+    """A line of an NDJSON export or import.
+
+    Imports may leave out the id and created_at, which are then generated,
+    and the chat_id when importing into one chat.
+    """
+
+    id: uuid.UUID | None = None
+    chat_id: uuid.UUID | None = None
+    role: MessageRole
+    content: list[MessageContent]
+    created_at: AwareDatetime | None = None
+    system: str | None = None
+    usage: Usage | None = None
+    model: str | None = None
+
+
+class MessageImportRead(SQLModel):
+    imported: int
+
+
+class MessageStreamText(SQLModel):
+    type: Literal["text"] = "text"
+    delta: str
+
+
+class MessageStreamDone(SQLModel):
+    type: Literal["done"] = "done"
+    messages: list[MessageRead]
+
+
+class MessageStreamError(SQLModel):
+    type: Literal["error"] = "error"
+    status_code: int
+    detail: str
+    retry_after: int | None = None
+
+
+def dump_message_rows(rows: Iterable[MessageReadRow]) -> bytes:
+    """Serialize rows as a JSON array of MessageRead without validation.
+
+    content is JSON text straight from Postgres and is spliced in as is.
+    """
+    items = [
+        f'{{"id":"{id_}","chat_id":"{chat_id}","role":"{role.value}",'
+        f'"content":{content},"created_at":{to_json(created_at).decode()}}}'
+        for id_, chat_id, role, content, created_at in rows
+    ]
+    return f"[{','.join(items)}]".encode()
+
+
+def dump_message_lines(rows: Iterable[MessageExportRow]) -> bytes:
+    """Serialize rows as NDJSON of MessageExport without validation.
+
+    content and usage are JSON text straight from Postgres.
+    """
+    lines = [
+        f'{{"id":"{id_}","chat_id":"{chat_id}","role":"{role.value}",'
+        f'"content":{content},"created_at":{to_json(created_at).decode()},'
+        f'"system":{to_json(system).decode()},"usage":{usage or "null"},'
+        f'"model":{to_json(model).decode()}}}\n'
+        for id_, chat_id, role, content, created_at, system, usage, model in rows
+    ]
+    return "".join(lines).encode()
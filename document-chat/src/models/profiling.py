@@ -0,0 +1,12 @@
+import uuid
+from datetime import datetime
+
+from sqlmodel import SQLModel
+
+
+class ProfileRead(SQLModel):
+    id: uuid.UUID
+    name: str
+    started_at: datetime
+    duration: float
+    samples: int
@@ -0,0 +1,8 @@
+from sqlmodel import SQLModel
+
+
+class ShardRebalanceRead(SQLModel):
+    chats: int
+    moved: int
+    skipped: int
+    messages: int
@@ -1,4 +1,20 @@
-from .chat import ChatRepository
+from .archive import MessageArchiveRepository
+from .chat import ChatRepository, ShardedChatRepository
+from .counter import CounterRepository
+from .document import DocumentRepository
+from .idempotency import IdempotencyRepository
+from .job import JobRepository
+from .memory import MessageEmbeddingRepository
 from .message import MessageRepository
 
-__all__ = ["ChatRepository", "MessageRepository"]
+__all__ = [
+    "ChatRepository",
+    "CounterRepository",
+    "DocumentRepository",
+    "IdempotencyRepository",
+    "JobRepository",
+    "MessageArchiveRepository",
+    "MessageEmbeddingRepository",
+    "MessageRepository",
+    "ShardedChatRepository",
+]
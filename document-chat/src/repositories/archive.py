@@ -0,0 +1,152 @@
+import uuid
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from typing import Final
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, delete, func, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.archive.partitions import (
+    PARENT,
+    add_months,
+    partition_month,
+    partition_name,
+)
+from src.models.archive import MessageArchive
+from src.models.memory import MessageEmbedding
+from src.models.message import Message
+
+# Detaching takes an exclusive lock on the whole message table; rather
+# fail and retry later than queue every chat turn behind it.
+DETACH_LOCK_TIMEOUT: Final[str] = "5s"
+
+
+class MessageArchiveRepository:
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def list_partitions(self) -> list[datetime]:
+        r = await self.session.exec(
+            text(  # type: ignore
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            params={"parent": PARENT},
+        )
+        months = (partition_month(name) for (name,) in r)
+        return sorted(m for m in months if m is not None)
+
+    async def create_partitions(self, months: Iterable[datetime]) -> list[str]:
+        """Create the partitions of the months that have none."""
+        # Serializes app replicas and workers creating them at startup.
+        await self.session.exec(
+            text("SELECT pg_advisory_xact_lock(hashtextextended(:key, 0))"),  # type: ignore
+            params={"key": "message.partitions"},
+        )
+        existing = set(await self.list_partitions())
+        created: list[str] = []
+        for month in months:
+            if month in existing:
+                continue
+            name = partition_name(month)
+            # Bounds are our own datetimes, not input, so are inlined;
+            # DDL takes no parameters.
+            await self.session.exec(
+                text(  # type: ignore
+                    f"CREATE TABLE {name} PARTITION OF {PARENT} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') "
+                    f"TO ('{add_months(month, 1).isoformat()}')"
+                )
+            )
+            created.append(name)
+        await self.session.commit()
+        return created
+
+    async def lock_partition(self, month: datetime) -> None:
+        """Block writes to the partition until the transaction ends.
+
+        Reads go on, and a concurrent archiver waits here.
+        """
+        await self.session.exec(
+            text(
+                f"LOCK TABLE {partition_name(month)} IN SHARE ROW EXCLUSIVE MODE"
+            )  # type: ignore
+        )
+
+    async def iter_partition_chats(
+        self, month: datetime
+    ) -> AsyncIterator[tuple[uuid.UUID, list[Message]]]:
+        """Each chat's messages of the month, in order, one chat at a time."""
+        table = Message.__table__  # type: ignore
+        stmt = (
+            select(*table.columns)
+            .where(
+                col(Message.created_at) >= month,
+                col(Message.created_at) < add_months(month, 1),
+            )
+            .order_by(
+                col(Message.chat_id), col(Message.created_at), col(Message.id)
+            )
+        )
+        r = await self.session.stream(stmt)
+        chat_id: uuid.UUID | None = None
+        messages: list[Message] = []
+        async for row in r:
+            if row.chat_id != chat_id:
+                if messages:
+                    yield chat_id, messages  # type: ignore
+                chat_id, messages = row.chat_id, []
+            messages.append(Message.model_validate(row._mapping))
+        if messages:
+            yield chat_id, messages  # type: ignore
+
+    async def drop_partition(
+        self, month: datetime, archives: Sequence[MessageArchive]
+    ) -> None:
+        """Record where the month's messages went, then drop them."""
+        if archives:
+            stmt = insert(MessageArchive.__table__)  # type: ignore
+            await self.session.exec(
+                stmt.on_conflict_do_update(  # type: ignore
+                    index_elements=["chat_id", "period_start"],
+                    set_={
+                        "uri": stmt.excluded.uri,
+                        "messages": stmt.excluded.messages,
+                        "archived_at": stmt.excluded.archived_at,
+                    },
+                ),
+                params=[a.model_dump() for a in archives],
+            )
+        await self.session.exec(
+            delete(MessageEmbedding).where(
+                col(MessageEmbedding.created_at) >= month,
+                col(MessageEmbedding.created_at) < add_months(month, 1),
+            )
+        )
+        await self.session.exec(
+            text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'")  # type: ignore
+        )
+        name = partition_name(month)
+        await self.session.exec(
+            text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}")  # type: ignore
+        )
+        await self.session.exec(text(f"DROP TABLE {name}"))  # type: ignore
+        await self.session.commit()
+
+    async def list_archives(self, chat_id: uuid.UUID) -> list[MessageArchive]:
+        stmt = (
+            select(MessageArchive)
+            .where(MessageArchive.chat_id == chat_id)
+            .order_by(col(MessageArchive.period_start))
+        )
+        r = await self.session.exec(stmt)
+        return list(r)
+
+    async def archived_until(self) -> datetime | None:
+        """The end of the latest archived month, None if none was."""
+        r = await self.session.exec(select(func.max(MessageArchive.period_end)))
+        return r.one()
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Final
+
+from sqlalchemy.exc import IntegrityError
+
+from src.core.shards import get_shard_router
+from src.models.message import Message
+from src.repositories.message import MessageRepository
+
+logger = logging.getLogger("repositories.buffer")
+
+DEFAULT_MAX_MESSAGES: Final[int] = 10_000
+DEFAULT_BATCH_SIZE: Final[int] = 500
+DEFAULT_FLUSH_INTERVAL: Final[float] = 0.05
+DEFAULT_RETRY_INTERVAL: Final[float] = 1.0
+DEFAULT_CLOSE_TIMEOUT: Final[float] = 10.0
+
+type FlushCallback = Callable[[list[Message]], Awaitable[None]]
+
+
+@dataclass
+class _Entry:
+    chat_id: uuid.UUID
+    messages: list[Message]
+    callback: FlushCallback | None = None
+    flushed: asyncio.Future[None] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class MessageWriteBuffer:
+    """Write-behind buffer for chat turns.
+
+    Turns are queued in arrival order and flushed by a single background
+    task in multi-row inserts spanning chats, so each chat's messages reach
+    the database in the order they were produced. Messages stay visible
+    through ``pending`` until their insert has committed.
+
+    Failed inserts are retried until they succeed, or once stopping, for
+    at most ``close_timeout`` seconds: the turns still failing then are
+    dropped and their waiters get the error. So are turns that can never
+    be written, such as those of a deleted chat.
+    """
+
+    max_messages: int
+    batch_size: int
+    flush_interval: float
+    retry_interval: float
+    close_timeout: float
+
+    def __init__(
+        self,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        close_timeout: float = DEFAULT_CLOSE_TIMEOUT,
+    ) -> None:
+        self.max_messages = max_messages
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.close_timeout = close_timeout
+        self._queue: deque[_Entry] = deque()
+        self._inflight: list[_Entry] = []
+        self._size = 0
+        self._closed = False
+        self._deadline: float | None = None
+        self._condition = asyncio.Condition()
+        self._task: asyncio.Task | None = None
+        self._callbacks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _entries(self) -> Iterable[_Entry]:
+        yield from self._inflight
+        yield from self._queue
+
+    def pending(self, chat_id: uuid.UUID) -> list[Message]:
+        return [
+            m
+            for e in self._entries()
+            if e.chat_id == chat_id
+            for m in e.messages
+        ]
+
+    async def put(
+        self, messages: list[Message], callback: FlushCallback | None = None
+    ) -> None:
+        """Queue a turn, waiting while the buffer is full."""
+        if not messages:
+            return
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: (
+                    self._closed
+                    or self._size == 0
+                    or self._size + len(messages) <= self.max_messages
+                )
+            )
+            if self._closed:
+                raise RuntimeError("Message buffer is closed")
+            self._queue.append(_Entry(messages[0].chat_id, messages, callback))
+            self._size += len(messages)
+            self._condition.notify_all()
+
+    async def wait_flushed(self, chat_id: uuid.UUID) -> None:
+        """Wait until everything buffered for the chat has been committed,
+        raising the error of any turn dropped instead."""
+        futures = [e.flushed for e in self._entries() if e.chat_id == chat_id]
+        if futures:
+            await asyncio.gather(*(asyncio.shield(f) for f in futures))
+
+    async def wait_settled(self, chat_id: uuid.UUID) -> None:
+        """Wait until everything buffered for the chat has been committed
+        or dropped, as readers of the chat need."""
+        futures = [e.flushed for e in self._entries() if e.chat_id == chat_id]
+        if futures:
+            await asyncio.gather(
+                *(asyncio.shield(f) for f in futures), return_exceptions=True
+            )
+
+    def when_flushed(
+        self, chat_id: uuid.UUID, callback: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Call ``callback`` once everything buffered for the chat so far
+        has been committed or dropped, without waiting for it here."""
+
+        futures = [e.flushed for e in self._entries() if e.chat_id == chat_id]
+
+        async def run() -> None:
+            await asyncio.gather(
+                *(asyncio.shield(f) for f in futures), return_exceptions=True
+            )
+            try:
+                await callback()
+            except Exception:
+                logger.exception("Flush callback of chat %s failed", chat_id)
+
+        task = asyncio.create_task(run())
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def _take(self) -> list[_Entry]:
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: bool(self._queue) or self._closed
+            )
+        if self._size < self.batch_size and not self._closed:
+            # Linger briefly so concurrent turns share one insert.
+            await asyncio.sleep(self.flush_interval)
+        batch: list[_Entry] = []
+        count = 0
+        while self._queue and (
+            not batch or count + len(self._queue[0].messages) <= self.batch_size
+        ):
+            entry = self._queue.popleft()
+            batch.append(entry)
+            count += len(entry.messages)
+        self._inflight = batch
+        return batch
+
+    async def _insert(self, entries: list[_Entry]) -> None:
+        # Located on every attempt, so a retry follows a chat moved to
+        # another shard meanwhile; an entry of a chat elsewhere fails on
+        # its foreign key and is retried alone.
+        shard = await get_shard_router().locate(entries[0].chat_id)
+        async with shard.session_maker() as session:
+            await MessageRepository(session).create_messages(
+                [m for e in entries for m in e.messages]
+            )
+
+    async def _insert_retrying(self, entries: list[_Entry]) -> None:
+        while True:
+            try:
+                await self._insert(entries)
+                return
+            except IntegrityError:
+                raise
+            except Exception:
+                now = asyncio.get_running_loop().time()
+                if (
+                    self._deadline is not None
+                    and now + self.retry_interval > self._deadline
+                ):
+                    raise
+                logger.exception(
+                    "Failed to flush %d buffered turns, retrying", len(entries)
+                )
+                await asyncio.sleep(self.retry_interval)
+
+    async def _flush_shard(self, entries: list[_Entry]) -> None:
+        try:
+            await self._insert_retrying(entries)
+        except IntegrityError:
+            # One bad turn (e.g. its chat was deleted) must not block the
+            # rest: retry turn by turn and drop the ones that can never be
+            # written.
+            for entry in entries:
+                try:
+                    await self._insert_retrying([entry])
+                except IntegrityError as e:
+                    logger.exception(
+                        "Dropping %d buffered messages of chat %s",
+                        len(entry.messages),
+                        entry.chat_id,
+                    )
+                    entry.flushed.set_exception(e)
+                except Exception as e:
+                    logger.exception(
+                        "Dropping %d buffered messages of chat %s on stop",
+                        len(entry.messages),
+                        entry.chat_id,
+                    )
+                    entry.flushed.set_exception(e)
+        except Exception as e:
+            logger.exception("Dropping %d buffered turns on stop", len(entries))
+            for entry in entries:
+                entry.flushed.set_exception(e)
+
+    async def _flush(self, batch: list[_Entry]) -> None:
+        # One insert per shard; a chat's turns all go to the same one, in
+        # order.
+        router = get_shard_router()
+        shards: dict[int, list[_Entry]] = {}
+        for entry in batch:
+            shards.setdefault(router.owner(entry.chat_id).index, []).append(
+                entry
+            )
+        for entries in shards.values():
+            await self._flush_shard(entries)
+
+        async with self._condition:
+            self._inflight = []
+            self._size -= sum(len(e.messages) for e in batch)
+            self._condition.notify_all()
+        for entry in batch:
+            if entry.flushed.done():
+                continue
+            entry.flushed.set_result(None)
+            if entry.callback is not None:
+                task = asyncio.create_task(entry.callback(entry.messages))
+                self._callbacks.add(task)
+                task.add_done_callback(self._callbacks.discard)
+
+    async def _run(self) -> None:
+        while batch := await self._take():
+            await self._flush(batch)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting turns and drain everything already buffered,
+        giving up on failing inserts after ``close_timeout``."""
+        async with self._condition:
+            self._closed = True
+            self._deadline = (
+                asyncio.get_running_loop().time() + self.close_timeout
+            )
+            self._condition.notify_all()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._callbacks:
+            await asyncio.gather(*self._callbacks, return_exceptions=True)
+        logger.info("Message buffer drained")
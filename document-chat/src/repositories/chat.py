@@ -1,9 +1,15 @@
+import asyncio
+import heapq
 import uuid
+from collections.abc import Sequence
 
-from sqlmodel import func, select
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.models.chat import Chat
+from src.repositories.counter import CounterRepository
+from src.repositories.pagination import paginate
+from src.utils import Cursor
 
 
 class ChatRepository:
@@ -12,21 +18,32 @@ class ChatRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
-    async def count(self) -> int:
-        stmt = select(func.count()).select_from(Chat)
-        r = await self.session.exec(stmt)
-        return r.one()
+    async def count(self, approximate: bool = False) -> int:
+        return await CounterRepository(self.session).count_rows(
+            Chat.__tablename__, approximate
+        )
 
     async def list_chats(
         self,
         limit: int | None = None,
         offset: int | None = None,
+        after: Cursor | None = None,
+        before: Cursor | None = None,
     ) -> list[Chat]:
-        stmt = (
-            select(Chat).limit(limit).offset(offset).order_by(Chat.created_at)  # type: ignore
+        stmt, descending = paginate(
+            select(Chat),
+            col(Chat.created_at),
+            col(Chat.id),
+            limit,
+            offset,
+            after,
+            before,
         )
         r = await self.session.exec(stmt)
-        return list(r)
+        chats = list(r)
+        if descending:
+            chats.reverse()
+        return chats
 
     async def create_chat(self, chat: Chat) -> Chat:
         self.session.add(chat)
@@ -36,3 +53,65 @@ class ChatRepository:
 
     async def get_chat(self, chat_id: uuid.UUID) -> Chat | None:
         return await self.session.get(Chat, chat_id)
+
+    async def list_chat_ids(
+        self, limit: int, after: uuid.UUID | None = None
+    ) -> list[uuid.UUID]:
+        """Ids in id order, for scans that tolerate chats coming and going."""
+        stmt = select(Chat.id).order_by(col(Chat.id)).limit(limit)
+        if after is not None:
+            stmt = stmt.where(Chat.id > after)
+        r = await self.session.exec(stmt)
+        return list(r)
+
+
+class ShardedChatRepository:
+    """Chats of every shard, for reads not scoped to one chat."""
+
+    sessions: Sequence[AsyncSession]
+
+    def __init__(self, sessions: Sequence[AsyncSession]) -> None:
+        self.sessions = sessions
+
+    async def count(self, approximate: bool = False) -> int:
+        counts = await asyncio.gather(
+            *(ChatRepository(s).count(approximate) for s in self.sessions)
+        )
+        return sum(counts)
+
+    async def list_chats(
+        self,
+        limit: int | None = None,
+        offset: int | None = None,
+        after: Cursor | None = None,
+        before: Cursor | None = None,
+    ) -> list[Chat]:
+        """The page of list_chats over the chats of all shards.
+
+        Each shard is asked for the rows that could be on the page, which
+        for an offset page is every row up to its end, and the sorted
+        pages are merged.
+        """
+        if len(self.sessions) == 1:
+            return await ChatRepository(self.sessions[0]).list_chats(
+                limit, offset, after, before
+            )
+        start = (offset or 0) if after is None and before is None else 0
+        pages = await asyncio.gather(
+            *(
+                ChatRepository(s).list_chats(
+                    None if limit is None else start + limit,
+                    None,
+                    after,
+                    before,
+                )
+                for s in self.sessions
+            )
+        )
+        chats = list(heapq.merge(*pages, key=lambda c: (c.created_at, c.id)))
+        if before is not None:
+            # Pages before the cursor end at it.
+            return (
+                chats if limit is None else chats[max(len(chats) - limit, 0) :]
+            )
+        return chats[start : None if limit is None else start + limit]
@@ -0,0 +1,68 @@
+import uuid
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, func, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.counter import COUNTER_SHARDS, ChatMessageCount, TableRowCount
+
+
+class CounterRepository:
+    """Row counts without scanning the counted tables.
+
+    Exact counts are read from the counter tables the triggers keep.
+    Approximate ones are the planner's estimate from the last VACUUM or
+    ANALYZE, summed over partitions, and need no counter at all.
+    """
+
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def count_rows(self, table: str, approximate: bool = False) -> int:
+        if approximate:
+            r = await self.session.exec(
+                text(  # type: ignore
+                    "SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint "
+                    "FROM pg_partition_tree(CAST(:table AS regclass)) p "
+                    "JOIN pg_class c ON c.oid = p.relid WHERE p.isleaf"
+                ),
+                params={"table": table},
+            )
+            return r.scalar_one()  # type: ignore
+        stmt = select(func.coalesce(func.sum(TableRowCount.count), 0)).where(
+            col(TableRowCount.table_name) == table
+        )
+        r = await self.session.exec(stmt)
+        return int(r.one())
+
+    async def count_chat_messages(self, chat_id: uuid.UUID) -> int:
+        stmt = select(ChatMessageCount.count).where(
+            ChatMessageCount.chat_id == chat_id
+        )
+        r = await self.session.exec(stmt)
+        return r.one_or_none() or 0
+
+    async def add_rows(self, table: str, delta: int) -> None:
+        """Count rows written without firing the triggers."""
+        stmt = insert(TableRowCount).values(
+            table_name=table,
+            shard=func.floor(func.random() * COUNTER_SHARDS),
+            count=delta,
+        )
+        await self.session.exec(
+            stmt.on_conflict_do_update(  # type: ignore
+                index_elements=["table_name", "shard"],
+                set_={"count": TableRowCount.count + stmt.excluded.count},
+            )
+        )
+
+    async def add_chat_messages(self, chat_id: uuid.UUID, delta: int) -> None:
+        stmt = insert(ChatMessageCount).values(chat_id=chat_id, count=delta)
+        await self.session.exec(
+            stmt.on_conflict_do_update(  # type: ignore
+                index_elements=["chat_id"],
+                set_={"count": ChatMessageCount.count + stmt.excluded.count},
+            )
+        )
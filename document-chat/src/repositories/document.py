@@ -0,0 +1,138 @@
+import uuid
+from collections.abc import Sequence
+from itertools import batched
+from typing import Final
+
+from sqlmodel import col, delete, func, or_, select, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.document import Document, DocumentChunk, DocumentChunkBand
+from src.repositories.pagination import paginate
+from src.utils import Cursor, now_utc
+
+BAND_LOOKUP_BATCH_SIZE: Final[int] = 8192
+
+
+class DocumentRepository:
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def count(self) -> int:
+        stmt = select(func.count()).select_from(Document)
+        r = await self.session.exec(stmt)
+        return r.one()
+
+    async def list_documents(
+        self,
+        limit: int | None = None,
+        offset: int | None = None,
+        after: Cursor | None = None,
+        before: Cursor | None = None,
+    ) -> list[Document]:
+        stmt, descending = paginate(
+            select(Document),
+            col(Document.created_at),
+            col(Document.id),
+            limit,
+            offset,
+            after,
+            before,
+        )
+        r = await self.session.exec(stmt)
+        documents = list(r)
+        if descending:
+            documents.reverse()
+        return documents
+
+    async def create_document(self, document: Document) -> Document:
+        self.session.add(document)
+        await self.session.commit()
+        await self.session.refresh(document)
+        return document
+
+    async def get_document(self, document_id: uuid.UUID) -> Document | None:
+        return await self.session.get(Document, document_id)
+
+    async def list_chunks(self, document_id: uuid.UUID) -> list[DocumentChunk]:
+        stmt = (
+            select(DocumentChunk)
+            .where(DocumentChunk.document_id == document_id)
+            .order_by(DocumentChunk.index)  # type: ignore
+        )
+        r = await self.session.exec(stmt)
+        return list(r)
+
+    async def find_canonical_chunks(
+        self, tenant: str, band_hashes: Sequence[tuple[int, int]]
+    ) -> list[DocumentChunk]:
+        chunks: dict[uuid.UUID, DocumentChunk] = {}
+        for batch in batched(band_hashes, BAND_LOOKUP_BATCH_SIZE, strict=False):
+            chunk_ids = select(DocumentChunkBand.chunk_id).where(
+                DocumentChunkBand.tenant == tenant,
+                tuple_(DocumentChunkBand.band, DocumentChunkBand.band_hash).in_(
+                    batch
+                ),
+            )
+            stmt = select(DocumentChunk).where(
+                col(DocumentChunk.id).in_(chunk_ids),
+                col(DocumentChunk.embedding).is_not(None),
+            )
+            r = await self.session.exec(stmt)
+            chunks.update((c.id, c) for c in r)
+        return list(chunks.values())
+
+    async def list_duplicates(
+        self,
+        canonical_ids: Sequence[uuid.UUID],
+        exclude: Sequence[uuid.UUID] = (),
+    ) -> list[DocumentChunk]:
+        if not canonical_ids:
+            return []
+        stmt = (
+            select(DocumentChunk)
+            .where(
+                col(DocumentChunk.canonical_id).in_(canonical_ids),
+                col(DocumentChunk.id).not_in(exclude),
+            )
+            .order_by(DocumentChunk.document_id, DocumentChunk.index)  # type: ignore
+        )
+        r = await self.session.exec(stmt)
+        return list(r)
+
+    async def list_chunk_sources(
+        self, chunk_id: uuid.UUID
+    ) -> list[DocumentChunk]:
+        stmt = (
+            select(DocumentChunk)
+            .where(
+                or_(
+                    col(DocumentChunk.id) == chunk_id,
+                    col(DocumentChunk.canonical_id) == chunk_id,
+                )
+            )
+            .order_by(DocumentChunk.document_id, DocumentChunk.index)  # type: ignore
+        )
+        r = await self.session.exec(stmt)
+        return list(r)
+
+    async def replace_chunks(
+        self,
+        document: Document,
+        upserts: Sequence[DocumentChunk],
+        deleted: Sequence[uuid.UUID],
+        bands: Sequence[DocumentChunkBand] = (),
+    ) -> Document:
+        if deleted:
+            await self.session.exec(
+                delete(DocumentChunk).where(col(DocumentChunk.id).in_(deleted))
+            )
+        self.session.add_all(upserts)
+        self.session.add_all(bands)
+        document.version += 1
+        document.updated_at = now_utc()
+        self.session.add(document)
+        await self.session.commit()
+        await self.session.refresh(document)
+        return document
@@ -0,0 +1,40 @@
+import uuid
+from datetime import timedelta
+
+from sqlmodel import col, delete, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.idempotency import IdempotencyRecord
+
+
+class IdempotencyRepository:
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_record(
+        self, chat_id: uuid.UUID, key: str, ttl: timedelta
+    ) -> IdempotencyRecord | None:
+        stmt = select(IdempotencyRecord).where(
+            IdempotencyRecord.chat_id == chat_id,
+            IdempotencyRecord.key == key,
+            col(IdempotencyRecord.created_at) > func.now() - ttl,
+        )
+        r = await self.session.exec(stmt)
+        return r.one_or_none()
+
+    async def save_record(
+        self, record: IdempotencyRecord, ttl: timedelta
+    ) -> IdempotencyRecord:
+        # Expired keys of the chat are dropped on the way, including a
+        # stale record under this very key.
+        await self.session.exec(
+            delete(IdempotencyRecord).where(
+                col(IdempotencyRecord.chat_id) == record.chat_id,
+                col(IdempotencyRecord.created_at) <= func.now() - ttl,
+            )
+        )
+        self.session.add(record)
+        await self.session.commit()
+        return record
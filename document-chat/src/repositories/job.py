@@ -0,0 +1,207 @@
+import uuid
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from sqlmodel import col, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.job import Job, JobStatus
+
+
+class JobRepository:
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def enqueue(self, job: Job) -> Job:
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+
+    async def get_job(self, job_id: uuid.UUID) -> Job | None:
+        return await self.session.get(Job, job_id)
+
+    def _ready(self, kinds: Sequence[str] | None) -> list[Any]:
+        where = [
+            col(Job.status) == JobStatus.QUEUED,
+            col(Job.run_at) <= func.now(),
+        ]
+        if kinds:
+            where.append(col(Job.kind).in_(kinds))
+        return where
+
+    async def list_ready_tenants(
+        self, kinds: Sequence[str] | None = None, limit: int = 16
+    ) -> list[str]:
+        """Tenants with runnable jobs, least busy first.
+
+        Ordering by the number of jobs a tenant already has running is
+        what keeps one tenant's backlog from starving everyone else.
+        """
+        ready = (
+            select(
+                col(Job.tenant).label("tenant"),
+                func.max(Job.priority).label("priority"),
+                func.min(Job.run_at).label("run_at"),
+            )
+            .where(*self._ready(kinds))
+            .group_by(col(Job.tenant))
+            .subquery()
+        )
+        running = (
+            select(func.count())
+            .select_from(Job)
+            .where(
+                col(Job.tenant) == ready.c.tenant,
+                col(Job.status) == JobStatus.RUNNING,
+            )
+            .scalar_subquery()
+        )
+        stmt = (
+            select(ready.c.tenant)
+            .order_by(running, ready.c.priority.desc(), ready.c.run_at)
+            .limit(limit)
+        )
+        r = await self.session.exec(stmt)
+        return list(r)
+
+    async def claim(
+        self,
+        worker_id: str,
+        visibility_timeout: timedelta,
+        kinds: Sequence[str] | None = None,
+    ) -> Job | None:
+        for tenant in await self.list_ready_tenants(kinds):
+            candidate = (
+                select(Job.id)
+                .where(col(Job.tenant) == tenant, *self._ready(kinds))
+                .order_by(
+                    col(Job.priority).desc(),
+                    col(Job.run_at),
+                    col(Job.id),
+                )
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            stmt = (
+                update(Job)
+                .where(col(Job.id) == candidate)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=col(Job.attempts) + 1,
+                    locked_by=worker_id,
+                    locked_until=func.now() + visibility_timeout,
+                )
+                .returning(Job)
+                .execution_options(synchronize_session=False)
+            )
+            job = (await self.session.scalars(stmt)).one_or_none()
+            if job is not None:
+                # Detached before the commit would expire it: the worker
+                # reads it after this session is closed.
+                self.session.expunge(job)
+            await self.session.commit()
+            if job is not None:
+                return job
+        return None
+
+    async def heartbeat(
+        self, job: Job, worker_id: str, visibility_timeout: timedelta
+    ) -> bool:
+        stmt = (
+            update(Job)
+            .where(
+                col(Job.id) == job.id,
+                col(Job.status) == JobStatus.RUNNING,
+                col(Job.locked_by) == worker_id,
+            )
+            .values(locked_until=func.now() + visibility_timeout)
+        )
+        r = await self.session.exec(stmt)
+        await self.session.commit()
+        return r.rowcount == 1
+
+    async def complete(
+        self, job: Job, worker_id: str, result: dict[str, Any] | None
+    ) -> bool:
+        stmt = (
+            update(Job)
+            .where(
+                col(Job.id) == job.id,
+                col(Job.status) == JobStatus.RUNNING,
+                col(Job.locked_by) == worker_id,
+            )
+            .values(
+                status=JobStatus.SUCCEEDED,
+                result=result,
+                locked_by=None,
+                locked_until=None,
+                finished_at=func.now(),
+            )
+        )
+        r = await self.session.exec(stmt)
+        await self.session.commit()
+        return r.rowcount == 1
+
+    async def fail(
+        self,
+        job: Job,
+        worker_id: str,
+        error: str,
+        retry_in: timedelta | None,
+    ) -> bool:
+        values: dict[str, Any] = {
+            "last_error": error,
+            "locked_by": None,
+            "locked_until": None,
+        }
+        if retry_in is None:
+            values |= {"status": JobStatus.FAILED, "finished_at": func.now()}
+        else:
+            values |= {
+                "status": JobStatus.QUEUED,
+                "run_at": func.now() + retry_in,
+            }
+        stmt = (
+            update(Job)
+            .where(
+                col(Job.id) == job.id,
+                col(Job.status) == JobStatus.RUNNING,
+                col(Job.locked_by) == worker_id,
+            )
+            .values(**values)
+        )
+        r = await self.session.exec(stmt)
+        await self.session.commit()
+        return r.rowcount == 1
+
+    async def requeue_expired(self) -> int:
+        """Release jobs whose worker stopped heartbeating."""
+        expired = [
+            col(Job.status) == JobStatus.RUNNING,
+            col(Job.locked_until) < func.now(),
+        ]
+        released = 0
+        for exhausted, values in (
+            (True, {"status": JobStatus.FAILED, "finished_at": func.now()}),
+            (False, {"status": JobStatus.QUEUED}),
+        ):
+            attempts_left = col(Job.attempts) < col(Job.max_attempts)
+            stmt = (
+                update(Job)
+                .where(*expired, ~attempts_left if exhausted else attempts_left)
+                .values(
+                    last_error="Visibility timeout expired",
+                    locked_by=None,
+                    locked_until=None,
+                    **values,
+                )
+            )
+            r = await self.session.exec(stmt)
+            released += r.rowcount
+        await self.session.commit()
+        return released
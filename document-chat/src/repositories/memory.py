@@ -0,0 +1,48 @@
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.memory import MessageEmbedding
+from src.models.message import Message
+
+
+class MessageEmbeddingRepository:
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def create_embeddings(
+        self, embeddings: list[MessageEmbedding]
+    ) -> None:
+        self.session.add_all(embeddings)
+        await self.session.commit()
+
+    async def search_messages(
+        self,
+        chat_id: uuid.UUID,
+        embedding: Sequence[float],
+        limit: int,
+        before: datetime | None = None,
+    ) -> list[Message]:
+        stmt = (
+            select(Message)
+            .join(
+                MessageEmbedding,
+                (col(MessageEmbedding.message_id) == col(Message.id))
+                # Lets the planner prune message partitions.
+                & (col(MessageEmbedding.created_at) == col(Message.created_at)),
+            )
+            .where(MessageEmbedding.chat_id == chat_id)
+            .order_by(
+                MessageEmbedding.embedding.cosine_distance(embedding)  # type: ignore
+            )
+            .limit(limit)
+        )
+        if before is not None:
+            stmt = stmt.where(MessageEmbedding.created_at < before)
+        r = await self.session.exec(stmt)
+        return sorted(r, key=lambda m: m.created_at)
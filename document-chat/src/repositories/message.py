@@ -1,38 +1,324 @@
-import asyncio
+import json
 import uuid
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Final
 
-from sqlmodel import func, select
+from sqlmodel import Text, cast, col, func, insert, select, tuple_
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
-from src.models.message import Message
+from src.models.message import (
+    Message,
+    MessageExportRow,
+    MessageHistoryRow,
+    MessageReadRow,
+    MessageRole,
+)
+from src.repositories.counter import CounterRepository
+from src.repositories.pagination import paginate
+from src.utils import Cursor
+
+if TYPE_CHECKING:
+    from src.archive.archiver import MessageArchiver
+
+COPY_COLUMNS: Final = (
+    "id",
+    "chat_id",
+    "role",
+    "content",
+    "created_at",
+    "system",
+    "usage",
+    "model",
+)
+
+
+def _is_turn_start(message: Message) -> bool:
+    return message.role == MessageRole.USER and any(
+        c["type"] == "text" for c in message.content
+    )
+
+
+def _read_row(message: Message) -> MessageReadRow:
+    return MessageReadRow(
+        message.id,
+        message.chat_id,
+        message.role,
+        json.dumps(message.content),
+        message.created_at,
+    )
+
+
+def _export_row(message: Message) -> MessageExportRow:
+    return MessageExportRow(
+        message.id,
+        message.chat_id,
+        message.role,
+        json.dumps(message.content),
+        message.created_at,
+        message.system,
+        json.dumps(message.usage) if message.usage is not None else None,
+        message.model,
+    )
+
+
+def _history_row(message: Message) -> MessageHistoryRow:
+    return MessageHistoryRow(
+        message.id,
+        message.role,
+        json.dumps(message.content),
+        message.created_at,
+    )
 
 
 class MessageRepository:
+    """Messages of chats, including archived ones when given the archiver.
+
+    A chat's archived messages all predate its live ones, so reads put
+    them in front of what the query returns.
+    """
+
     session: AsyncSession
+    archiver: "MessageArchiver | None"
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        archiver: "MessageArchiver | None" = None,
+    ) -> None:
         self.session = session
+        self.archiver = archiver
 
-    async def count(self) -> int:
-        stmt = select(func.count()).select_from(Message)
+    async def _archived(
+        self, chat_id: uuid.UUID, after: Cursor | None = None
+    ) -> list[Message]:
+        """The chat's archived messages, without looking them up when
+        ``after`` is past anything archived."""
+        if self.archiver is None:
+            return []
+        if (
+            after is not None
+            and after.created_at >= self.archiver.archived_before()
+        ):
+            return []
+        return await self.archiver.load(self.session, chat_id)
+
+    async def _fetch_page[T](
+        self,
+        stmt: SelectOfScalar[Any],
+        limit: int | None,
+        offset: int | None,
+        after: Cursor | None,
+        before: Cursor | None,
+    ) -> list[T]:
+        stmt, descending = paginate(
+            stmt,
+            col(Message.created_at),
+            col(Message.id),
+            limit,
+            offset,
+            after,
+            before,
+        )
         r = await self.session.exec(stmt)
-        return r.one()
+        rows = list(r)
+        if descending:
+            rows.reverse()
+        return rows
+
+    async def _page[T](
+        self,
+        chat_id: uuid.UUID,
+        stmt: SelectOfScalar[Any],
+        convert: Callable[[Message], T],
+        limit: int | None,
+        offset: int | None,
+        after: Cursor | None,
+        before: Cursor | None,
+    ) -> list[T]:
+        """A page over the chat's archived messages followed by its live
+        ones, as ``paginate`` would return it from a single table.
+
+        Archives are only looked up when the page can reach them: not
+        for ``before`` pages the live messages fill, nor past them.
+        """
+        if before is not None:
+            live: list[T] = await self._fetch_page(
+                stmt, limit, None, None, before
+            )
+            if limit is not None and len(live) >= limit:
+                return live
+            older = [
+                convert(m)
+                for m in await self._archived(chat_id)
+                if (m.created_at, m.id) < before
+                and (after is None or (m.created_at, m.id) > after)
+            ]
+            missing = len(older) if limit is None else limit - len(live)
+            return (older[-missing:] if missing > 0 else []) + live
+        archived = await self._archived(chat_id, after)
+        if not archived:
+            return await self._fetch_page(stmt, limit, offset, after, None)
+        older = [
+            convert(m)
+            for m in archived
+            if after is None or (m.created_at, m.id) > after
+        ]
+        if after is None and offset:
+            older, offset = older[offset:], max(0, offset - len(older))
+        if limit is not None:
+            if len(older) >= limit:
+                return older[:limit]
+            limit -= len(older)
+        return older + await self._fetch_page(stmt, limit, offset, after, None)
+
+    async def count(self, approximate: bool = False) -> int:
+        """Messages of all chats. Only the exact count includes archived
+        messages."""
+        return await CounterRepository(self.session).count_rows(
+            Message.__tablename__, approximate
+        )
+
+    async def count_chat_messages(self, chat_id: uuid.UUID) -> int:
+        """Messages of the chat, archived ones included."""
+        return await CounterRepository(self.session).count_chat_messages(
+            chat_id
+        )
 
     async def list_messages(
         self,
         chat_id: uuid.UUID,
         limit: int | None = None,
         offset: int | None = None,
+        after: Cursor | None = None,
+        before: Cursor | None = None,
     ) -> list[Message]:
+        return await self._page(
+            chat_id,
+            select(Message).where(Message.chat_id == chat_id),
+            lambda m: m,
+            limit,
+            offset,
+            after,
+            before,
+        )
+
+    async def list_messages_raw(
+        self,
+        chat_id: uuid.UUID,
+        limit: int | None = None,
+        offset: int | None = None,
+        after: Cursor | None = None,
+        before: Cursor | None = None,
+    ) -> list[MessageReadRow]:
+        # Live rows are Rows with the fields of MessageReadRow.
+        return await self._page(
+            chat_id,
+            select(  # type: ignore
+                Message.id,
+                Message.chat_id,
+                Message.role,
+                cast(Message.content, Text).label("content"),
+                Message.created_at,
+            ).where(Message.chat_id == chat_id),
+            _read_row,
+            limit,
+            offset,
+            after,
+            before,
+        )
+
+    async def stream_messages_raw(
+        self, chat_id: uuid.UUID, batch_size: int
+    ) -> AsyncIterator[Sequence[MessageExportRow]]:
+        """Every message of the chat in order, in batches of rows read
+        through a server-side cursor, so memory does not grow with the
+        chat. Archived messages come first, as one batch per month."""
+        if self.archiver is not None:
+            for archive in await self.archiver.list_archives(
+                self.session, chat_id
+            ):
+                messages = await self.archiver.read(archive.uri)
+                yield [_export_row(m) for m in messages]
         stmt = (
-            select(Message)
+            select(  # type: ignore
+                Message.id,
+                Message.chat_id,
+                Message.role,
+                cast(Message.content, Text).label("content"),
+                Message.created_at,
+                Message.system,
+                cast(Message.usage, Text).label("usage"),
+                Message.model,
+            )
+            .where(Message.chat_id == chat_id)
+            .order_by(col(Message.created_at), col(Message.id))
+            .execution_options(yield_per=batch_size)
+        )
+        r = await self.session.stream(stmt)
+        async for rows in r.partitions():
+            yield rows  # type: ignore
+
+    async def list_history(
+        self, chat_id: uuid.UUID, after: Cursor | None = None
+    ) -> Sequence[MessageHistoryRow]:
+        stmt = (
+            select(
+                Message.id,
+                Message.role,
+                cast(Message.content, Text).label("content"),
+                Message.created_at,
+            )
             .where(Message.chat_id == chat_id)
-            .limit(limit)
-            .offset(offset)
+            .order_by(col(Message.created_at), col(Message.id))
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(col(Message.created_at), col(Message.id))
+                > tuple_(*after)
+            )
+        r = await self.session.exec(stmt)
+        live = r.all()
+        archived = [
+            _history_row(m)
+            for m in await self._archived(chat_id, after)
+            if after is None or (m.created_at, m.id) > after
+        ]
+        return [*archived, *live] if archived else live  # type: ignore
+
+    async def list_recent_messages(
+        self, chat_id: uuid.UUID, turns: int
+    ) -> list[Message]:
+        turn_starts = (
+            select(Message.created_at)
+            .where(
+                Message.chat_id == chat_id,
+                Message.role == MessageRole.USER,
+                Message.content.contains([{"type": "text"}]),  # type: ignore
+            )
+            .order_by(Message.created_at.desc())  # type: ignore
+            .limit(turns)
+            .subquery()
+        )
+        cutoff = select(func.min(turn_starts.c.created_at)).scalar_subquery()
+        stmt = (
+            select(Message)
+            .where(Message.chat_id == chat_id, Message.created_at >= cutoff)
             .order_by(Message.created_at)  # type: ignore
         )
         r = await self.session.exec(stmt)
-        return list(r)
+        recent = list(r)
+        if sum(map(_is_turn_start, recent)) >= turns:
+            return recent
+        archived = await self._archived(chat_id)
+        if not archived:
+            return recent
+        # Too few turns are live; the rest come from the archive, along
+        # with any live messages before the first live turn. The archived
+        # messages lead the listing, and their files are cached by now.
+        messages = await self.list_messages(chat_id)
+        starts = [i for i, m in enumerate(messages) if _is_turn_start(m)]
+        return messages[starts[-turns] :] if len(starts) >= turns else messages
 
     async def create_message(self, message: Message) -> Message:
         self.session.add(message)
@@ -41,10 +327,49 @@ class MessageRepository:
         return message
 
     async def create_messages(self, messages: list[Message]) -> list[Message]:
-        self.session.add_all(messages)
+        if not messages:
+            return []
+        table = Message.__table__  # type: ignore
+        stmt = insert(table).returning(
+            *table.columns, sort_by_parameter_order=True
+        )
+        r = await self.session.exec(
+            stmt,  # type: ignore
+            params=[m.model_dump() for m in messages],
+        )
+        created = [Message.model_validate(row._mapping) for row in r]
         await self.session.commit()
-        await asyncio.gather(*[self.session.refresh(m) for m in messages])
-        return messages
+        return created
+
+    async def copy_messages(
+        self, messages: Iterable[Message], commit: bool = True
+    ) -> int:
+        """Bulk load messages with COPY, for imports too large for INSERT."""
+        records = (
+            (
+                m.id,
+                m.chat_id,
+                m.role.name,
+                json.dumps(m.content),
+                m.created_at,
+                m.system,
+                json.dumps(m.usage) if m.usage is not None else None,
+                m.model,
+            )
+            for m in messages
+        )
+        conn = await self.session.connection()
+        raw = await conn.get_raw_connection()
+        status = await raw.driver_connection.copy_records_to_table(  # type: ignore
+            Message.__tablename__, records=records, columns=COPY_COLUMNS
+        )
+        if commit:
+            await self.session.commit()
+        return int(status.rsplit(" ", 1)[-1])
 
     async def get_message(self, message_id: uuid.UUID) -> Message | None:
-        return await self.session.get(Message, message_id)
+        # The primary key also has created_at, which callers do not know.
+        r = await self.session.exec(
+            select(Message).where(Message.id == message_id)
+        )
+        return r.one_or_none()
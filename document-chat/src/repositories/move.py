@@ -0,0 +1,81 @@
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Table
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import delete, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.archive import MessageArchive
+from src.models.chat import Chat
+from src.models.idempotency import IdempotencyRecord
+from src.models.memory import MessageEmbedding
+from src.models.message import Message
+
+# Rows of a chat besides its messages, which are copied with COPY, and
+# its counters, which triggers keep.
+CHAT_TABLES: tuple[Table, ...] = (
+    MessageEmbedding.__table__,  # type: ignore
+    MessageArchive.__table__,  # type: ignore
+    IdempotencyRecord.__table__,  # type: ignore
+)
+
+
+class ChatMoveRepository:
+    """Reads a chat with all its rows on one shard and writes them on
+    another. Nothing is committed here."""
+
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def lock_chat(self, chat_id: uuid.UUID) -> Chat | None:
+        """The chat, locked until the transaction ends.
+
+        Rows referencing it cannot be written meanwhile: their foreign
+        key check waits for the lock.
+        """
+        r = await self.session.exec(
+            select(Chat).where(Chat.id == chat_id).with_for_update()
+        )
+        return r.one_or_none()
+
+    async def has_chat(self, chat_id: uuid.UUID) -> bool:
+        r = await self.session.exec(select(Chat.id).where(Chat.id == chat_id))
+        return r.first() is not None
+
+    async def message_range(
+        self, chat_id: uuid.UUID
+    ) -> tuple[datetime, datetime] | None:
+        """When the chat's first and last live messages were written."""
+        r = await self.session.exec(
+            select(
+                func.min(Message.created_at), func.max(Message.created_at)
+            ).where(Message.chat_id == chat_id)
+        )
+        first, last = r.one()
+        return None if first is None else (first, last)
+
+    async def iter_rows(
+        self, table: Table, chat_id: uuid.UUID, batch_size: int
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        r = await self.session.stream(
+            select(*table.columns)  # type: ignore
+            .where(table.c.chat_id == chat_id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in r.partitions():
+            yield [dict(row._mapping) for row in rows]
+
+    async def insert_rows(
+        self, table: Table, rows: Sequence[dict[str, Any]]
+    ) -> None:
+        if rows:
+            await self.session.exec(insert(table), params=rows)  # type: ignore
+
+    async def delete_chat(self, chat_id: uuid.UUID) -> None:
+        """Delete the chat, its rows following by cascade."""
+        await self.session.exec(delete(Chat).where(Chat.id == chat_id))  # type: ignore
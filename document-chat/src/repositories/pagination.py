@@ -0,0 +1,34 @@
+from typing import Any
+
+from sqlmodel import tuple_
+from sqlmodel.sql.expression import SelectOfScalar
+
+from src.utils import Cursor
+
+
+def paginate[T](
+    stmt: SelectOfScalar[T],
+    created_at: Any,
+    id_: Any,
+    limit: int | None = None,
+    offset: int | None = None,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+) -> tuple[SelectOfScalar[T], bool]:
+    """Apply keyset (or legacy offset) pagination ordered by (created_at, id).
+
+    Returns the statement and whether its rows come back in descending
+    order, which is the case for ``before`` pages so that LIMIT keeps the
+    rows closest to the cursor. Callers reverse those rows.
+    """
+    key = tuple_(created_at, id_)
+    if before is not None:
+        stmt = stmt.where(key < tuple_(*before)).order_by(
+            created_at.desc(), id_.desc()
+        )
+        return stmt.limit(limit), True
+    if after is not None:
+        stmt = stmt.where(key > tuple_(*after))
+    else:
+        stmt = stmt.offset(offset)
+    return stmt.order_by(created_at, id_).limit(limit), False
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from .admission import router as admission_router
 from .chat import router as chat_router
+from .document import router as document_router
+from .job import router as job_router
+from .profiling import router as profiling_router
 
 api = APIRouter()
 api.include_router(chat_router)
+api.include_router(document_router)
+api.include_router(job_router)
+api.include_router(admission_router)
+api.include_router(profiling_router)
 
 __all__ = ["api"]
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException
+
+from src.dependencies import AdmissionControllerDep
+from src.models.admission import AdmissionStatsRead
+
+router = APIRouter(prefix="/admission", tags=["admission"])
+
+
+@router.get("/stats", response_model=AdmissionStatsRead)
+async def get_admission_stats(
+    admission: AdmissionControllerDep,
+) -> AdmissionStatsRead:
+    if admission is None:
+        raise HTTPException(
+            status_code=404, detail="Admission control is disabled."
+        )
+    stats = admission.stats()
+    return AdmissionStatsRead(
+        active=stats.active,
+        queued=stats.queued,
+        admitted=stats.admitted,
+        rejected=stats.rejected,
+        timed_out=stats.timed_out,
+        wait_seconds_mean=stats.wait_seconds_mean,
+        wait_seconds_max=stats.wait_seconds_max,
+        requests_available=stats.requests_available,
+        input_tokens_available=stats.input_tokens_available,
+        output_tokens_available=stats.output_tokens_available,
+    )
@@ -1,37 +1,112 @@
+import hashlib
+import math
 import uuid
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import AsyncExitStack
+from datetime import timedelta
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from pydantic_ai import ModelMessage
 
-from src.agents.chatbot import ChatbotDeps, run_agent
+from src.agents.admission import AdmissionController, AdmissionRejectedError
+from src.agents.cache import SemanticResponseCache, get_answer
+from src.agents.chatbot import (
+    ChatbotDeps,
+    get_cache_scope,
+    run_agent,
+    stream_agent,
+)
+from src.agents.conversation import ChatConversation
+from src.agents.memory import ChatMemory
 from src.agents.processor import processor
+from src.archive.archiver import MessageArchiver
 from src.core import settings
+from src.core.locks import LockTimeoutError, chat_turn_lock
+from src.core.metrics import stage
+from src.core.shards import get_shard_router
 from src.dependencies import (
+    AdmissionControllerDep,
+    ChatMemoryDep,
     ChatRepositoryDep,
+    IdempotencyRepositoryDep,
+    MessageArchiverDep,
+    MessageBufferDep,
+    MessageEmbeddingRepositoryDep,
     MessageRepositoryDep,
     PaginationDep,
+    ReadChatRepositoryDep,
+    ReadMessageRepositoryDep,
+    ReadShardedChatRepositoryDep,
+    SemanticCacheDep,
+    ShardRouterDep,
 )
+from src.messages.transfer import MessageImportError, import_messages
+from src.models.cache import CacheStatsRead
 from src.models.chat import Chat, ChatCreate, ChatRead
-from src.models.message import Message, MessageCreate, MessageRead
+from src.models.idempotency import IdempotencyRecord
+from src.models.message import (
+    Message,
+    MessageCreate,
+    MessageImportRead,
+    MessageRead,
+    MessageStreamDone,
+    MessageStreamError,
+    MessageStreamText,
+    dump_message_lines,
+    dump_message_rows,
+)
+from src.repositories import (
+    ChatRepository,
+    MessageEmbeddingRepository,
+    MessageRepository,
+)
+from src.repositories.buffer import MessageWriteBuffer
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+MESSAGES_READ_ADAPTER = TypeAdapter(list[MessageRead])
+
 
 @router.get("/", response_model=list[ChatRead])
 async def list_chats(
-    repo: ChatRepositoryDep,
+    repo: ReadShardedChatRepositoryDep,
     pagination: PaginationDep,
+    response: Response,
 ) -> list[Chat]:
-    return await repo.list_chats(pagination.limit, pagination.offset)
+    chats = await repo.list_chats(
+        pagination.limit,
+        pagination.offset,
+        pagination.after,
+        pagination.before,
+    )
+    pagination.set_cursor_headers(response, chats)
+    pagination.set_total_header(response, await repo.count())
+    return chats
 
 
 @router.post("/", response_model=ChatRead)
-async def create_chat(body: ChatCreate, repo: ChatRepositoryDep) -> Chat:
+async def create_chat(body: ChatCreate, shards: ShardRouterDep) -> Chat:
     chat = Chat.model_validate(body)
-    return await repo.create_chat(chat)
+    async with shards.owner(chat.id).session_maker() as session:
+        return await ChatRepository(session).create_chat(chat)
 
 
 @router.get("/{chat_id}", response_model=ChatRead)
-async def get_chat(chat_id: uuid.UUID, repo: ChatRepositoryDep) -> Chat:
+async def get_chat(chat_id: uuid.UUID, repo: ReadChatRepositoryDep) -> Chat:
     chat = await repo.get_chat(chat_id)
     if not chat:
         raise HTTPException(
@@ -47,11 +122,154 @@ async def get_chat(chat_id: uuid.UUID, repo: ChatRepositoryDep) -> Chat:
     response_model_exclude={"system", "usage", "model"},
 )
 async def list_chat_messages(
-    chat_id: uuid.UUID, repo: MessageRepositoryDep, pagination: PaginationDep
-) -> list[Message]:
-    return await repo.list_messages(
-        chat_id, pagination.limit, pagination.offset
+    chat_id: uuid.UUID,
+    repo: ReadMessageRepositoryDep,
+    pagination: PaginationDep,
+    buffer: MessageBufferDep,
+) -> Response:
+    if buffer is not None:
+        await buffer.wait_settled(chat_id)
+    # Rows are encoded straight to bytes; returning a Response skips
+    # response_model validation while keeping it for the OpenAPI schema.
+    rows = await repo.list_messages_raw(
+        chat_id,
+        pagination.limit,
+        pagination.offset,
+        pagination.after,
+        pagination.before,
     )
+    response = Response(
+        content=dump_message_rows(rows), media_type="application/json"
+    )
+    pagination.set_cursor_headers(response, rows)
+    pagination.set_total_header(
+        response, await repo.count_chat_messages(chat_id)
+    )
+    return response
+
+
+@router.get("/{chat_id}/export")
+async def export_chat_messages(
+    chat_id: uuid.UUID,
+    repo: ReadChatRepositoryDep,
+    buffer: MessageBufferDep,
+    archiver: MessageArchiverDep,
+    shards: ShardRouterDep,
+) -> StreamingResponse:
+    """Every message of the chat as NDJSON, archived months included."""
+    if not await repo.get_chat(chat_id):
+        raise HTTPException(
+            status_code=404, detail=f"Chat {chat_id} not found."
+        )
+    if buffer is not None:
+        await buffer.wait_settled(chat_id)
+    shard = await shards.locate(chat_id)
+
+    # The stream outlives the request's dependencies, so it has its own
+    # session, holding the cursor until the last batch is sent.
+    async def lines() -> AsyncIterator[bytes]:
+        async with shard.read_session_maker() as session:
+            async for rows in MessageRepository(
+                session, archiver
+            ).stream_messages_raw(chat_id, settings.MESSAGE_EXPORT_BATCH_SIZE):
+                yield dump_message_lines(rows)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="chat-{chat_id}.ndjson"'
+            )
+        },
+    )
+
+
+@router.post("/{chat_id}/import", response_model=MessageImportRead)
+async def import_chat_messages(
+    chat_id: uuid.UUID, request: Request, repo: ReadChatRepositoryDep
+) -> MessageImportRead:
+    """Load an NDJSON export into the chat, batch by batch with COPY.
+
+    Batches before a bad line stay imported; the error says how many.
+    """
+    if not await repo.get_chat(chat_id):
+        raise HTTPException(
+            status_code=404, detail=f"Chat {chat_id} not found."
+        )
+    try:
+        imported = await import_messages(
+            request.stream(), chat_id, settings.MESSAGE_IMPORT_BATCH_SIZE
+        )
+    except MessageImportError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return MessageImportRead(imported=imported)
+
+
+async def _run_turn(
+    chat_id: uuid.UUID,
+    body: MessageCreate,
+    messages_repo: MessageRepository,
+    memory_repo: MessageEmbeddingRepository,
+    cache: SemanticResponseCache | None,
+    memory: ChatMemory | None,
+    buffer: MessageWriteBuffer | None,
+    admission: AdmissionController | None,
+    background_tasks: BackgroundTasks,
+) -> list[Message]:
+    # Snapshot before reading so a flush racing the query can only cause
+    # duplicates, which are dropped by id, never gaps.
+    pending = buffer.pending(chat_id) if buffer is not None else []
+    if memory is None:
+        with stage("history_query"):
+            message_history_db = await messages_repo.list_history(chat_id)
+        with stage("history_convert"):
+            message_history_agent = processor.process_history_from_db(
+                message_history_db
+            )
+            if pending:
+                known = {row[0] for row in message_history_db}
+                message_history_agent += processor.process_messages_from_db(
+                    [m for m in pending if m.id not in known]
+                )
+    else:
+        with stage("history_query"):
+            message_history_agent = await memory.load_history(
+                messages_repo, memory_repo, chat_id, body.message, pending
+            )
+    deps = ChatbotDeps(n=settings.SECRET_NUMBER)
+
+    async def runner() -> list[ModelMessage]:
+        if admission is None:
+            return await run_agent(body.message, deps, message_history_agent)
+        return await admission.run(
+            lambda: run_agent(body.message, deps, message_history_agent)
+        )
+
+    if cache is None:
+        response_messages_agent = await runner()
+    else:
+        # Cache hits never reach the model, so only misses are admitted.
+        response_messages_agent = await cache.run(
+            chat_id,
+            body.message,
+            runner,
+            scope=get_cache_scope(deps, message_history_agent),
+        )
+    with stage("persist"):
+        response_message_history = processor.process_messages_to_db(
+            chat_id, response_messages_agent
+        )
+        if buffer is not None:
+            await buffer.put(
+                response_message_history,
+                memory.index_messages if memory is not None else None,
+            )
+            return response_message_history
+        messages = await messages_repo.create_messages(response_message_history)
+    if memory is not None:
+        background_tasks.add_task(memory.index_messages, messages)
+    return messages
 
 
 @router.post(
@@ -65,21 +283,278 @@ async def create_message(
     body: MessageCreate,
     chat_repo: ChatRepositoryDep,
     messages_repo: MessageRepositoryDep,
-) -> list[Message]:
-    chat = await chat_repo.get_chat(chat_id)
+    memory_repo: MessageEmbeddingRepositoryDep,
+    idempotency_repo: IdempotencyRepositoryDep,
+    cache: SemanticCacheDep,
+    memory: ChatMemoryDep,
+    buffer: MessageBufferDep,
+    admission: AdmissionControllerDep,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Annotated[
+        str | None, Header(min_length=1, max_length=255)
+    ] = None,
+) -> list[Message] | Response:
+    with stage("chat_lookup"):
+        chat = await chat_repo.get_chat(chat_id)
     if not chat:
         raise HTTPException(
             status_code=404, detail=f"Chat {chat_id} not found."
         )
-    message_history_db = await messages_repo.list_messages(chat_id, None, None)
-    message_history_agent = processor.process_messages_from_db(
-        message_history_db
+    ttl = timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    request_hash = hashlib.sha256(body.model_dump_json().encode()).hexdigest()
+    # Turns of a chat run one at a time across all workers, so a retry
+    # waits for the original attempt and then finds its stored response.
+    try:
+        async with AsyncExitStack() as lock:
+            await lock.enter_async_context(chat_turn_lock(chat_id))
+            if idempotency_key is not None:
+                record = await idempotency_repo.get_record(
+                    chat_id, idempotency_key, ttl
+                )
+                if record is not None:
+                    if record.request_hash != request_hash:
+                        raise HTTPException(
+                            status_code=422,
+                            detail="Idempotency-Key was already used with "
+                            "a different request.",
+                        )
+                    return JSONResponse(
+                        record.response,
+                        status_code=record.status_code,
+                        headers={"Idempotent-Replayed": "true"},
+                    )
+            messages = await _run_turn(
+                chat_id,
+                body,
+                messages_repo,
+                memory_repo,
+                cache,
+                memory,
+                buffer,
+                admission,
+                background_tasks,
+            )
+            if idempotency_key is not None:
+                await idempotency_repo.save_record(
+                    IdempotencyRecord(
+                        chat_id=chat_id,
+                        key=idempotency_key,
+                        request_hash=request_hash,
+                        status_code=200,
+                        response=MESSAGES_READ_ADAPTER.dump_python(
+                            [
+                                MessageRead.model_validate(
+                                    m, from_attributes=True
+                                )
+                                for m in messages
+                            ],
+                            mode="json",
+                            exclude_none=True,
+                        ),
+                    ),
+                    ttl,
+                )
+            if buffer is not None:
+                # The chat stays locked until the turn is committed, but
+                # the response does not wait for it.
+                buffer.when_flushed(chat_id, lock.pop_all().aclose)
+            return messages
+    except LockTimeoutError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Another message is being processed in chat {chat_id}.",
+        ) from e
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        ) from e
+
+
+async def _load_stream_history(
+    chat_id: uuid.UUID,
+    conversation: ChatConversation,
+    body: MessageCreate,
+    memory: ChatMemory | None,
+    archiver: MessageArchiver | None,
+    buffer: MessageWriteBuffer | None,
+) -> list[ModelMessage]:
+    """The history ``_run_turn`` would use: all of it, kept in memory by
+    the connection, or what ChatMemory selects."""
+    if memory is None:
+        await conversation.catch_up(buffer)
+        return conversation.history
+    pending = buffer.pending(chat_id) if buffer is not None else []
+    with stage("history_query"):
+        shard = await get_shard_router().locate(chat_id)
+        async with shard.session_maker() as session:
+            return await memory.load_history(
+                MessageRepository(session, archiver),
+                MessageEmbeddingRepository(session),
+                chat_id,
+                body.message,
+                pending,
+            )
+
+
+async def _run_stream_turn(
+    websocket: WebSocket,
+    chat_id: uuid.UUID,
+    conversation: ChatConversation,
+    body: MessageCreate,
+    cache: SemanticResponseCache | None,
+    memory: ChatMemory | None,
+    archiver: MessageArchiver | None,
+    buffer: MessageWriteBuffer | None,
+    admission: AdmissionController | None,
+) -> list[Message]:
+    history = await _load_stream_history(
+        chat_id, conversation, body, memory, archiver, buffer
     )
     deps = ChatbotDeps(n=settings.SECRET_NUMBER)
-    response_messages_agent = await run_agent(
-        body.message, deps, message_history_agent
+    streamed = False
+
+    async def on_text(delta: str) -> None:
+        nonlocal streamed
+        streamed = True
+        await websocket.send_text(
+            MessageStreamText(delta=delta).model_dump_json()
+        )
+
+    def runner() -> Awaitable[list[ModelMessage]]:
+        return stream_agent(body.message, deps, history, on_text)
+
+    def admitted() -> Awaitable[list[ModelMessage]]:
+        return runner() if admission is None else admission.run(runner)
+
+    if cache is None:
+        new_messages = await admitted()
+    else:
+        new_messages = await cache.run(
+            chat_id,
+            body.message,
+            admitted,
+            scope=get_cache_scope(deps, history),
+        )
+        if not streamed and (answer := get_answer(new_messages)):
+            # A cache hit: the whole answer goes out as one delta.
+            await on_text(answer)
+    with stage("persist"):
+        messages = processor.process_messages_to_db(chat_id, new_messages)
+        if buffer is not None:
+            await buffer.put(
+                messages,
+                memory.index_messages if memory is not None else None,
+            )
+        else:
+            shard = await get_shard_router().locate(chat_id)
+            async with shard.session_maker() as session:
+                messages = await MessageRepository(session).create_messages(
+                    messages
+                )
+    if memory is None:
+        conversation.extend(new_messages, messages)
+    return messages
+
+
+@router.websocket("/{chat_id}/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    chat_id: uuid.UUID,
+    cache: SemanticCacheDep,
+    memory: ChatMemoryDep,
+    archiver: MessageArchiverDep,
+    buffer: MessageBufferDep,
+    admission: AdmissionControllerDep,
+) -> None:
+    """Chat over one connection, streaming the answer as it is generated.
+
+    Each text frame sent by the client is a MessageCreate. The server
+    answers with ``text`` frames carrying deltas, then a ``done`` frame
+    with the stored messages, or an ``error`` frame. Turns use the same
+    history and semantic cache as over HTTP; without chat memory the
+    full history is loaded once and kept in memory for the connection.
+    """
+    with stage("chat_lookup"):
+        shard = await get_shard_router().locate(chat_id)
+        async with shard.session_maker() as session:
+            chat = await ChatRepository(session).get_chat(chat_id)
+    if not chat:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason=f"Chat {chat_id} not found.",
+        )
+    conversation = (
+        await ChatConversation.load(chat_id, buffer)
+        if memory is None
+        else ChatConversation(chat_id)
     )
-    response_message_history = processor.process_messages_to_db(
-        chat_id, response_messages_agent
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_text()
+            try:
+                body = MessageCreate.model_validate_json(data)
+                async with AsyncExitStack() as lock:
+                    await lock.enter_async_context(chat_turn_lock(chat_id))
+                    messages = await _run_stream_turn(
+                        websocket,
+                        chat_id,
+                        conversation,
+                        body,
+                        cache,
+                        memory,
+                        archiver,
+                        buffer,
+                        admission,
+                    )
+                    if buffer is not None:
+                        buffer.when_flushed(chat_id, lock.pop_all().aclose)
+            except ValidationError as e:
+                frame = MessageStreamError(status_code=422, detail=str(e))
+            except LockTimeoutError:
+                frame = MessageStreamError(
+                    status_code=409,
+                    detail=f"Another message is being processed in chat "
+                    f"{chat_id}.",
+                )
+            except AdmissionRejectedError as e:
+                frame = MessageStreamError(
+                    status_code=e.status_code,
+                    detail=str(e),
+                    retry_after=math.ceil(e.retry_after),
+                )
+            else:
+                frame = MessageStreamDone(
+                    messages=[
+                        MessageRead.model_validate(m, from_attributes=True)
+                        for m in messages
+                    ]
+                )
+            await websocket.send_text(frame.model_dump_json(exclude_none=True))
+            if isinstance(frame, MessageStreamDone) and (
+                memory is not None and buffer is None
+            ):
+                # The buffer indexes on flush; otherwise index once the
+                # client has its answer.
+                await memory.index_messages(messages)
+    except WebSocketDisconnect:
+        pass
+
+
+@router.get("/{chat_id}/cache-stats", response_model=CacheStatsRead)
+async def get_chat_cache_stats(
+    chat_id: uuid.UUID, cache: SemanticCacheDep
+) -> CacheStatsRead:
+    if cache is None:
+        raise HTTPException(
+            status_code=404, detail="Semantic cache is disabled."
+        )
+    stats = cache.stats(chat_id)
+    return CacheStatsRead(
+        hits=stats.hits,
+        misses=stats.misses,
+        hit_rate=stats.hit_rate,
+        latency_saved=stats.latency_saved,
     )
-    return await messages_repo.create_messages(response_message_history)
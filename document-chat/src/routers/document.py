@@ -0,0 +1,94 @@
+import uuid
+
+from fastapi import APIRouter, HTTPException, Response
+
+from src.core import settings
+from src.dependencies import (
+    DocumentRepositoryDep,
+    JobRepositoryDep,
+    PaginationDep,
+    ReadDocumentRepositoryDep,
+)
+from src.models.document import (
+    Document,
+    DocumentChunk,
+    DocumentChunkSourceRead,
+    DocumentCreate,
+    DocumentRead,
+)
+from src.models.job import Job, JobKind, JobRead
+
+router = APIRouter(prefix="/documents", tags=["documents"])
+
+
+def ingest_job(document: Document, priority: int = 0) -> Job:
+    return Job(
+        kind=JobKind.DOCUMENT_INGEST,
+        tenant=document.tenant,
+        payload={"document_id": str(document.id)},
+        priority=priority,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+@router.get("/", response_model=list[DocumentRead])
+async def list_documents(
+    repo: ReadDocumentRepositoryDep,
+    pagination: PaginationDep,
+    response: Response,
+) -> list[Document]:
+    documents = await repo.list_documents(
+        pagination.limit,
+        pagination.offset,
+        pagination.after,
+        pagination.before,
+    )
+    pagination.set_cursor_headers(response, documents)
+    return documents
+
+
+@router.post("/", response_model=DocumentRead, status_code=202)
+async def create_document(
+    body: DocumentCreate,
+    repo: DocumentRepositoryDep,
+    jobs: JobRepositoryDep,
+) -> Document:
+    document = await repo.create_document(Document.model_validate(body))
+    await jobs.enqueue(ingest_job(document))
+    return document
+
+
+@router.get("/{document_id}", response_model=DocumentRead)
+async def get_document(
+    document_id: uuid.UUID, repo: ReadDocumentRepositoryDep
+) -> Document:
+    document = await repo.get_document(document_id)
+    if not document:
+        raise HTTPException(
+            status_code=404, detail=f"Document {document_id} not found."
+        )
+    return document
+
+
+@router.post("/{document_id}/ingest", response_model=JobRead, status_code=202)
+async def ingest_document(
+    document_id: uuid.UUID,
+    repo: DocumentRepositoryDep,
+    jobs: JobRepositoryDep,
+    priority: int = 0,
+) -> Job:
+    document = await repo.get_document(document_id)
+    if not document:
+        raise HTTPException(
+            status_code=404, detail=f"Document {document_id} not found."
+        )
+    return await jobs.enqueue(ingest_job(document, priority))
+
+
+@router.get(
+    "/chunks/{chunk_id}/sources", response_model=list[DocumentChunkSourceRead]
+)
+async def list_chunk_sources(
+    chunk_id: uuid.UUID, repo: ReadDocumentRepositoryDep
+) -> list[DocumentChunk]:
+    return await repo.list_chunk_sources(chunk_id)
@@ -0,0 +1,16 @@
+import uuid
+
+from fastapi import APIRouter, HTTPException
+
+from src.dependencies import JobRepositoryDep
+from src.models.job import Job, JobRead
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(job_id: uuid.UUID, repo: JobRepositoryDep) -> Job:
+    job = await repo.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
@@ -0,0 +1,52 @@
+import asyncio
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from src.core import settings
+from src.core.profiling import dump_tasks
+from src.dependencies.profiling import ProfilerDep
+from src.models.profiling import ProfileRead
+
+router = APIRouter(prefix="/admin/profiling", tags=["admin"])
+
+
+@router.post("/worker", response_class=PlainTextResponse)
+async def profile_worker(
+    profiler: ProfilerDep,
+    seconds: Annotated[
+        float, Query(gt=0, le=settings.PROFILING_MAX_SECONDS)
+    ] = 10.0,
+) -> str:
+    with profiler.profile_worker() as profile:
+        await asyncio.sleep(seconds)
+    return profile.collapsed()
+
+
+@router.get("/tasks", response_class=PlainTextResponse)
+async def get_tasks(profiler: ProfilerDep) -> str:
+    return dump_tasks()
+
+
+@router.get("/requests", response_model=list[ProfileRead])
+async def list_profiles(profiler: ProfilerDep) -> list[ProfileRead]:
+    return [
+        ProfileRead(
+            id=p.id,
+            name=p.name,
+            started_at=p.started_at,
+            duration=p.duration,
+            samples=p.samples,
+        )
+        for p in reversed(profiler.recent)
+    ]
+
+
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: uuid.UUID, profiler: ProfilerDep) -> str:
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return profile.collapsed()
@@ -0,0 +1,158 @@
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from typing import Final
+
+from src.archive.partitions import month_start, months_between
+from src.core import Shard
+from src.core.locks import LockTimeoutError, chat_turn_lock
+from src.core.shards import ShardRouter
+from src.models.archive import MessageArchive
+from src.models.chat import Chat
+from src.models.message import Message
+from src.models.shard import ShardRebalanceRead
+from src.repositories import (
+    ChatRepository,
+    CounterRepository,
+    MessageArchiveRepository,
+    MessageRepository,
+)
+from src.repositories.move import CHAT_TABLES, ChatMoveRepository
+
+logger = logging.getLogger("shards.rebalancer")
+
+DEFAULT_BATCH_SIZE: Final[int] = 1000
+
+
+class ShardRebalancer:
+    """Moves chats to the shard the ring assigns them, while in use.
+
+    Every shard's chats are scanned and each one found off its shard is
+    moved on its own. The chat's turn lock keeps turns out, and its row
+    stays locked on the source until it is deleted there, which holds
+    back any other write to it. The copy is committed first, so readers
+    locating the chat find it whole on one shard or the other. A move
+    interrupted after the copy is finished by the next run.
+    """
+
+    router: ShardRouter
+    batch_size: int
+
+    def __init__(
+        self, router: ShardRouter, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        self.router = router
+        self.batch_size = batch_size
+
+    async def _iter_chat_ids(self, shard: Shard) -> AsyncIterator[uuid.UUID]:
+        after: uuid.UUID | None = None
+        while True:
+            # A session per batch, so no transaction stays open for the
+            # whole scan.
+            async with shard.session_maker() as session:
+                ids = await ChatRepository(session).list_chat_ids(
+                    self.batch_size, after
+                )
+            for chat_id in ids:
+                yield chat_id
+            if len(ids) < self.batch_size:
+                return
+            after = ids[-1]
+
+    async def rebalance(self, dry_run: bool = False) -> ShardRebalanceRead:
+        report = ShardRebalanceRead(chats=0, moved=0, skipped=0, messages=0)
+        for shard in self.router.shards:
+            async for chat_id in self._iter_chat_ids(shard):
+                report.chats += 1
+                owner = self.router.owner(chat_id)
+                if owner is shard:
+                    continue
+                if dry_run:
+                    report.moved += 1
+                    continue
+                try:
+                    messages = await self.move(chat_id, shard, owner)
+                except LockTimeoutError:
+                    logger.warning("Chat %s is busy, skipping", chat_id)
+                    report.skipped += 1
+                    continue
+                if messages is not None:
+                    report.moved += 1
+                    report.messages += messages
+        return report
+
+    async def move(
+        self, chat_id: uuid.UUID, source: Shard, target: Shard
+    ) -> int | None:
+        """Move the chat, returning how many live messages were copied,
+        or None if it was deleted meanwhile."""
+        async with (
+            chat_turn_lock(chat_id),
+            source.session_maker() as source_session,
+            target.session_maker() as target_session,
+        ):
+            source_repo = ChatMoveRepository(source_session)
+            target_repo = ChatMoveRepository(target_session)
+            chat = await source_repo.lock_chat(chat_id)
+            if chat is None:
+                return None
+            messages = 0
+            if not await target_repo.has_chat(chat_id):
+                messages = await self._copy(
+                    chat, source_repo, target_repo, target
+                )
+                await target_session.commit()
+            await source_repo.delete_chat(chat_id)
+            await source_session.commit()
+        logger.info(
+            "Moved chat %s from shard %d to %d with %d messages",
+            chat_id,
+            source.index,
+            target.index,
+            messages,
+        )
+        return messages
+
+    async def _copy(
+        self,
+        chat: Chat,
+        source_repo: ChatMoveRepository,
+        target_repo: ChatMoveRepository,
+        target: Shard,
+    ) -> int:
+        bounds = await source_repo.message_range(chat.id)
+        if bounds is not None:
+            # Committed on their own; they are only empty partitions.
+            async with target.session_maker() as session:
+                await MessageArchiveRepository(session).create_partitions(
+                    months_between(month_start(bounds[0]), bounds[1])
+                )
+        await target_repo.insert_rows(
+            Chat.__table__,  # type: ignore
+            [chat.model_dump()],
+        )
+        messages = 0
+        async for rows in source_repo.iter_rows(
+            Message.__table__,  # type: ignore
+            chat.id,
+            self.batch_size,
+        ):
+            messages += await MessageRepository(
+                target_repo.session
+            ).copy_messages(
+                [Message.model_validate(row) for row in rows], commit=False
+            )
+        archived = 0
+        for table in CHAT_TABLES:
+            async for rows in source_repo.iter_rows(
+                table, chat.id, self.batch_size
+            ):
+                await target_repo.insert_rows(table, rows)
+                if table is MessageArchive.__table__:  # type: ignore
+                    archived += sum(row["messages"] for row in rows)
+        if archived:
+            # Archive manifests are not counted by a trigger on insert.
+            counters = CounterRepository(target_repo.session)
+            await counters.add_rows(Message.__tablename__, archived)
+            await counters.add_chat_messages(chat.id, archived)
+        return messages
@@ -1,9 +1,16 @@
 import asyncio
+import base64
+import contextvars
+import struct
 import time
+import uuid
 from collections.abc import Callable
 from concurrent.futures import Executor
-from datetime import UTC, datetime
-from typing import Any
+from datetime import UTC, datetime, timedelta
+from typing import Any, NamedTuple
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+CURSOR_FORMAT = struct.Struct(">q16s")
 
 
 def now_utc() -> datetime:
@@ -14,7 +21,12 @@ async def asyncfy(
     func: Callable, *args: Any, executor: Executor | None = None, **kwargs: Any
 ):
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(executor, lambda: func(*args, **kwargs))
+    # Carry the context over so spans opened in the worker thread nest
+    # under the caller's.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        executor, lambda: context.run(func, *args, **kwargs)
+    )
 
 
 def timer(timeout: int) -> Callable[[], bool]:
@@ -26,3 +38,25 @@ def timer(timeout: int) -> Callable[[], bool]:
         return total > timeout
 
     return _func
+
+
+class Cursor(NamedTuple):
+    """Opaque keyset position: the (created_at, id) of a row."""
+
+    created_at: datetime
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        micros = (self.created_at - EPOCH) // timedelta(microseconds=1)
+        raw = CURSOR_FORMAT.pack(micros, self.id.bytes)
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        micros, id_bytes = CURSOR_FORMAT.unpack(raw)
+        try:
+            created_at = EPOCH + timedelta(microseconds=micros)
+        except OverflowError as e:
+            raise ValueError(f"Cursor time out of range: {micros}") from e
+        return cls(created_at, uuid.UUID(bytes=id_bytes))
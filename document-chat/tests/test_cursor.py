@@ -0,0 +1,36 @@
+"""Cursor tokens as they arrive in ``after``/``before`` query parameters.
+
+python -m unittest tests.test_cursor
+"""
+
+import unittest
+import uuid
+
+from fastapi import HTTPException
+
+from src.dependencies.request import _decode_cursor
+from src.utils import Cursor, now_utc
+
+
+class CursorTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        cursor = Cursor(now_utc(), uuid.uuid4())
+        self.assertEqual(Cursor.decode(cursor.encode()), cursor)
+
+    def test_out_of_range_time_is_invalid(self) -> None:
+        # Well formed, but its microseconds overflow a datetime.
+        overflowing = "QAAAAAAAAABLEqGGYqpLZYYFONYoOPvj"
+        with self.assertRaises(ValueError):
+            Cursor.decode(overflowing)
+        with self.assertRaises(HTTPException) as raised:
+            _decode_cursor("after", overflowing)
+        self.assertEqual(raised.exception.status_code, 400)
+
+    def test_malformed_token_is_invalid(self) -> None:
+        with self.assertRaises(HTTPException) as raised:
+            _decode_cursor("before", "not-a-cursor")
+        self.assertEqual(raised.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
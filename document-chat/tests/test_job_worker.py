@@ -0,0 +1,64 @@
+"""End to end run of a job through the worker, against the configured
+Postgres with migrations applied. Skipped when it cannot be reached.
+
+    python -m unittest tests.test_job_worker
+"""
+
+import unittest
+import uuid
+from typing import Any
+
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlmodel import text
+
+from src.core import dispose_engines, session_maker
+from src.jobs.worker import JobWorker
+from src.models.job import Job, JobStatus
+from src.repositories.job import JobRepository
+
+
+class JobWorkerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        try:
+            async with session_maker() as session:
+                await session.exec(text("SELECT 1"))  # type: ignore
+        except (OSError, DBAPIError, OperationalError) as e:
+            await dispose_engines()
+            self.skipTest(f"Postgres is unavailable: {e}")
+        # A kind of its own, so no other job is claimed here.
+        self.kind = f"test.echo.{uuid.uuid4().hex}"
+
+    async def asyncTearDown(self) -> None:
+        await dispose_engines()
+
+    async def test_claimed_job_runs_handler(self) -> None:
+        seen: list[dict[str, Any]] = []
+
+        async def echo(job: Job) -> dict[str, Any]:
+            seen.append(job.payload)
+            return {"echo": job.payload["value"]}
+
+        async with session_maker() as session:
+            job = await JobRepository(session).enqueue(
+                Job(kind=self.kind, payload={"value": 42})
+            )
+            job_id = job.id
+
+        worker = JobWorker({self.kind: echo}, worker_id="test")
+        self.assertTrue(await worker.run_once())
+        self.assertFalse(await worker.run_once())
+
+        self.assertEqual(seen, [{"value": 42}])
+        async with session_maker() as session:
+            job = await JobRepository(session).get_job(job_id)
+            self.assertIsNotNone(job)
+            assert job is not None  # noqa: S101
+            self.assertEqual(job.status, JobStatus.SUCCEEDED)
+            self.assertEqual(job.attempts, 1)
+            self.assertEqual(job.result, {"echo": 42})
+            await session.delete(job)
+            await session.commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""The app's cold import budget, measured as benchmarks.startup does.
+
+    python -m unittest tests.test_startup
+
+STARTUP_BUDGET_MS overrides the budget on slower machines.
+"""
+
+import os
+import statistics
+import unittest
+
+from benchmarks.startup import (
+    BUDGET_MS,
+    cumulative_ms,
+    eager_imports,
+    import_once,
+)
+
+REPEAT = 3
+
+
+class StartupTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.runs = [import_once("src.app") for _ in range(REPEAT)]
+
+    def test_provider_sdks_are_deferred(self) -> None:
+        for run in self.runs:
+            self.assertEqual(eager_imports(run), [])
+
+    def test_import_within_budget(self) -> None:
+        budget = float(os.environ.get("STARTUP_BUDGET_MS", BUDGET_MS))
+        median = statistics.median(cumulative_ms(run) for run in self.runs)
+        self.assertLessEqual(
+            median, budget, f"import src.app took {median:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()